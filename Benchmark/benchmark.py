@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite of the placement engines and their hot paths.
+
+Times heu_full_model, benchmark_first, benchmark_second, Graph.k_path,
+Graph.__init__, Chains.read, the pickling of a worker job and the
+construction of the MILP model (the solver is never called, and the
+peak memory of the construction is measured too) over chain
+counts of the Data/ corpus and over synthetic larger topologies, with
+uniform and with heterogeneous capacities, and the import time of the
+modules in a fresh interpreter. Every run is
+appended to the history file, and --check compares it against the best
+earlier run of the same machine.
+
+Run from the repository root:
+    python Benchmark/benchmark.py [--quick] [--check] [--case NAME]
+"""
+###############################################################
+# Import packages
+###############################################################
+import sys
+sys.path.insert(0, './PaperFunctions')
+sys.path.insert(1, './Given')
+sys.path.insert(1, './Models')
+sys.path.insert(1, './Utils')
+import argparse
+import contextlib
+import io
+import json
+import os
+import pickle
+import platform
+import random as rd
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import networkx as nx
+import InputConstants
+import LowerBound
+import MatrixBuilder
+from PaperFunctions import Graph, Chains, Functions
+
+input_cons = InputConstants.inputs()
+# Chain counts read from Data/ and synthetic (nodes, chains) sizes
+data_chain_nums = [6, 18, 34, 50]
+synthetic_sizes = [(30, 100), (60, 200), (120, 400)]
+seed = 2019
+# Modules whose import time is measured in a fresh interpreter
+import_modules = ['PaperFunctions', 'heu_full', 'firstRoutingLastPlacementBenchmark',
+                  'firstPlacementLastRoutingBenchmark', 'Registry', 'Plot', 'MILP', 'MILP_batch', 'MatrixBuilder',
+                  'LowerBound']
+# Factors of the uniform capacities drawn by heterogeneous topologies
+capacity_factors = [0.25, 0.5, 1, 2, 4]
+# The dense MILP model spans every node, chain, path, source and
+# destination, larger instances don't fit in memory
+milp_max_chains = 18
+# Largest instance of the sparse MILP model
+milp_sparse_max_chains = 50
+# Cases whose peak memory is measured as well, by name prefix
+memory_cases = ('MILP_model.build', 'MatrixBuilder.build')
+
+###############################################################
+# "synthetic_network": writes a ring topology with random chords,
+#                        added until every node is at most k hops
+#                        from every other, in the format of
+#                                             Data/*_network.json
+#               --->input:  nodes_num >>> number of nodes
+#                           k >>> maximum hop count of a path
+#                           path >>> path of the json file
+#                           heterogeneous >>> capacities of the nodes
+#                                   and links are the uniform ones
+#                                   times one of capacity_factors
+#               --->output: none
+###############################################################
+def synthetic_network(nodes_num, k, path, heterogeneous=False):
+    rnd = rd.Random(seed + nodes_num)
+    names = [str(n + 1) for n in range(nodes_num)]
+    G = nx.cycle_graph(nodes_num)
+    while nx.diameter(G) > k:
+        for n in range(nodes_num):
+            m = rnd.randrange(nodes_num)
+            if m != n:
+                G.add_edge(n, m)
+    # The same topology with and without heterogeneous capacities
+    cap_rnd = rd.Random(seed - nodes_num)
+    factor = (lambda: cap_rnd.choice(capacity_factors)) if heterogeneous else (lambda: 1)
+    network = {'networkTopology': {
+        'nodes': [[name, input_cons.node_cpu * factor(), input_cons.node_mem * factor()] for name in names],
+        'links': {names[n]: [[names[m], rnd.randint(100, 5000), input_cons.link_cap * factor()]
+                             for m in sorted(G[n])] for n in range(nodes_num)}}}
+    with open(path, 'w') as outfile:
+        json.dump(network, outfile)
+
+###############################################################
+# "synthetic_chains": writes chain_num random chains with one user
+#                                                       each
+###############################################################
+def synthetic_chains(graph, funs, chain_num, path):
+    state = rd.getstate()
+    rd.seed(seed + chain_num)
+    chain = Chains(graph, funs)
+    chain.generate(chain_num, funs, randomChain=True)
+    chain.user_generatore(0, path, forEachChain=True)
+    rd.setstate(state)
+
+###############################################################
+# "instances": (label, network path, chains path, capacities from
+#                              the topology) of every instance of 
+#                              the matrix, synthetic ones are written
+#                              to tmp_dir. Every synthetic network
+#                              also runs with heterogeneous capacities
+###############################################################
+def instances(funs, k, tmp_dir, quick):
+    network = input_cons.network_path + input_cons.network_name
+    chain_nums = data_chain_nums[:1] if quick else data_chain_nums
+    for chain_num in chain_nums:
+        yield ('nsf{}'.format(chain_num), network,
+               input_cons.chains_random_path + input_cons.chains_random_name + str(chain_num) + '_0.json', False)
+    for nodes_num, chain_num in synthetic_sizes[:1] if quick else synthetic_sizes:
+        network = os.path.join(tmp_dir, 'ring{}_network.json'.format(nodes_num))
+        chains = os.path.join(tmp_dir, 'ring{}_chains{}.json'.format(nodes_num, chain_num))
+        synthetic_network(nodes_num, k, network)
+        synthetic_chains(Graph(network, funs), funs, chain_num, chains)
+        yield 'ring{}x{}'.format(nodes_num, chain_num), network, chains, False
+        network = os.path.join(tmp_dir, 'ring{}het_network.json'.format(nodes_num))
+        synthetic_network(nodes_num, k, network, heterogeneous=True)
+        yield 'ring{}x{}het'.format(nodes_num, chain_num), network, chains, True
+
+###############################################################
+# "import_command": command that starts python and imports module 
+#                                                    the way main does
+###############################################################
+def import_command(module):
+    paths = ['./PaperFunctions', './Given', './Models', './Plot', './Utils']
+    return [sys.executable, '-c', 'import sys; sys.path[:0] = {!r}; import {}'.format(paths, module)]
+
+###############################################################
+# "cases": (name, setup, body) of every benchmark, setup runs
+#                            untimed before each timed body call
+###############################################################
+def cases(funs, tmp_dir, quick):
+    yield 'import/python', None, lambda: subprocess.run([sys.executable, '-c', 'pass'], check=True)
+    for module in import_modules:
+        if subprocess.run(import_command(module), capture_output=True).returncode != 0:
+            print('skipping import/{}: not importable here'.format(module))
+            continue
+        yield ('import/{}'.format(module), None,
+               lambda module=module: subprocess.run(import_command(module), check=True))
+    k = input_cons.k_path_num[0]
+    alpha = input_cons.alpha[0]
+    batch_size = input_cons.batch_size[0]
+    tune_param = input_cons.heu_full_tune_param[0]
+    heuristics = []
+    for module, cls in (('heu_full', 'heu_full_model'),
+                        ('firstRoutingLastPlacementBenchmark', 'benchmark_first'),
+                        ('firstPlacementLastRoutingBenchmark', 'benchmark_second')):
+        try:
+            heuristics.append((cls, getattr(__import__(module), cls)()))
+        except ImportError as e:
+            print('skipping {}: {}'.format(cls, e))
+    try:
+        from MILP import MILP_model
+        milp = MILP_model()
+    except ImportError as e:
+        print('skipping MILP_model.build: {}'.format(e))
+        milp = None
+    try:
+        import scipy
+        relaxation = True
+    except ImportError as e:
+        print('skipping LowerBound.relaxation_bound: {}'.format(e))
+        relaxation = False
+    for label, network, chains, capacities in instances(funs, k, tmp_dir, quick):
+        graph = Graph(network, funs, capacities)
+        chain = Chains(graph, funs)
+        chain.read(chains)
+        pairs = [u for c in chain.chains_list for u in c.users]
+        yield ('Graph.__init__/{}'.format(label), None,
+               lambda network=network, capacities=capacities: Graph(network, funs, capacities))
+        # What a portfolio worker process unpickles before it starts
+        yield ('worker_pickle/{}'.format(label), None, 
+               lambda job=(graph, chain, funs, [model for _, model in heuristics]): pickle.loads(pickle.dumps(job)))
+        for name, model in heuristics:
+            yield ('{}/{}'.format(name, label), lambda graph=graph: (graph.make_empty_network(), graph.k_paths.clear()),
+                   lambda graph=graph, chain=chain, model=model:
+                       model.run(graph, chain, funs, alpha, chain.num(), batch_size, k, tune_param))
+        yield ('Graph.k_path/{}'.format(label), lambda graph=graph: graph.k_paths.clear(),
+               lambda graph=graph, pairs=pairs: [graph.k_path(s, d, k) for s, d in pairs])
+        yield ('Chains.read/{}'.format(label), None, lambda chain=chain, chains=chains: chain.read(chains))
+        if milp is not None and chain.num() <= milp_sparse_max_chains:
+            yield ('MILP_model.build/{}'.format(label), lambda graph=graph: graph.k_paths.clear(),
+                   lambda graph=graph, chain=chain: milp.build(graph, chain, funs, k, alpha, True))
+        if milp is not None and chain.num() <= milp_max_chains:
+            yield ('MILP_model.build_dense/{}'.format(label), lambda graph=graph: graph.k_paths.clear(),
+                   lambda graph=graph, chain=chain: milp.build(graph, chain, funs, k, alpha, False))
+        yield ('LowerBound.demand_bound/{}'.format(label), None,
+               lambda graph=graph, chain=chain: LowerBound.demand_bound(graph, chain, funs, k))
+        if relaxation:
+            yield ('LowerBound.relaxation_bound/{}'.format(label), None,
+                   lambda graph=graph, chain=chain: LowerBound.relaxation_bound(graph, chain, funs, k, alpha))
+        if chain.num() <= milp_sparse_max_chains:
+            yield ('MatrixBuilder.build/{}'.format(label), lambda graph=graph: graph.k_paths.clear(),
+                   lambda graph=graph, chain=chain: MatrixBuilder.build(graph, chain, funs, k, alpha))
+
+###############################################################
+# "measure": min and median wall time of repeat calls of body,
+#                                after one untimed warm-up call
+###############################################################
+def measure(setup, body, repeat):
+    times = []
+    for _ in range(repeat + 1):
+        if setup is not None:
+            setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            body()
+            times.append(time.perf_counter() - start)
+    return min(times[1:]), statistics.median(times[1:])
+
+###############################################################
+# "measure_memory": peak memory (MB) python allocates during one
+#                                               call of body
+###############################################################
+def measure_memory(setup, body):
+    if setup is not None:
+        setup()
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        try:
+            body()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return peak / 2 ** 20
+
+###############################################################
+# "history": earlier runs of this machine, case name -> best 
+#                                                        median
+###############################################################
+def history(path, machine):
+    best = {}
+    if not os.path.exists(path):
+        return best
+    with open(path) as history_file:
+        for line in history_file:
+            row = json.loads(line)
+            if row['machine'] == machine:
+                best[row['case']] = min(best.get(row['case'], row['median']), row['median'])
+    return best
+
+def revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--quick', action='store_true', help='smallest instances only, one timed repeat')
+    parser.add_argument('--check', action='store_true',
+                        help='exit with 1 if a case is slower than benchmark_tolerance over its best earlier run')
+    parser.add_argument('--case', help='only cases whose name contains this text')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    repeat = 1 if args.quick else args.repeat
+    machine = platform.node() + '/' + platform.python_version()
+    best = history(input_cons.path_benchmark_history, machine)
+    funs = Functions()
+    funs.read(input_cons.functions_random_path + input_cons.functions_random_name)
+    rows = []
+    regressions = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, setup, body in cases(funs, tmp_dir, args.quick):
+            if args.case and args.case not in name:
+                continue
+            fastest, median = measure(setup, body, repeat)
+            rows.append({'case': name, 'min': fastest, 'median': median, 'repeat': repeat,
+                         'machine': machine, 'revision': revision(), 'date': time.strftime('%Y-%m-%d %H:%M:%S')})
+            line = '{:<55} min {:9.4f}s  median {:9.4f}s'.format(name, fastest, median)
+            if name.startswith(memory_cases):
+                rows[-1]['peak_mb'] = measure_memory(setup, body)
+                line += '  peak {:8.1f}MB'.format(rows[-1]['peak_mb'])
+            if name in best:
+                line += '  ({:+.0%} vs best)'.format(median / best[name] - 1)
+                if median > best[name] * (1 + input_cons.benchmark_tolerance):
+                    regressions.append(name)
+            print(line)
+    if os.path.dirname(input_cons.path_benchmark_history):
+        os.makedirs(os.path.dirname(input_cons.path_benchmark_history), exist_ok=True)
+    with open(input_cons.path_benchmark_history, 'a') as history_file:
+        for row in rows:
+            history_file.write(json.dumps(row) + '\n')
+    if args.check and regressions:
+        print('regressions: {}'.format(', '.join(regressions)))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Validation of the MILP preprocessing against the plain model.
+
+Builds the MatrixBuilder model of the chains of the Data/ corpus as it
+is, reduced by Preprocess and reduced with aggregate, solves them with
+the HiGHS solver of scipy and prints, per model, its size and
+reductions, the objective, the solve time and the difference of the
+objective from the one of the plain model. Preprocess keeps the
+optimum, aggregate may lose it. The corpus has no interchangeable
+requests, --copies adds that many copies of every chain to make some.
+
+Run from the repository root (needs scipy):
+    python Benchmark/milp_preprocess.py [--chains 6 10] [--epochs 5]
+                                        [--copies 0] [--time-limit 300]
+"""
+###############################################################
+# Import packages
+###############################################################
+import sys
+sys.path.insert(0, './PaperFunctions')
+sys.path.insert(1, './Given')
+sys.path.insert(1, './Models')
+sys.path.insert(1, './Utils')
+import argparse
+import json
+import os
+import tempfile
+import time
+import InputConstants
+import MatrixBuilder
+from PaperFunctions import Graph, Chains, Functions
+
+input_cons = InputConstants.inputs()
+# label -> (reduce, aggregate) of build
+models = [('plain', False, False), ('preprocess', True, False), ('aggregate', True, True)]
+
+###############################################################
+# "with_copies": path of a chains file with copies more copies of
+#                every chain of chains_file, written to tmp_dir
+###############################################################
+def with_copies(chains_file, copies, tmp_dir):
+    with open(chains_file) as data_file:
+        data = json.load(data_file)
+    data['chains'] += [dict(chain, name='{}_{}'.format(chain['name'], n))
+                       for n in range(copies) for chain in data['chains']]
+    path = os.path.join(tmp_dir, os.path.basename(chains_file))
+    with open(path, 'w') as data_file:
+        json.dump(data, data_file)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--chains', type=int, nargs='+', default=[6, 10], help='chain counts of Data/')
+    parser.add_argument('--epochs', type=int, default=5, help='chains files of every chain count')
+    parser.add_argument('--copies', type=int, default=0, help='copies of every chain added')
+    parser.add_argument('--time-limit', type=float, default=300, help='seconds of every solve')
+    args = parser.parse_args()
+    k = input_cons.k_path_num[0]
+    alpha = input_cons.alpha[0]
+    funs = Functions()
+    funs.read(input_cons.functions_random_path + input_cons.functions_random_name)
+    graph = Graph(input_cons.network_path + input_cons.network_name, funs)
+    chain = Chains(graph, funs)
+    tmp_dir = tempfile.mkdtemp()
+    print('{:<22} {:<11} {:>6} {:>6} {:>6} {:>6} {:>6} {:>10} {:>9} {:>10}'.format(
+        'chains', 'model', 'vars', 'cons', 'aggr', 'sym', 'paths', 'objective', 'time(s)', 'vs plain'))
+    for n in args.chains:
+        for e in range(args.epochs):
+            chains_file = input_cons.chains_random_path + input_cons.chains_random_name + '{}_{}.json'.format(n, e)
+            chain.read(with_copies(chains_file, args.copies, tmp_dir) if args.copies else chains_file)
+            plain = None
+            for label, reduce, aggregate in models:
+                model = MatrixBuilder.build(graph, chain, funs, k, alpha, False, reduce, aggregate)
+                start_time = time.time()
+                x = model.solve(args.time_limit)
+                solve_time = time.time() - start_time
+                objective = model.c @ x if x is not None else float('nan')
+                if plain is None:
+                    plain = objective if model.optimal else float('nan')
+                _, aggregated, symmetry, removed = model.preprocessed.stats(graph, k)
+                print('{:<22} {:<11} {:>6} {:>6} {:>6} {:>6} {:>6} {:>10.6f} {:>9.2f} {:>10}'.format(
+                    os.path.basename(chains_file), label, model.nvariables(), model.nconstraints(), aggregated,
+                    symmetry, removed, objective, solve_time,
+                    '{:+.6f}'.format(objective - plain) if model.optimal else 'time limit'))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Quality versus time of the request orderings of HF.
+
+Runs heu_full_model with every ordering of Ordering.names(), and with
+best_of over the random ordering, on the chains of the Data/ corpus
+and prints, per ordering, the mean maximum CPU and link usage, the
+MILP objective and the mean time of a run.
+
+Run from the repository root:
+    python Benchmark/orderings.py [--chains 6 18 34 50] [--epochs 5]
+                                  [--restarts 8] [--workers 4]
+"""
+###############################################################
+# Import packages
+###############################################################
+import sys
+sys.path.insert(0, './PaperFunctions')
+sys.path.insert(1, './Given')
+sys.path.insert(1, './Models')
+sys.path.insert(1, './Utils')
+import argparse
+import contextlib
+import io
+import statistics
+import InputConstants
+import Ordering
+import Registry
+from Placement import Instance
+from PaperFunctions import Graph, Chains, Functions
+
+input_cons = InputConstants.inputs()
+
+###############################################################
+# "experiment": results of HF for one ordering over the corpus
+#               --->input:  restarts >>> 1 for the ordering alone,
+#                                   more for best_of from it
+#               --->output: list of PlacementResult
+###############################################################
+def experiment(graph, chain, funs, chains_files, ordering, restarts, workers):
+    k = input_cons.k_path_num[0]
+    alpha = input_cons.alpha[0]
+    model = Registry.create('HF', input_cons.heu_full_tune_param[0])
+    results = []
+    for chains_file in chains_files:
+        chain.read(chains_file)
+        instance = Instance(graph, chain, funs, k, alpha, input_cons.batch_size[0], chain.num())
+        graph.make_empty_network()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if restarts > 1:
+                results.append(Ordering.best_of(model, instance, graph, ordering, input_cons.ordering_seed,
+                                                restarts, workers))
+            else:
+                results.append(model.place(instance, graph, ordering, input_cons.ordering_seed))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--chains', type=int, nargs='+', default=[6, 18, 34, 50], help='chain counts of Data/')
+    parser.add_argument('--epochs', type=int, default=5, help='chains files of every chain count')
+    parser.add_argument('--restarts', type=int, default=8, help='runs of best_of')
+    parser.add_argument('--workers', type=int, default=1, help='processes of best_of')
+    args = parser.parse_args()
+    funs = Functions()
+    funs.read(input_cons.functions_random_path + input_cons.functions_random_name)
+    graph = Graph(input_cons.network_path + input_cons.network_name, funs)
+    chain = Chains(graph, funs)
+    chains_files = [input_cons.chains_random_path + input_cons.chains_random_name + '{}_{}.json'.format(n, e)
+                    for n in args.chains for e in range(args.epochs)]
+    runs = [(name, name, 1) for name in Ordering.names()]
+    runs.append(('best_of_{}'.format(args.restarts), input_cons.request_ordering, args.restarts))
+    # Fills the k path cache, so the first ordering doesn't pay for it
+    experiment(graph, chain, funs, chains_files, input_cons.request_ordering, 1, 1)
+    print('{:<16} {:>9} {:>9} {:>10} {:>10}'.format('ordering', 'maxCPU', 'maxlink', 'objective', 'time(s)'))
+    for label, ordering, restarts in runs:
+        results = experiment(graph, chain, funs, chains_files, ordering, restarts, args.workers)
+        print('{:<16} {:>9.2f} {:>9.2f} {:>10.2f} {:>10.4f}'.format(
+            label, statistics.mean(r.cpu_max for r in results), statistics.mean(r.link_max for r in results),
+            statistics.mean(Ordering.objective(r, input_cons.alpha[0]) for r in results),
+            statistics.mean(r.time for r in results)))
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,9 @@ Created on Sun Jan 27 17:58:40 2019
 @author: ali
 """
 class Inputs:
+    # Set on the shared object returned by inputs()
+    _frozen = False
+
     def __init__(self):
     ########################################
     #  Path and name of input files   
@@ -26,6 +29,12 @@ class Inputs:
         self.path_text_curve_versus_chain = 'Results/Text/curve/versus_chainNum/curve.txt'
         self.path_curve_heu = 'Results/Text/curve/versus_chainNum/curve_heu.txt'
         self.path_curve_MILP = 'Results/Text/curve/versus_chainNum/curve_MILP.txt' 
+        self.path_checkpoint = 'Results/checkpoint.sqlite'
+        self.path_result_cache = 'Results/result_cache.sqlite'
+        self.path_text_profile = 'Results/Text/profile.txt'
+        self.path_text_gap = 'Results/Text/gap.txt'
+        self.path_benchmark_history = 'Results/benchmark_history.jsonl'
+        self.result_cache_size = 256 * 2**20
         self.path_cplex =  "/home/zamani/CPLEX/cplex/bin/x86-64_linux/cplex"
         # "/home/zamani/Paper/cplex/cplex/bin/x86-64_linux/cplex"
         #  "/home/pervasive/Zamani/cplex/bin/x86-64_linux/cplex"
@@ -39,12 +48,30 @@ class Inputs:
         self.network_topology_link_name = 0
         self.network_topology_link_dis = 1
         self.network_topology_link_cap = 2
+        # Capacities of the nodes and links from the topology file, 
+        # instead of the uniform node_cpu, node_mem and link_cap
+        self.topology_capacities = False
         self.function_name = 0
         self.function_usage = 1
         self.cpu_usage = 0
         self.mem_usage = 1
 
         self.threads_num = 4
+        # Pool used by Graph.k_paths_batch ('thread' or 'process')
+        self.k_path_workers = 1
+        self.k_path_executor = 'thread'
+        # Worker processes running the approaches of one instance (1: serial)
+        self.portfolio_workers = 1
+        # Timers and counters of every model run (see Utils/Profiler.py)
+        self.profile = False
+        # Lower bound of every instance of the sweep, 'demand' or
+        # 'relaxation' (see Models/LowerBound.py), the optimality gaps
+        # of the approaches to it go to path_text_gap. None: no bound
+        self.lower_bound = None
+        # Seconds of the relaxation solve, the demand bound after them
+        self.lower_bound_time_limit = 60
+        # Allowed slowdown of a benchmark case over its best earlier run
+        self.benchmark_tolerance = 0.25
     ########################################
     # Creat chains parameters
     #######################################
@@ -73,6 +100,13 @@ class Inputs:
         self.node_mem = max(self.chains_num) * self.mem_range[1] * max(self.chains_func_num) * self.ban_range[1] /1
         self.link_cap = max(self.chains_num) * self.ban_range[1] /5.7
         #self.link_cap = max(self.chains_num) * self.ban_range[1] /4.5
+        # VNF instances shared across chains: a request joins the open
+        # instance of its function on a node while the instance has 
+        # traffic left of vnf_instance_capacity, and then doesn't pay 
+        # the vnf_instance_overhead share of the function's cpu and mem
+        self.vnf_sharing = False
+        self.vnf_instance_capacity = self.ban_range[1] * 4
+        self.vnf_instance_overhead = 0.3
         self.functions = ["NAT", "FW", "TM", "WOC", "IDPS", "VOC"]
         self.fun_num_range = [2, 5]
         # self.fun_num_range = [1, 2] 
@@ -87,6 +121,70 @@ class Inputs:
         #[0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
         #self.approaches = ('MILPB', 'HF')
         self.approaches = ('benchmark_first_routing_last_placement', 'benchmark_first_placement_last_routing', 'HF') 
+        # Modules that add approaches with Registry.register when imported
+        self.approach_plugins = []
         self.format = [ '.png']
         self.heu_full_tune_param = [0.005]
+        # (cpu, mem, bandwidth) weights of HFV, HF balancing all three
+        self.heu_vector_weights = (1.0, 1.0, 1.0)
+        # HF splits the bandwidth of requests with at least 
+        # heu_full_split_traffic traffic over its first heu_full_split_paths
+        # of the k paths, in heu_full_split_quanta parts (1 path: no split)
+        self.heu_full_split_paths = 1
+        self.heu_full_split_traffic = self.ban_range[1]
+        self.heu_full_split_quanta = 20
+        # Order in which HF and MILPB place the requests (Ordering.names())
+        self.request_ordering = 'traffic'
+        self.ordering_seed = 2019
+        # HF runs of best_of: the first in request_ordering, the others
+        # randomised, on ordering_workers processes
+        self.ordering_restarts = 1
+        self.ordering_workers = 1
+        # Window sizes of MILPB (its tune_param): None solves disjoint
+        # batches, a size over batch_size a rolling horizon
+        self.milp_batch_window = [None]
+        # Seconds of one MILP, MILPM or MILPB solve
+        self.milp_time_limit = 2000
+        # Target solve seconds of one MILPB batch: batches are sized by
+        # their variables to fit it (None: batch_size requests)
+        self.milp_batch_time_budget = None
+        # Weight of the newest solve in the seconds per variable
+        self.milp_batch_smoothing = 0.3
+        # Most requests of one such batch (None: no bound)
+        self.milp_batch_max_size = None
+        # MILP and MILPB models on sparse index sets, False builds the
+        # dense V x C x P x max_fun x S x D ones
+        self.milp_sparse = True
+        # Preprocess the requests of the sparse models: symmetry-breaking
+        # rows for interchangeable requests and no variables for paths
+        # no optimal solution needs
+        self.milp_preprocess = True
+        # Interchangeable requests share one placement instead of the
+        # symmetry-breaking rows, smaller but may miss the optimum
+        self.milp_aggregate = False
+        # MPS file MILPM writes its model to, None writes none
+        self.milp_mps_path = None
         # [round(i*0.1, 1) for i in range(1, 10)]
+
+    def __setattr__(self, name, value):
+        if self._frozen:
+            raise AttributeError('the shared inputs are read-only, use Inputs() for a private copy')
+        object.__setattr__(self, name, value)
+
+    # The shared object is pickled as a reference, worker processes 
+    # build their own copy once instead of unpickling it for each object
+    def __reduce_ex__(self, protocol):
+        if self._frozen:
+            return inputs, ()
+        return super().__reduce_ex__(protocol)
+
+###############################################################
+# "inputs": read-only Inputs shared by every class of the process
+###############################################################
+_inputs = None
+def inputs():
+    global _inputs
+    if _inputs is None:
+        _inputs = Inputs()
+        object.__setattr__(_inputs, '_frozen', True)
+    return _inputs
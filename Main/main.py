@@ -14,9 +14,12 @@ import sys
 sys.path.insert(0, './PaperFunctions')
 sys.path.insert(1, './Given')
 sys.path.insert(1, './Plot')
+sys.path.insert(1, './Utils')
 import InputConstants
 from PaperFunctions import Graph, Chains, Functions
 from Plot import Plot
+from Checkpoint import Checkpoint
+from ResultCache import ResultCache
 import time
 
 user_list = []
@@ -25,12 +28,16 @@ chain_list = []
 ###############################################################
 # Reading input files
 ###############################################################
-input_cons = InputConstants.Inputs()
+input_cons = InputConstants.inputs()
 funs = Functions()
 # funs.generate(randomFunc=True)
 funs.read(input_cons.functions_random_path + input_cons.functions_random_name) 
 graph = Graph(input_cons.network_path + input_cons.network_name, funs)
-plot = Plot()                 
+# Finished cells are kept here, a restarted sweep skips them
+checkpoint = Checkpoint(input_cons.path_checkpoint)
+# Results of earlier sweeps, reused for unchanged approaches
+cache = ResultCache(input_cons.path_result_cache, input_cons.result_cache_size)
+plot = Plot(checkpoint, cache)                 
 chain = Chains(graph, funs)
 #chain.generate(chain_num, funs, randomChain=True)
 #chain.user_generatore(0, forEachChain=True)
@@ -62,7 +69,7 @@ for a in A:
                         for alpha in input_cons.alpha:
                             print('#######')
                             print('number of chains: {}/ number of users: {} / KSP: {} / alpha:{} / bathc size: {} / epoch: {}/{}'.format(chain_num, chain_num, k, alpha, batch_size, i+1, input_cons.run_num)) 
-                            plot.run(input_cons.approaches, graph, chain, funs, k, alpha, batch_size, user_num)
+                            plot.run(input_cons.approaches, graph, chain, funs, k, alpha, batch_size, user_num, chain_num, i)
                 user_list.append(user_num)
                 chain_list.append(chain_num)
                # print(graph.node_list[0].cap_cpu)
@@ -72,3 +79,5 @@ for a in A:
             user_list = []
             chain_list = []
         
+# Stops the portfolio workers kept across the instances
+plot.close()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batches of requests sized by a solve time budget.
+
+The solve time of a batch grows with the size of its model, so batches
+are cut by the estimated number of variables of their model instead of
+by a fixed number of requests. The seconds per variable are learned
+online: the first batch takes the configured batch_size requests, and
+every solved batch moves the estimate toward its observed time with an
+exponentially weighted moving average.
+"""
+
+###############################################################
+# AdaptiveBatcher class:|
+#                       |__>functions:--> observe, variables_budget,
+#                                                          windows
+###############################################################
+class AdaptiveBatcher:
+    def __init__(self, budget, first_size, smoothing=0.3, max_size=None):
+        # Target solve seconds of one batch
+        self.budget = budget
+        # Requests of the first batch, before any solve is observed
+        self.first_size = first_size
+        # Weight of the newest observation in the moving average
+        self.smoothing = smoothing
+        # Most requests of one batch, None for no bound
+        self.max_size = max_size
+        self.seconds_per_variable = None
+
+    ###############################################################
+    # "observe": updates the seconds per variable with one solve
+    #               --->input:  variables >>> variables of the model
+    #                           seconds >>> its solve time
+    ###############################################################
+    def observe(self, variables, seconds):
+        rate = seconds / max(variables, 1)
+        if self.seconds_per_variable is None:
+            self.seconds_per_variable = rate
+        else:
+            self.seconds_per_variable += self.smoothing * (rate - self.seconds_per_variable)
+
+    def variables_budget(self):
+        if not self.seconds_per_variable:
+            return float('inf')
+        return self.budget / self.seconds_per_variable
+
+    ###############################################################
+    # "windows": (start, end, commit) of consecutive batches, in the
+    #            form of MILP_batch_model.windows. Each batch takes
+    #            at least one request and grows while its model fits
+    #            in the variables budget, and max_size requests at
+    #            most. Batches are cut lazily, so each one uses the
+    #            observations of the batches solved before it.
+    #               --->input:  requests >>> (chain name, user) of every
+    #                                   request, in placement order
+    #                           counter >>> function () -> object whose
+    #                             add(c, u) adds a request to a batch 
+    #                             and returns the variables of its 
+    #                             model, so a batch is counted in one
+    #                             pass
+    ###############################################################
+    def windows(self, requests, counter):
+        requests_num = len(requests)
+        start = 0
+        while start < requests_num:
+            max_end = requests_num if self.max_size is None else min(requests_num, start + self.max_size)
+            if self.seconds_per_variable is None:
+                end = min(start + self.first_size, max_end)
+            else:
+                variables = counter()
+                variables.add(*requests[start])
+                end = start + 1
+                while end < max_end and variables.add(*requests[end]) <= self.variables_budget():
+                    end += 1
+            yield start, end, end
+            start = end
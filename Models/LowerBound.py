@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lower bounds of the objective of the MILP, alpha * maximum CPU usage
++ (1 - alpha) * maximum link usage, for instances it can't solve.
+
+demand_bound() is combinatorial: every function takes its CPU on a
+node of the k paths of its request and every request its traffic on
+the links of one of them, so the maximum usages are at least the total
+demand over the capacity that can take it, the usage of the largest
+function on the largest node it can use, the smallest bottleneck of
+the paths of a request, and the load of the links every path of a
+request crosses. relaxation_bound() solves, with the HiGHS solver of
+scipy, the linear relaxation of the model where a request takes a
+fraction of each of its paths and puts fractions of its whole CPU
+demand on the nodes of any of them, without the seq and memory
+constraints and the capacity bounds. The two maximum usages are then
+two small LPs, each at least its demand bound.
+
+Both bound every placement of the requests on their k paths, whether
+it fits the capacities or not. With share, every function takes at 
+least that share of its CPU, as in a shared VNF instance, and with
+split_traffic the requests with that much traffic may spread it over
+their paths, so the bottleneck of a path doesn't bound them; 
+lower_bound() takes both from the inputs, so its bound holds for HF
+with vnf_sharing and split flows too. gap() is the optimality gap of a
+result to a bound.
+"""
+###############################################################
+# Import packages
+###############################################################
+import numpy as np
+
+methods = ('demand', 'relaxation')
+
+###############################################################
+# "_requests": distinct requests of chains as (chain, s, d, k paths,
+#              number of repeats), a repeated request loads the
+#              network once per repeat
+###############################################################
+def _requests(graph, chains, k):
+    graph.k_paths_batch([u for c in chains.chains_list for u in c.users], k)
+    repeats = {}
+    for c, chain in enumerate(chains.chains_list):
+        for (s, d) in chain.users:
+            repeats[(c, s, d)] = repeats.get((c, s, d), 0) + 1
+    return [(chains.chains_list[c], s, d, graph.k_path(s, d, k), repeated)
+            for (c, s, d), repeated in repeats.items() if graph.k_path(s, d, k)]
+
+###############################################################
+# "demand_bound": lower bounds of the maximum CPU and link usage
+#               --->input:  share >>> least share of its CPU a
+#                                   function takes
+#                           split_traffic >>> least traffic of the
+#                                   requests that may split, None if
+#                                   none does
+#               --->output: (t, t_prime) as fractions of capacity
+###############################################################
+def demand_bound(graph, chains, functions, k, share=1, split_traffic=None):
+    t = 0
+    t_prime = 0
+    cpu_demand = 0
+    # Traffic times the hops of the shortest path of every request
+    traffic_hops = 0
+    nodes = set()
+    links = set()
+    # Traffic on the links every path of its request crosses
+    crossed = np.zeros(graph.links_num())
+    for chain, s, d, P, repeated in _requests(graph, chains, k):
+        path_nodes = {graph.name_to_num_node(v) for path in P for v in path}
+        path_links = [{graph.name_to_num_link(l) for l in zip(path, path[1:])} for path in P]
+        nodes.update(path_nodes)
+        links.update(*path_links)
+        cpu = [functions.cpu_usage(f) * chain.tra * share for f in chain.fun]
+        cpu_demand += sum(cpu) * repeated
+        t = max(t, max(cpu, default=0) / max(graph.cap_cpu[v] for v in path_nodes))
+        traffic_hops += min(len(l) for l in path_links) * chain.tra * repeated
+        if split_traffic is None or chain.tra < split_traffic:
+            t_prime = max(t_prime, min(max((chain.tra / graph.link_ban[l] for l in path_link), default=0)
+                                       for path_link in path_links))
+        for l in set.intersection(*path_links):
+            crossed[l] += chain.tra * repeated
+    if nodes:
+        t = max(t, cpu_demand / graph.cap_cpu[list(nodes)].sum())
+    if links:
+        t_prime = max(t_prime, traffic_hops / graph.link_ban[list(links)].sum(), (crossed / graph.link_ban).max())
+    return t, t_prime
+
+###############################################################
+# "_min_max": smallest maximum of the rows when every request splits
+#             over its columns, in fractions that add up to 1
+#               --->input:  entries >>> (row, column, value) lists, 
+#                                   column j adds value to row
+#                           columns >>> number of columns of every
+#                                   request, in column order
+#                           lower >>> lower bound of the maximum, the
+#                                   result if the LP isn't solved
+###############################################################
+def _min_max(rows_num, entries, columns, lower, time_limit):
+    from scipy.optimize import linprog
+    from scipy.sparse import csr_array
+    if not columns:
+        return lower
+    # Column 0 is the maximum
+    size = sum(columns) + 1
+    A_ub = csr_array((entries[2] + [-1] * rows_num,
+                      (entries[0] + list(range(rows_num)), [col + 1 for col in entries[1]] + [0] * rows_num)),
+                     shape=(rows_num, size))
+    A_eq = csr_array((np.ones(size - 1), (np.repeat(np.arange(len(columns)), columns), np.arange(1, size))),
+                     shape=(len(columns), size))
+    objective = np.zeros(size)
+    objective[0] = 1
+    options = {} if time_limit is None else {'time_limit': time_limit}
+    # The min-max rows make the simplex crawl, interior point with its
+    # crossover is one to two orders of magnitude faster
+    result = linprog(objective, A_ub=A_ub, b_ub=np.zeros(rows_num), A_eq=A_eq, b_eq=np.ones(len(columns)),
+                     bounds=[(lower, None)] + [(0, 1)] * (size - 1), method='highs-ipm', options=options)
+    return result.fun if result.status == 0 else lower
+
+###############################################################
+# "relaxation_bound": lower bound of the objective from the linear
+#                     relaxation, where the maximum CPU and the 
+#                     maximum link usage are two LPs: a request puts
+#                     fractions of its CPU on the nodes of its paths
+#                     and fractions of its traffic on the paths. A
+#                     usage whose LP isn't solved in time_limit 
+#                     seconds is the demand bound. share and 
+#                     split_traffic as in demand_bound.
+###############################################################
+def relaxation_bound(graph, chains, functions, k, alpha, time_limit=None, share=1, split_traffic=None):
+    t, t_prime = demand_bound(graph, chains, functions, k, share, split_traffic)
+    node_entries = ([], [], [])
+    node_columns = []
+    link_entries = ([], [], [])
+    link_columns = []
+    # First link column of the request
+    col = 0
+    for chain, s, d, P, repeated in _requests(graph, chains, k):
+        cpu = sum(functions.cpu_usage(f) for f in chain.fun) * chain.tra * repeated * share
+        nodes = list(dict.fromkeys(graph.name_to_num_node(v) for path in P for v in path))
+        for v in nodes:
+            node_entries[0].append(v)
+            node_entries[1].append(len(node_entries[1]))
+            node_entries[2].append(cpu / graph.cap_cpu[v])
+        node_columns.append(len(nodes))
+        for p, path in enumerate(P):
+            for l in zip(path, path[1:]):
+                l = graph.name_to_num_link(l)
+                link_entries[0].append(l)
+                link_entries[1].append(col + p)
+                link_entries[2].append(chain.tra * repeated / graph.link_ban[l])
+        link_columns.append(len(P))
+        col += len(P)
+    t = _min_max(graph.nodes_num(), node_entries, node_columns, t, time_limit)
+    t_prime = _min_max(graph.links_num(), link_entries, link_columns, t_prime, time_limit)
+    return alpha * t + (1 - alpha) * t_prime
+
+###############################################################
+# "lower_bound": lower bound of the objective by one of methods, 
+#                for the VNF sharing of graph and the split flows
+#                of HF in its inputs
+###############################################################
+def lower_bound(graph, chains, functions, k, alpha, method, time_limit=None):
+    share = 1 - graph.input_cons.vnf_instance_overhead if graph.vnf_sharing else 1
+    split_traffic = graph.input_cons.heu_full_split_traffic if graph.input_cons.heu_full_split_paths > 1 else None
+    if method == 'demand':
+        t, t_prime = demand_bound(graph, chains, functions, k, share, split_traffic)
+        return alpha * t + (1 - alpha) * t_prime
+    if method == 'relaxation':
+        return relaxation_bound(graph, chains, functions, k, alpha, time_limit, share, split_traffic)
+    raise KeyError('unknown lower bound: {}'.format(method))
+
+###############################################################
+# "gap": optimality gap (%) of a result to a bound of the objective.
+#        result is a PlacementResult or its results tuple, whose
+#        usages are percentages
+###############################################################
+def gap(result, bound, alpha):
+    cpu_max, _, link_max = tuple(result)[:3]
+    objective = alpha * cpu_max + (1 - alpha) * link_max
+    return float(100 * (objective - 100 * bound) / objective) if objective else 0.0
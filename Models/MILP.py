@@ -7,14 +7,206 @@ Created on Siun Jan 27 16:44:41 2019
 from coopr.pyomo import *
 import time
 import InputConstants
-import matplotlib.pyplot as plt
+from Placement import Approach, PlacementResult
+import Metrics
+import Preprocess
 
-class MILP_model:
+###############################################################
+# "solver_seconds": solve time reported by the solver, if any
+###############################################################
+def solver_seconds(results):
+    for attr in ('wallclock_time', 'time', 'user_time'):
+        seconds = getattr(results.solver, attr, None)
+        if isinstance(seconds, (int, float)):
+            return seconds
+    return None
+
+###############################################################
+# "is_selected": True if a binary variable is 1 in the solution
+#                                           loaded into the model
+###############################################################
+def is_selected(var):
+    return var.value is not None and var.value > 0.5
+
+###############################################################
+# "request_assignment": path and function nodes of request (c, s, d)
+#                  in the solution loaded into model. Only b and the 
+#                  a on the nodes of the chosen path are read, the 
+#                  satisfy_req constraints keep every other a at 0.
+#                  In a sparse model the request may use the variables
+#                  of another one, on some of its paths only.
+#               --->input:  funs_num >>> number of functions of c
+#               --->output: (path number, node name of each function)
+#                           or None if no path is chosen
+###############################################################
+def request_assignment(model, c, s, d, k, funs_num):
+    P = model.k_path(s, d, k)
+    paths = range(len(P))
+    if hasattr(model, 'preprocessed'):
+        c, paths = model.preprocessed.variables(c, s, d)
+    for p in paths:
+        if is_selected(model.b[p, c, s, d]):
+            return p, [next((v for v in P[p] if is_selected(model.a[v, c, p, i, s, d])), None)
+                       for i in range(funs_num)]
+    return None
+
+###############################################################
+# "sparse_formulation": variables, objective and constraints of the
+#                 model on sparse index sets: a only on the nodes of
+#                 the path it belongs to and b only on the paths of
+#                 its request. In the dense sets every other a and b
+#                 is held at 0 by the satisfy_req constraints or
+#                 appears in no constraint, so the optimum is the
+#                 same. The constraints are fed by generators over
+#                 the terms of each node and link, with the function
+#                 of every a known, instead of sums over V x C x P x
+#                 max_fun x F x S x D. The requests are reduced by
+#                 Preprocess first, model.preprocessed keeps the
+#                 reductions.
+#               --->input:  model >>> with the sets V, C, R, nc and
+#                                     k_path
+#                           chain_of >>> function c -> chain object
+#                           loaded >>> adds the load already on graph
+#                           reduce, aggregate >>> see Preprocess
+#               --->output: none
+###############################################################
+def sparse_formulation(model, graph, functions, k, alpha, chain_of, loaded, reduce=False, aggregate=False):
+    M = 100000
+    a_index = {}
+    b_index = {}
+    model.preprocessed = Preprocess.preprocess(graph, functions, k,
+                                               [(c, s, d, chain_of(c)) for c in model.C for (s, d) in model.R[c]],
+                                               reduce, aggregate, loaded)
+    # node -> (a index, cpu, mem), link -> (b index, traffic). A request
+    # repeated in R[c] shares its variables and counts once per repeat
+    node_terms = {v: [] for v in model.V}
+    link_terms = {l: [] for l in range(graph.links_num())}
+    for c in model.C:
+        chain = chain_of(c)
+        usage = [(functions.cpu_usage(f) * chain.tra, functions.mem_usage(f) * chain.tra) for f in chain.fun]
+        for (s, d) in model.R[c]:
+            c_1, paths = model.preprocessed.variables(c, s, d)
+            P = model.k_path(s, d, k)
+            for p in paths:
+                path = P[p]
+                b_index[(p, c_1, s, d)] = None
+                for n in range(len(path) - 1):
+                    link_terms[graph.name_to_num_link((path[n], path[n + 1]))].append(((p, c_1, s, d), chain.tra))
+                for v in path:
+                    for i in range(model.nc[c]):
+                        a_index[(v, c_1, p, i, s, d)] = None
+                        node_terms[v].append(((v, c_1, p, i, s, d),) + usage[i])
+    model.a_index = Set(initialize=list(a_index), dimen=6)
+    model.b_index = Set(initialize=list(b_index), dimen=4)
+    model.t = Var(within=NonNegativeReals)
+    model.t_prime = Var(within=NonNegativeReals)
+    model.a = Var(model.a_index, within=Binary)
+    model.b = Var(model.b_index, within=Binary)
+    model.obj = Objective(expr=alpha * model.t + (1 - alpha) * model.t_prime, sense=minimize)
+
+    model.balance_CPU_cons = ConstraintList()
+    model.node_memory_cap_cons = ConstraintList()
+    for v in model.V:
+        node = graph.node_list[graph.name_to_num_node(v)]
+        model.balance_CPU_cons.add(sum(model.a[key] * cpu / node.cap_cpu for key, cpu, _ in node_terms[v])
+                                   + (node.cons_cpu if loaded else 0) <= model.t)
+        if node_terms[v]:
+            model.node_memory_cap_cons.add(sum(model.a[key] * mem / node.cap_mem for key, _, mem in node_terms[v])
+                                           + (node.cons_mem if loaded else 0) <= 1)
+    model.node_CPU_cap_cons = ConstraintList()
+    model.node_CPU_cap_cons.add(model.t <= 1)
+
+    model.link_balance_cons = ConstraintList()
+    for l, terms in link_terms.items():
+        model.link_balance_cons.add(sum(model.b[key] * tra / graph.link_list[l].ban for key, tra in terms)
+                                    + (graph.link_list[l].cons if loaded else 0) <= model.t_prime)
+    model.link_cap_cons = ConstraintList()
+    model.link_cap_cons.add(model.t_prime <= 1)
+
+    model.path_selection_cons = ConstraintList()
+    # One node of the path for every function of the chosen path
+    model.satisfy_req_cons = ConstraintList()
+    model.seq_cons = ConstraintList()
+    for c in model.C:
+        for (s, d) in dict.fromkeys(model.R[c]):
+            if model.preprocessed.representative[(c, s, d)] != (c, s, d):
+                continue
+            P = model.k_path(s, d, k)
+            paths = model.preprocessed.paths[(c, s, d)]
+            model.path_selection_cons.add(sum(model.b[p, c, s, d] for p in paths) == 1)
+            for p in paths:
+                for i in range(model.nc[c]):
+                    model.satisfy_req_cons.add(sum(model.a[v, c, p, i, s, d] for v in P[p]) == model.b[p, c, s, d])
+                for i in range(model.nc[c] - 1):
+                    for v_num in range(1, len(P[p])):
+                        model.seq_cons.add(sum(model.a[v_1, c, p, i_1, s, d]
+                                               for v_1 in P[p][: v_num]
+                                               for i_1 in range(i + 1, model.nc[c]))
+                                           <= M * (2 - model.b[p, c, s, d] - model.a[P[p][v_num], c, p, i, s, d]))
+    # Interchangeable requests choose their paths in order
+    model.symmetry_cons = ConstraintList()
+    for group in model.preprocessed.symmetric:
+        for (c_1, s, d), (c_2, _, _) in zip(group, group[1:]):
+            model.symmetry_cons.add(sum(p * model.b[p, c_1, s, d] for p in model.preprocessed.paths[(c_1, s, d)])
+                                    <= sum(p * model.b[p, c_2, s, d] for p in model.preprocessed.paths[(c_2, s, d)]))
+
+class MILP_model(Approach):
     def __init__(self):
-        self.input_cons = InputConstants.Inputs()
+        self.input_cons = InputConstants.inputs()
         
     def run(self, graph, chains, functions, k, alpha):
         start_time =time.time()
+        profiler = self.profiler
+        model = self.build(graph, chains, functions, k, alpha)
+        # Model build time includes the k path generation
+        profiler.add_time('build', time.time() - start_time)
+        if profiler.enabled:
+            profiler.count('variables', model.nvariables())
+            profiler.count('constraints', model.nconstraints())
+        opt = SolverFactory("cplex", executable=self.input_cons.path_cplex)
+        opt.options["threads"] = self.input_cons.threads_num
+        opt.options['timelimit'] = self.input_cons.milp_time_limit
+        with profiler.timer('solve'):
+            results = opt.solve(model)
+        if solver_seconds(results) is not None:
+            profiler.count('solver_seconds', solver_seconds(results))
+        extract_time = time.time()
+        self.placement = self.assignment(model, graph, chains, k)
+        cpu, mem, link = Metrics.utilisation(graph, chains, functions, k, self.placement)
+        node_cpu_cap = list(cpu * 100)
+        link_cap = list(link * 100)
+        links_num = int(Metrics.hops(graph, chains, k, self.placement).sum())
+        end_time = time.time()
+        profiler.add_time('extract', end_time - extract_time)
+        print('MILP: {}'.format(sum(node_cpu_cap)))
+        return max(node_cpu_cap), sum(node_cpu_cap)/len(node_cpu_cap), max(link_cap),\
+        sum(link_cap)/len(link_cap), end_time - start_time, links_num
+   
+    ###############################################################
+    # "assignment": path and function nodes of every request in the
+    #                                           solution of model
+    ###############################################################
+    def assignment(self, model, graph, chains, k):
+        placement = PlacementResult.empty(chains)
+        r = 0
+        for c in model.C:
+            for (s, d) in model.R[c]:
+                assignment = request_assignment(model, c, s, d, k, model.nc[c])
+                if assignment is not None:
+                    placement.assign_path(r, assignment[0])
+                    for i, v in enumerate(assignment[1]):
+                        if v is not None:
+                            placement.assign_fun(r, i, graph.name_to_num_node(v))
+                r += 1
+        return placement
+
+    ###############################################################
+    # "build": builds the MILP model of all requests without solving
+    #          it, on sparse index sets (sparse_formulation) unless 
+    #          sparse, or the milp_sparse input, is False
+    ###############################################################
+    def build(self, graph, chains, functions, k, alpha, sparse=None):
+        profiler = self.profiler
         M = 100000
         ##########################################
         # Define concrete model
@@ -33,6 +225,8 @@ class MILP_model:
         # Set of sources and destinations: S, D
         tmp = []
         # k_path function
+        with profiler.timer('k_path'):
+            graph.k_paths_batch([u for c in chains.chains_list for u in c.users], k, profiler=profiler)
         model.k_path = graph.k_path
         for c in chains.chains_list:
             for u in c.users:
@@ -67,6 +261,10 @@ class MILP_model:
         model.R = []
         for c in model.C:
             model.R.append(chains.chains_list[c].users)
+        if self.input_cons.milp_sparse if sparse is None else sparse:
+            sparse_formulation(model, graph, functions, k, alpha, lambda c: chains.chains_list[c], False,
+                               self.input_cons.milp_preprocess, self.input_cons.milp_aggregate)
+            return model
         # Set of IDs
         flag = 0
         model.phi = {}
@@ -220,40 +418,4 @@ class MILP_model:
                                                    <=
                                                    M * (2 - model.b[p, c, s, d] - model.a[v, c, p, i, s, d])
                                                    )
-        opt = SolverFactory("cplex", executable=self.input_cons.path_cplex)
-        opt.options["threads"] = self.input_cons.threads_num
-        opt.options['timelimit'] = 2000
-        results = opt.solve(model)
-
-        node_cpu_cap = []
-        node_mem_cap = []
-        cpu = 0
-        mem = 0
-        for v_num, v in enumerate(model.V):
-            for c in model.C:
-                for (s, d) in model.R[c]:
-                    for p in model.P:
-                        for i in range(model.nc[c]):
-                            for f in model.F:
-                                cpu += value(model.a[v, c, p, i, s, d]) * model.I[(f, i, c)] * model.nf[f] * chains.chains_list[c].tra
-                                mem += value(model.a[v, c, p, i, s, d]) * model.I[(f, i, c)] * model.mf[f] * chains.chains_list[c].tra
-            node_cpu_cap.append(cpu / graph.node_list[v_num].cap_cpu * 100)
-            node_mem_cap.append(mem / graph.node_list[v_num].cap_mem *100)
-            cpu = 0
-            mem = 0
-        link = 0
-        link_cap = []
-        links_num = 0
-        for l in model.L:
-            for c in model.C:
-                for (s, d) in model.R[c]:
-                    for p in range(len(model.k_path(s, d, k))):
-                        link += value(model.b[p, c, s, d]) * model.phi[(l, p, s, d)] * chains.chains_list[c].tra
-                        links_num += value(model.b[p, c, s, d])*model.phi[(l, p, s, d)]
-            link_cap.append(link / graph.link_list[l].ban * 100)
-            link = 0
-        end_time = time.time()
-        print('MILP: {}'.format(sum(node_cpu_cap)))
-        return max(node_cpu_cap), sum(node_cpu_cap)/len(node_cpu_cap), max(link_cap),\
-        sum(link_cap)/len(link_cap), end_time - start_time, links_num
-   
+        return model
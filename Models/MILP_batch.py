@@ -6,289 +6,220 @@ Created on Siun Jan 27 16:44:41 2019
 """
 from coopr.pyomo import *
 import time
+import random
 # import pyomo.environ as pyo
 import InputConstants
-import matplotlib.pyplot as plt
+from Placement import Approach, Instance, PlacementResult, requests
+import Metrics
+from MILP import solver_seconds, request_assignment, sparse_formulation
+from Batcher import AdaptiveBatcher
+import Ordering
 
+###############################################################
+# BatchVariables class: variables of the model build makes for a
+#                       batch that grows one request at a time,
+#                       updated by every request added
+#               |__>functions:--> add, count
+###############################################################
+class BatchVariables:
+    def __init__(self, graph, chains, k, sparse=True):
+        self.graph = graph
+        self.chains = chains
+        self.k = k
+        self.sparse = sparse
+        self.requests = set()
+        # a and b of the distinct requests of the sparse model
+        self.variables = 0
+        # Index sets of the dense model
+        self.nodes = set()
+        self.paths_num = 0
+        self.chain_names = set()
+        self.max_fun = 0
+        self.sources = set()
+        self.destinations = set()
+
+    def add(self, c, u):
+        if (c, tuple(u)) in self.requests:
+            return self.count()
+        self.requests.add((c, tuple(u)))
+        P = self.graph.k_path(u[0], u[1], self.k)
+        if self.sparse:
+            # a on the nodes of every path and b of every request
+            self.variables += sum(len(p) * self.chains.funs_num(c) + 1 for p in P)
+        else:
+            for p in P:
+                self.nodes.update(p)
+            self.paths_num = max(self.paths_num, len(P))
+            self.chain_names.add(c)
+            self.max_fun = max(self.max_fun, self.chains.funs_num(c))
+            self.sources.add(u[0])
+            self.destinations.add(u[1])
+        return self.count()
+
+    def count(self):
+        if self.sparse:
+            # t and t_prime
+            return self.variables + 2
+        # a, b, t and t_prime
+        return (len(self.nodes) * self.max_fun + 1) * len(self.chain_names) * self.paths_num \
+            * len(self.sources) * len(self.destinations) + 2
 
 # Must be changed
-class MILP_batch_model:
+class MILP_batch_model(Approach):
     def __init__(self):
-        self.input_cons = InputConstants.Inputs()
+        self.input_cons = InputConstants.inputs()
 
-    def run(self, graph, chains, functions, k, alpha, user_num, batch_size):
-        start_time =time.time()
-        chains_sorted = []
-        batch_chains = []
-        cnt = 0
-        batch_num = 0
-        nodes_set = []
-        sources = []
-        destinations = []
-        for c in chains.chains_list:
-            for u in c.users:
-                chains_sorted.append([c, u, c.cpu_usage * c.tra, c.tra])
-                
-        chains_sorted.sort(key=lambda x: x[2], reverse=True)
-        chains_sorted.sort(key=lambda x: x[3], reverse=True)
-        links_num = 0
-        for c, u, _, _ in chains_sorted:
-            batch_chains.append([c.name, u])
-            sources.append(u[0])
-            destinations.append(u[1])
-            for p in graph.k_path(u[0], u[1], k):
-                nodes_set.extend(p)
-            cnt += 1
-            if cnt == batch_size or cnt == user_num or (batch_num == user_num // batch_size and cnt == user_num % batch_size):               
-                batch_num += 1
-                M = 100000
-                tmp = []
-                model = ConcreteModel()
-                model.k_path = graph.k_path
-                for (s_1, d_1) in zip(sources, destinations):
-                    tmp.append(len(model.k_path(s_1, d_1, k)))
-                model.P = range(max(tmp))
-                nodes_set = list(dict.fromkeys(nodes_set))
-                sources = list(dict.fromkeys(sources))
-                destinations = list(dict.fromkeys(destinations))       
-                                                                        
-        
-                ##########################################
-                # Define concrete model
-                ###########################################
-               # model = ConcreteModel()
+    ###############################################################
+    # "place": solves the batches on the network state, tune_param
+    #          is the window size (see windows and Approach.place)
+    ###############################################################
+    def place(self, instance, state):
+        self.run(state, instance.chains, instance.functions, instance.k, instance.alpha,
+                 instance.user_num, instance.batch_size, self.tune_param)
+        return self.placement
 
-                ###########################################
-                # Sets
-                ###########################################
-                # Set of nodes: v
-                model.V = nodes_set
-                # Set of functions: F
-                model.F = range(functions.num())
-                # Set of chains: C
-                model.C = [c for c, _ in batch_chains]
-                model.C = list(dict.fromkeys(model.C))
-                # Set of sources: S
-                model.S = sources
-                # Set of distinations: D
-                model.D = destinations
-                # Set of K shortest paths: K_sd
-                #model.k_path = graph.k_path
-                # Set of k paths
-                #tmp = []
-                #for (s_1, d_1) in zip(model.S, model.D):
-                #    tmp.append(len(model.k_path(s_1, d_1, k)))
-                #model.P = range(max(tmp))
-                # Set of function of each chain
-                model.nc = {}
-                for c in model.C:
-                    model.nc[c] = chains.funs_num(c)
-                # cpus usage of each function
-                model.nf = []
-                for f in functions.functions_list.keys():
-                    model.nf.append(functions.cpu_usage(f))
-                # mem usage of each function
-                model.mf = []
-                for f in functions.functions_list.keys():
-                    model.mf.append(functions.mem_usage(f))
-                # Set of links
-                model.L = range(graph.links_num())
-                # Set of users
-                model.R = {}
-                for c, u in batch_chains:
-                    try:
-                        model.R[c].append(u) 
-                    except:
-                        model.R[c] = []
-                        model.R[c].append(u)
-                # Set of IDs
-                flag = 0
-                model.phi = {}
-                for c in model.C:
-                    for (s, d) in model.R[c]:
-                        P = model.k_path(s, d, k)
-                        for p in range(len(P)):
-                            for l in model.L:
-                                flag = 0
-                                for n in range(len(P[p]) - 1):
-                                    if (model.k_path(s, d, k)[p][n], model.k_path(s, d, k)[p][n + 1])\
-                                            == graph.link_list[l].name:
-                                        model.phi[(l, p, s, d)] = 1
-                                        flag = 1
-                                    elif flag == 0:
-                                        model.phi[(l, p, s, d)] = 0
-                model.I = {}
-                for c in model.C:
-                    for f_num, f_name in enumerate(functions.functions_list.keys()):
-                        for i in range(model.nc[c]):
-                            if chains.chains_list[chains.name_to_num(c)].fun[i] == f_name:
-                                model.I[(f_num, i, c)] = 1
-                            else:
-                                model.I[(f_num, i, c)] = 0
-                
-                ###########################################
-                # Variables
-                ###########################################
-                max_of_chain_function = max([model.nc[c] for c in model.C])
-                model.t = Var(within=NonNegativeReals)
-                model.t_prime = Var(within=NonNegativeReals)
-                model.a = Var(model.V, model.C, model.P, range(max_of_chain_function), model.S, model.D, within=Binary)
-                model.b = Var(model.P, model.C, model.S, model.D, within=Binary)
-                
-                ###########################################
-                # Objective function: min. t
-                ###########################################
-                model.obj = Objective(expr=alpha * model.t + (1 - alpha) * model.t_prime
-                                    , sense=minimize)
+    ###############################################################
+    # "assignment": writes the path and function nodes of the 
+    #               requests of one batch in the solution of model 
+    #                                                 to placement
+    #               --->input:  batch_requests >>> (chain name, user,
+    #                                   request number) of the batch
+    ###############################################################
+    def assignment(self, model, graph, batch_requests, placement, k):
+        for c, (s, d), r in batch_requests:
+            assignment = request_assignment(model, c, s, d, k, model.nc[c])
+            if assignment is not None:
+                placement.assign_path(r, assignment[0])
+                for i, v in enumerate(assignment[1]):
+                    if v is not None:
+                        placement.assign_fun(r, i, graph.name_to_num_node(v))
 
-                ###########################################
-                # Constraints
-                ##########################################
-                # 1st constraint
-                model.balance_CPU_cons = ConstraintList()
-                for v in model.V:
-                    v_num = graph.name_to_num_node(v)
-                    model.balance_CPU_cons.add(sum([model.a[v, c, p, i, s, d] *
-                                                    model.I[(f, i, c)] *
-                                                    model.nf[f] *
-                                                    chains.chains_list[chains.name_to_num(c)].tra /
-                                                    graph.node_list[v_num].cap_cpu
-                                                    for c in model.C
-                                                    for s, d in model.R[c]
-                                                    for p in model.P
-                                                    for i in range(model.nc[c])
-                                                    for f in model.F
-                                                    ]) +
-                                                    graph.node_list[v_num].cons_cpu
-                                                    <= model.t
-                                            )
-                
-                # 2nd constraint
-                model.node_CPU_cap_cons = ConstraintList()
-                model.node_CPU_cap_cons.add(model.t <= 1)
-                
-                # 3rd constraint
-                model.node_memory_cap_cons = ConstraintList()
-                for v in model.V:
-                    v_num = graph.name_to_num_node(v)
-                    model.node_memory_cap_cons.add(sum([model.a[v, c, p, i, s, d] *
-                                                        model.I[(f, i, c)] *
-                                                        model.mf[f] *
-                                                        chains.chains_list[chains.name_to_num(c)].tra /
-                                                        graph.node_list[v_num].cap_mem
-                                                        for c in model.C
-                                                        for (s, d) in model.R[c]
-                                                        for p in model.P
-                                                        for i in range(model.nc[c])
-                                                        for f in model.F
-                                                        ]) + 
-                                                        graph.node_list[v_num].cons_mem
-                                                <=
-                                                1)
-
-                # 4th constraint
-                model.link_balance_cons = ConstraintList()
-                for l in model.L:
-                    model.link_balance_cons.add(sum([model.b[p, c, s, d] *
-                                                    model.phi[(l, p, s, d)] *
-                                                    chains.chains_list[chains.name_to_num(c)].tra /
-                                                    graph.link_list[l].ban
-                                                    for c in model.C
-                                                    for (s, d) in model.R[c]
-                                                    for p in range(len(model.k_path(s, d, k)))
-                                                    ])+
-                                                    graph.link_list[l].cons
-                                                <=
-                                                model.t_prime
-                                                )
-                # 5th constraint
-                model.link_cap_cons = ConstraintList()
-                model.link_cap_cons.add(model.t_prime <= 1)
-                
-                # 6th constraint
-                model.path_selection_cons = ConstraintList()
-                for c in model.C:
-                    for (s, d) in model.R[c]:
-                        model.path_selection_cons.add(sum([model.b[p, c, s, d]
-                                                        for p in range(len(model.k_path(s, d, k)))
-                                                        ]) == 1
-                                                    )
-                
-                # 7th constraint
-                model.satisfy_req_2_cons = ConstraintList()
-                for c in model.C:
-                    for (s, d) in model.R[c]:
-                        for p in range(len(model.k_path(s, d, k))):
-                            for i in range(model.nc[c]):
+    ###############################################################
+    # "warm_start": sets the b and a of the requests of the window 
+    #               that were solved in the previous window to that
+    #               solution, as the MIP start of the solver
+    #               --->input:  overlap >>> placement of the requests
+    #                                   solved but not committed yet
+    #               --->output: number of warm-started requests
+    ###############################################################
+    def warm_start(self, model, graph, batch_requests, overlap, k):
+        warm = 0
+        for c, (s, d), r in batch_requests:
+            p = overlap.path[r]
+            if p < 0:
+                continue
+            c_1, paths = model.preprocessed.variables(c, s, d) if hasattr(model, 'preprocessed') \
+                else (c, range(len(model.k_path(s, d, k))))
+            # Preprocess dropped the path, the solver starts from scratch
+            if p not in paths:
+                continue
+            warm += 1
+            for p_1 in paths:
+                model.b[p_1, c_1, s, d].value = int(p_1 == p)
+            for i, v_num in enumerate(overlap.fun_node[overlap.fun_ptr[r]:overlap.fun_ptr[r + 1]]):
+                for v in model.k_path(s, d, k)[p]:
+                    model.a[v, c_1, p, i, s, d].value = int(v_num == graph.name_to_num_node(v))
+        return warm
 
-                                model.satisfy_req_2_cons.add(sum([
-                                    model.a[v, c, p, i, s, d]
-                                    for v in model.V
-                                ])
-                                                            <=
-                                                            model.b[p, c, s, d]
-                                                            )
+    ###############################################################
+    # "windows": (start, end, commit) of every window of the sorted
+    #            requests, requests start:end are solved together 
+    #            and start:commit are placed for good. Without a 
+    #            window, or one not larger than batch_size, the 
+    #            windows are disjoint batches of batch_size requests.
+    #            With a larger one the window holds window requests,
+    #            its first batch_size are committed and the next 
+    #            window starts after them (rolling horizon).
+    ###############################################################
+    @staticmethod
+    def windows(requests_num, user_num, batch_size, window=None):
+        if window is None or window <= batch_size:
+            cnt = 0
+            batch_num = 0
+            start = 0
+            for end in range(1, requests_num + 1):
+                cnt += 1
+                if cnt == batch_size or cnt == user_num or (batch_num == user_num // batch_size and cnt == user_num % batch_size):
+                    batch_num += 1
+                    yield start, end, end
+                    start = end
+                    cnt = 0
+            return
+        start = 0
+        while start < requests_num:
+            end = min(start + window, requests_num)
+            # Once the window reaches the last request it is all committed
+            commit = end if end == requests_num else start + batch_size
+            yield start, end, commit
+            start = commit
 
-                # 8th constraint
-                model.satisfy_req_3_cons = ConstraintList()
-                for c in model.C:
-                    for (s, d) in model.R[c]:
-                        P = model.k_path(s, d, k)
-                        for p in range(len(P)):
-                            for i in range(model.nc[c]):
-                                model.satisfy_req_3_cons.add(sum([
-                                    model.a[v, c, p, i, s, d]
-                                    for v in P[p]
+    ###############################################################
+    # "variables_num": number of variables of the model build makes 
+    #                  for batch_chains, without building it. Sparse
+    #                  models Preprocess reduces have fewer.
+    ###############################################################
+    @staticmethod
+    def variables_num(graph, chains, k, batch_chains, sparse=True):
+        variables = BatchVariables(graph, chains, k, sparse)
+        for c, u in batch_chains:
+            variables.add(c, u)
+        return variables.count()
 
-                                ])
-                                                            >=
-                                                            model.b[p, c, s, d]
-                                                            )
-                # 9th constraint:
-                model.seq_cons = ConstraintList()
-                for c in model.C:
-                    for (s, d) in model.R[c]:
-                        P = model.k_path(s, d, k)
-                        for p in range(len(P)):
-                            for i in range(model.nc[c] - 1):
-                                for v_num, v in enumerate(P[p]):
-                                    if v_num != 0:
-                                        model.seq_cons.add(sum([
-                                            model.a[v_1, c, p, i_1, s, d]
-                                            for v_1 in model.k_path(s, d, k)[p][: v_num]
-                                            for i_1 in range(i + 1, model.nc[c])
-                                        ])
-                                                        <=
-                                                        M * (2 - model.b[p, c, s, d] - model.a[v, c, p, i, s, d])
-                                                        )
-                opt = SolverFactory("cplex", executable=self.input_cons.path_cplex)
-                opt.options["threads"] = self.input_cons.threads_num
-                opt.options['timelimit'] = 2000
-                results = opt.solve(model)
-                node_cpu_cap = []
-                node_mem_cap = []
-                for v in model.V:
-                    v_num = graph.name_to_num_node(v)
-                    for c in model.C:
-                        for (s, d) in model.R[c]:
-                            for p in range(len(model.k_path(s, d, k))):
-                                for i in range(model.nc[c]):
-                                    for f in model.F:
-                                        graph.node_list[v_num].cons_cpu += value(model.a[v, c, p, i, s, d]) * model.I[(f, i, c)] * model.nf[f] * chains.chains_list[chains.name_to_num(c)].tra / graph.node_list[v_num].cap_cpu
-                                        graph.node_list[v_num].cons_mem += value(model.a[v, c, p, i, s, d]) * model.I[(f, i, c)] * model.mf[f] * chains.chains_list[chains.name_to_num(c)].tra / graph.node_list[v_num].cap_mem
-                link_cap = []
-                for l in model.L:
-                    for c in model.C:
-                        for (s, d) in model.R[c]:
-                            for p in range(len(model.k_path(s, d, k))):
-                                graph.link_list[l].cons += value(model.b[p, c, s, d]) * model.phi[(l, p, s, d)] * chains.chains_list[chains.name_to_num(c)].tra / graph.link_list[l].ban                     
-                                links_num += value(model.b[p, c, s, d])*model.phi[(l, p, s, d)]
-                                #*(len(model.k_path(s, d, k)[p])-1)
-                nodes_set = []
-                batch_chains = []
-                sources = []
-                destinations = []
-                cnt = 0
+    def run(self, graph, chains, functions, k, alpha, user_num, batch_size, window=None):
+        start_time =time.time()
+        profiler = self.profiler
+        chains_sorted = []
+        instance = Instance(graph, chains, functions, k, alpha, batch_size, user_num)
+        placement = PlacementResult.empty(chains)
+        # Solution of the requests solved but not committed yet
+        overlap = PlacementResult.empty(chains)
+        for r, (c, u) in enumerate(requests(chains)):
+            chains_sorted.append([c, u, c.cpu_usage * c.tra, c.tra, r])
+                
+        with profiler.timer('k_path'):
+            k_paths = graph.k_paths_batch([u for _, u, _, _, _ in chains_sorted], k, profiler=profiler)
+        chains_sorted = Ordering.order(self.input_cons.request_ordering, chains_sorted, graph, k_paths,
+                                       random.Random(self.input_cons.ordering_seed))
+        links_num = 0
+        batcher = None
+        if self.input_cons.milp_batch_time_budget is not None and window is None:
+            batcher = AdaptiveBatcher(self.input_cons.milp_batch_time_budget, batch_size,
+                                      self.input_cons.milp_batch_smoothing, self.input_cons.milp_batch_max_size)
+            windows = batcher.windows([(c.name, u) for c, u, _, _, _ in chains_sorted],
+                                      lambda: BatchVariables(graph, chains, k, self.input_cons.milp_sparse))
+        else:
+            windows = self.windows(len(chains_sorted), user_num, batch_size, window)
+        for start, end, commit in windows:
+            batch_requests = [(c.name, u, r) for c, u, _, _, r in chains_sorted[start:end]]
+            build_time = time.time()
+            model = self.build(graph, chains, functions, k, alpha, [[c, u] for c, u, _ in batch_requests])
+            profiler.add_time('build', time.time() - build_time)
+            profiler.count('batches')
+            if profiler.enabled:
+                profiler.count('variables', model.nvariables())
+                profiler.count('constraints', model.nconstraints())
+            opt = SolverFactory("cplex", executable=self.input_cons.path_cplex)
+            opt.options["threads"] = self.input_cons.threads_num
+            opt.options['timelimit'] = self.input_cons.milp_time_limit
+            warm = self.warm_start(model, graph, batch_requests, overlap, k)
+            profiler.count('warm_started', warm)
+            solve_time = time.time()
+            with profiler.timer('solve'):
+                results = opt.solve(model, warmstart=True) if warm else opt.solve(model)
+            solve_time = time.time() - solve_time
+            if solver_seconds(results) is not None:
+                profiler.count('solver_seconds', solver_seconds(results))
+            if batcher is not None:
+                batcher.observe(model.nvariables(), solver_seconds(results) or solve_time)
+            extract_time = time.time()
+            committed = batch_requests[:commit - start]
+            self.assignment(model, graph, committed, placement, k)
+            batch = [r for _, _, r in committed]
+            placement.replay(instance, graph, batch)
+            links_num += int(Metrics.hops(graph, chains, k, placement)[batch].sum())
+            # The rest of the window warm-starts the next one
+            self.assignment(model, graph, batch_requests[commit - start:], overlap, k)
+            profiler.add_time('extract', time.time() - extract_time)
     
         end_time = time.time()
         node_cpu_cap = []
@@ -302,6 +233,250 @@ class MILP_batch_model:
             link_cap.append(graph.link_list[l].cons * 100)
         
         print('MILP batch:', sum(node_cpu_cap))
-        return max(node_cpu_cap), sum(node_cpu_cap)/len(node_cpu_cap), max(link_cap), sum(link_cap)/len(link_cap), end_time - start_time, links_num 
-            
+        self.placement = placement.finish(graph, end_time - start_time, links_num)
+        return max(node_cpu_cap), sum(node_cpu_cap)/len(node_cpu_cap), max(link_cap), sum(link_cap)/len(link_cap), end_time - start_time, links_num
+
+    ###############################################################
+    # "build": builds the MILP model of the requests of one window on
+    #          top of the load already committed to graph
+    #          on sparse index sets (sparse_formulation) unless sparse,
+    #          or the milp_sparse input, is False
+    #               --->input:  batch_chains >>> [chain name, user] of 
+    #                                        the requests of the window
+    #               --->output: the model, not solved
+    ###############################################################
+    def build(self, graph, chains, functions, k, alpha, batch_chains, sparse=None):
+        nodes_set = []
+        sources = []
+        destinations = []
+        for _, u in batch_chains:
+            sources.append(u[0])
+            destinations.append(u[1])
+            for p in graph.k_path(u[0], u[1], k):
+                nodes_set.extend(p)
+        M = 100000
+        tmp = []
+        model = ConcreteModel()
+        model.k_path = graph.k_path
+        for (s_1, d_1) in zip(sources, destinations):
+            tmp.append(len(model.k_path(s_1, d_1, k)))
+        model.P = range(max(tmp))
+        nodes_set = list(dict.fromkeys(nodes_set))
+        sources = list(dict.fromkeys(sources))
+        destinations = list(dict.fromkeys(destinations))       
+                                                                
+
+        ##########################################
+        # Define concrete model
+        ###########################################
+       # model = ConcreteModel()
+
+        ###########################################
+        # Sets
+        ###########################################
+        # Set of nodes: v
+        model.V = nodes_set
+        # Set of functions: F
+        model.F = range(functions.num())
+        # Set of chains: C
+        model.C = [c for c, _ in batch_chains]
+        model.C = list(dict.fromkeys(model.C))
+        # Set of sources: S
+        model.S = sources
+        # Set of distinations: D
+        model.D = destinations
+        # Set of K shortest paths: K_sd
+        #model.k_path = graph.k_path
+        # Set of k paths
+        #tmp = []
+        #for (s_1, d_1) in zip(model.S, model.D):
+        #    tmp.append(len(model.k_path(s_1, d_1, k)))
+        #model.P = range(max(tmp))
+        # Set of function of each chain
+        model.nc = {}
+        for c in model.C:
+            model.nc[c] = chains.funs_num(c)
+        # cpus usage of each function
+        model.nf = []
+        for f in functions.functions_list.keys():
+            model.nf.append(functions.cpu_usage(f))
+        # mem usage of each function
+        model.mf = []
+        for f in functions.functions_list.keys():
+            model.mf.append(functions.mem_usage(f))
+        # Set of links
+        model.L = range(graph.links_num())
+        # Set of users
+        model.R = {}
+        for c, u in batch_chains:
+            try:
+                model.R[c].append(u) 
+            except:
+                model.R[c] = []
+                model.R[c].append(u)
+        if self.input_cons.milp_sparse if sparse is None else sparse:
+            sparse_formulation(model, graph, functions, k, alpha,
+                               lambda c: chains.chains_list[chains.name_to_num(c)], True,
+                               self.input_cons.milp_preprocess, self.input_cons.milp_aggregate)
+            return model
+        # Set of IDs
+        flag = 0
+        model.phi = {}
+        for c in model.C:
+            for (s, d) in model.R[c]:
+                P = model.k_path(s, d, k)
+                for p in range(len(P)):
+                    for l in model.L:
+                        flag = 0
+                        for n in range(len(P[p]) - 1):
+                            if (model.k_path(s, d, k)[p][n], model.k_path(s, d, k)[p][n + 1])\
+                                    == graph.link_list[l].name:
+                                model.phi[(l, p, s, d)] = 1
+                                flag = 1
+                            elif flag == 0:
+                                model.phi[(l, p, s, d)] = 0
+        model.I = {}
+        for c in model.C:
+            for f_num, f_name in enumerate(functions.functions_list.keys()):
+                for i in range(model.nc[c]):
+                    if chains.chains_list[chains.name_to_num(c)].fun[i] == f_name:
+                        model.I[(f_num, i, c)] = 1
+                    else:
+                        model.I[(f_num, i, c)] = 0
+        
+        ###########################################
+        # Variables
+        ###########################################
+        max_of_chain_function = max([model.nc[c] for c in model.C])
+        model.t = Var(within=NonNegativeReals)
+        model.t_prime = Var(within=NonNegativeReals)
+        model.a = Var(model.V, model.C, model.P, range(max_of_chain_function), model.S, model.D, within=Binary)
+        model.b = Var(model.P, model.C, model.S, model.D, within=Binary)
         
+        ###########################################
+        # Objective function: min. t
+        ###########################################
+        model.obj = Objective(expr=alpha * model.t + (1 - alpha) * model.t_prime
+                            , sense=minimize)
+
+        ###########################################
+        # Constraints
+        ##########################################
+        # 1st constraint
+        model.balance_CPU_cons = ConstraintList()
+        for v in model.V:
+            v_num = graph.name_to_num_node(v)
+            model.balance_CPU_cons.add(sum([model.a[v, c, p, i, s, d] *
+                                            model.I[(f, i, c)] *
+                                            model.nf[f] *
+                                            chains.chains_list[chains.name_to_num(c)].tra /
+                                            graph.node_list[v_num].cap_cpu
+                                            for c in model.C
+                                            for s, d in model.R[c]
+                                            for p in model.P
+                                            for i in range(model.nc[c])
+                                            for f in model.F
+                                            ]) +
+                                            graph.node_list[v_num].cons_cpu
+                                            <= model.t
+                                    )
+        
+        # 2nd constraint
+        model.node_CPU_cap_cons = ConstraintList()
+        model.node_CPU_cap_cons.add(model.t <= 1)
+        
+        # 3rd constraint
+        model.node_memory_cap_cons = ConstraintList()
+        for v in model.V:
+            v_num = graph.name_to_num_node(v)
+            model.node_memory_cap_cons.add(sum([model.a[v, c, p, i, s, d] *
+                                                model.I[(f, i, c)] *
+                                                model.mf[f] *
+                                                chains.chains_list[chains.name_to_num(c)].tra /
+                                                graph.node_list[v_num].cap_mem
+                                                for c in model.C
+                                                for (s, d) in model.R[c]
+                                                for p in model.P
+                                                for i in range(model.nc[c])
+                                                for f in model.F
+                                                ]) + 
+                                                graph.node_list[v_num].cons_mem
+                                        <=
+                                        1)
+
+        # 4th constraint
+        model.link_balance_cons = ConstraintList()
+        for l in model.L:
+            model.link_balance_cons.add(sum([model.b[p, c, s, d] *
+                                            model.phi[(l, p, s, d)] *
+                                            chains.chains_list[chains.name_to_num(c)].tra /
+                                            graph.link_list[l].ban
+                                            for c in model.C
+                                            for (s, d) in model.R[c]
+                                            for p in range(len(model.k_path(s, d, k)))
+                                            ])+
+                                            graph.link_list[l].cons
+                                        <=
+                                        model.t_prime
+                                        )
+        # 5th constraint
+        model.link_cap_cons = ConstraintList()
+        model.link_cap_cons.add(model.t_prime <= 1)
+        
+        # 6th constraint
+        model.path_selection_cons = ConstraintList()
+        for c in model.C:
+            for (s, d) in model.R[c]:
+                model.path_selection_cons.add(sum([model.b[p, c, s, d]
+                                                for p in range(len(model.k_path(s, d, k)))
+                                                ]) == 1
+                                            )
+        
+        # 7th constraint
+        model.satisfy_req_2_cons = ConstraintList()
+        for c in model.C:
+            for (s, d) in model.R[c]:
+                for p in range(len(model.k_path(s, d, k))):
+                    for i in range(model.nc[c]):
+
+                        model.satisfy_req_2_cons.add(sum([
+                            model.a[v, c, p, i, s, d]
+                            for v in model.V
+                        ])
+                                                    <=
+                                                    model.b[p, c, s, d]
+                                                    )
+
+        # 8th constraint
+        model.satisfy_req_3_cons = ConstraintList()
+        for c in model.C:
+            for (s, d) in model.R[c]:
+                P = model.k_path(s, d, k)
+                for p in range(len(P)):
+                    for i in range(model.nc[c]):
+                        model.satisfy_req_3_cons.add(sum([
+                            model.a[v, c, p, i, s, d]
+                            for v in P[p]
+
+                        ])
+                                                    >=
+                                                    model.b[p, c, s, d]
+                                                    )
+        # 9th constraint:
+        model.seq_cons = ConstraintList()
+        for c in model.C:
+            for (s, d) in model.R[c]:
+                P = model.k_path(s, d, k)
+                for p in range(len(P)):
+                    for i in range(model.nc[c] - 1):
+                        for v_num, v in enumerate(P[p]):
+                            if v_num != 0:
+                                model.seq_cons.add(sum([
+                                    model.a[v_1, c, p, i_1, s, d]
+                                    for v_1 in model.k_path(s, d, k)[p][: v_num]
+                                    for i_1 in range(i + 1, model.nc[c])
+                                ])
+                                                <=
+                                                M * (2 - model.b[p, c, s, d] - model.a[v, c, p, i, s, d])
+                                                )
+        return model
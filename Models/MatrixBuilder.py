@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+The MILP of MILP_model as CSR arrays, without Pyomo.
+
+build() assembles the formulation of MILP.sparse_formulation (the same
+variables, objective and constraints) directly into the arrays of a
+CSR matrix, so not a single Pyomo component is created.
+The matrix is written to a free MPS file that CPLEX, HiGHS, CBC or
+GLPK read, or solved in process by the HiGHS solver of
+scipy.optimize.milp when scipy is installed. MILP_matrix_model is the
+MILPM approach of the registry built on it.
+"""
+###############################################################
+# Import packages
+###############################################################
+import time
+import numpy as np
+import InputConstants
+import Metrics
+import Preprocess
+from Placement import Approach, PlacementResult, requests
+
+###############################################################
+# MatrixModel class: min c x  s.t.  A x (sense) rhs, with A in CSR
+#                    form and every variable but t and t_prime binary
+#   columns[j] >>> key of variable j: 't', 't_prime',
+#                  ('b', p, c, s, d) or ('a', v, c, p, i, s, d)
+#   sense[n] >>> 'L' (<=) or 'E' (==) of row n
+#   kind[n] >>> constraint of row n, index in row_kinds
+#                |__>functions:--> nvariables, nconstraints,
+#                                  write_mps, solve, assignment
+###############################################################
+class MatrixModel:
+    def __init__(self, columns, c, indptr, indices, data, sense, rhs, kind, b_cols, a_cols, k, preprocessed):
+        self.columns = columns
+        self.c = c
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.sense = sense
+        self.rhs = rhs
+        # Index in row_kinds of every row
+        self.kind = kind
+        # (p, c, s, d) -> column of b, (v, c, p, i, s, d) -> column of a
+        self.b_cols = b_cols
+        self.a_cols = a_cols
+        self.k = k
+        # Preprocess reductions the columns were made with
+        self.preprocessed = preprocessed
+        # Set by solve
+        self.optimal = False
+
+    def nvariables(self):
+        return len(self.columns)
+
+    def nconstraints(self):
+        return len(self.rhs)
+
+    # Row names of the MPS file, the constraint name and row number
+    def row_names(self):
+        return ['{}_{}'.format(row_kinds[kind], n) for n, kind in enumerate(self.kind.tolist())]
+
+    ###############################################################
+    # "write_mps": writes the model to path in free MPS format
+    ###############################################################
+    def write_mps(self, path):
+        names = [_column_name(key) for key in self.columns]
+        row_names = self.row_names()
+        # Entries of A in column order, from the CSR arrays
+        rows = np.repeat(np.arange(len(self.rhs)), np.diff(self.indptr))
+        order = np.argsort(self.indices, kind='stable')
+        cols_ptr = np.searchsorted(self.indices[order], np.arange(len(self.columns) + 1))
+        lines = ['NAME sfc', 'ROWS', ' N obj']
+        lines.extend(' {} {}'.format(sense, name) for sense, name in zip(self.sense, row_names))
+        lines.append('COLUMNS')
+        integer = False
+        for j, name in enumerate(names):
+            if (j >= 2) != integer:
+                integer = j >= 2
+                lines.append(" MARKER 'MARKER' '{}'".format('INTORG' if integer else 'INTEND'))
+            if self.c[j]:
+                lines.append(' {} obj {!r}'.format(name, float(self.c[j])))
+            for n in order[cols_ptr[j]:cols_ptr[j + 1]]:
+                lines.append(' {} {} {!r}'.format(name, row_names[rows[n]], float(self.data[n])))
+        if integer:
+            lines.append(" MARKER 'MARKER' 'INTEND'")
+        lines.append('RHS')
+        lines.extend(' rhs {} {!r}'.format(name, float(value)) for name, value in zip(row_names, self.rhs) if value)
+        lines.append('BOUNDS')
+        lines.extend(' BV bnd {}'.format(name) for name in names[2:])
+        lines.append('ENDATA')
+        with open(path, 'w') as mps_file:
+            mps_file.write('\n'.join(lines) + '\n')
+
+    ###############################################################
+    # "solve": optimal x with the HiGHS solver of scipy, None if no
+    #          solution was found in time_limit seconds. optimal
+    #          tells whether x was proven optimal.
+    ###############################################################
+    def solve(self, time_limit=None):
+        from scipy.optimize import milp, LinearConstraint, Bounds
+        from scipy.sparse import csr_array
+        A = csr_array((self.data, self.indices, self.indptr), shape=(len(self.rhs), len(self.columns)))
+        lower = np.where(self.sense == 'E', self.rhs, -np.inf)
+        integrality = np.ones(len(self.columns))
+        integrality[:2] = 0
+        upper = np.ones(len(self.columns))
+        upper[:2] = np.inf
+        options = {} if time_limit is None else {'time_limit': time_limit}
+        result = milp(self.c, constraints=LinearConstraint(A, lower, self.rhs), integrality=integrality,
+                      bounds=Bounds(np.zeros(len(self.columns)), upper), options=options)
+        self.optimal = result.status == 0
+        return result.x
+
+    ###############################################################
+    # "assignment": path and function nodes of every request in the
+    #                                            solution x
+    ###############################################################
+    def assignment(self, graph, chains, x):
+        placement = PlacementResult.empty(chains)
+        for r, (chain, (s, d)) in enumerate(requests(chains)):
+            c, paths = self.preprocessed.variables(chains.name_to_num(chain.name), s, d)
+            P = graph.k_path(s, d, self.k)
+            for p in paths:
+                if x[self.b_cols[(p, c, s, d)]] > 0.5:
+                    placement.assign_path(r, p)
+                    for i in range(len(chain.fun)):
+                        v = next((v for v in P[p] if x[self.a_cols[(v, c, p, i, s, d)]] > 0.5), None)
+                        if v is not None:
+                            placement.assign_fun(r, i, graph.name_to_num_node(v))
+                    break
+        return placement
+
+def _column_name(key):
+    return key if isinstance(key, str) else '_'.join(str(x) for x in key)
+
+# Names of the kinds of rows
+row_kinds = ('balance_CPU_cons', 'node_CPU_cap_cons', 'node_memory_cap_cons', 'link_balance_cons', 'link_cap_cons',
+             'path_selection_cons', 'satisfy_req_cons', 'seq_cons', 'symmetry_cons')
+SATISFY, SEQ = 6, 7
+
+###############################################################
+# "_path_block": CSR rows of the satisfy_req and seq constraints of
+#                one path of path_len nodes of a chain of funs_num
+#                functions. Columns are offsets from the b column of
+#                the path, its a columns follow it node by node, 
+#                function by function.
+#               --->output: (row lengths, column offsets, data, 
+#                            sense, rhs, kind) arrays
+###############################################################
+_path_blocks = {}
+def _path_block(path_len, funs_num, M):
+    if (path_len, funs_num, M) not in _path_blocks:
+        lengths, offsets, data, sense, rhs, kind = [], [], [], [], [], []
+        a = lambda v, i: 1 + v * funs_num + i
+        for i in range(funs_num):
+            offsets.extend([a(v, i) for v in range(path_len)] + [0])
+            data.extend([1] * path_len + [-1])
+            lengths.append(path_len + 1)
+            sense.append('E')
+            rhs.append(0)
+            kind.append(SATISFY)
+        for i in range(funs_num - 1):
+            for v_num in range(1, path_len):
+                cols = [a(v_1, i_1) for v_1 in range(v_num) for i_1 in range(i + 1, funs_num)]
+                offsets.extend(cols + [0, a(v_num, i)])
+                data.extend([1] * len(cols) + [M, M])
+                lengths.append(len(cols) + 2)
+                sense.append('L')
+                rhs.append(2 * M)
+                kind.append(SEQ)
+        _path_blocks[(path_len, funs_num, M)] = (np.array(lengths, dtype=np.int64), np.array(offsets, dtype=np.int64),
+                                                 np.array(data, dtype=float), np.array(sense), 
+                                                 np.array(rhs, dtype=float), np.array(kind, dtype=np.int8))
+    return _path_blocks[(path_len, funs_num, M)]
+
+###############################################################
+# "build": MatrixModel of all the requests of chains. The rows of 
+#          every kind of MILP.sparse_formulation are all there, the
+#          satisfy_req and seq ones of all paths of the same shape
+#          are made at once from _path_block
+#               --->input:  loaded >>> adds the load already on graph
+#                           reduce, aggregate >>> see Preprocess
+###############################################################
+def build(graph, chains, functions, k, alpha, loaded=False, reduce=False, aggregate=False):
+    M = 100000
+    graph.k_paths_batch([u for c in chains.chains_list for u in c.users], k)
+    columns = ['t', 't_prime']
+    b_cols = {}
+    a_cols = {}
+    # (path length, number of functions) -> b columns of the paths
+    shapes = {}
+    # Requests as (c, s, d, chain), repeats included: they share their
+    # variables and count once per repeat in the loads
+    chain_requests = [(c, s, d, chain) for c, chain in enumerate(chains.chains_list) for (s, d) in chain.users]
+    preprocessed = Preprocess.preprocess(graph, functions, k, chain_requests, reduce, aggregate, loaded)
+    # Requests with variables of their own
+    variable_requests = [(c, s, d, chain) for c, s, d, chain in dict.fromkeys(chain_requests)
+                         if preprocessed.representative[(c, s, d)] == (c, s, d)]
+    for c, s, d, chain in variable_requests:
+        P = graph.k_path(s, d, k)
+        for p in preprocessed.paths[(c, s, d)]:
+            path = P[p]
+            b_cols[(p, c, s, d)] = len(columns)
+            shapes.setdefault((len(path), len(chain.fun)), []).append(len(columns))
+            columns.append(('b', p, c, s, d))
+            for v in path:
+                for i in range(len(chain.fun)):
+                    a_cols[(v, c, p, i, s, d)] = len(columns)
+                    columns.append(('a', v, c, p, i, s, d))
+    # node -> a column -> cpu and mem of its function, link -> b column ->
+    # traffic. Columns shared by several requests add up their loads
+    node_cpu = [{} for _ in range(graph.nodes_num())]
+    node_mem = [{} for _ in range(graph.nodes_num())]
+    link_tra = [{} for _ in range(graph.links_num())]
+    for c, s, d, chain in chain_requests:
+        cpu = [functions.cpu_usage(f) * chain.tra for f in chain.fun]
+        mem = [functions.mem_usage(f) * chain.tra for f in chain.fun]
+        c_1, paths = preprocessed.variables(c, s, d)
+        P = graph.k_path(s, d, k)
+        for p in paths:
+            path = P[p]
+            b = b_cols[(p, c_1, s, d)]
+            for n in range(len(path) - 1):
+                l = graph.name_to_num_link((path[n], path[n + 1]))
+                link_tra[l][b] = link_tra[l].get(b, 0) + chain.tra
+            for n, v in enumerate(path):
+                v_num = graph.name_to_num_node(v)
+                for i, col in enumerate(range(b + 1 + n * len(cpu), b + 1 + (n + 1) * len(cpu))):
+                    node_cpu[v_num][col] = node_cpu[v_num].get(col, 0) + cpu[i]
+                    node_mem[v_num][col] = node_mem[v_num].get(col, 0) + mem[i]
+
+    lengths = []
+    indices = []
+    data = []
+    sense = []
+    rhs = []
+    kind = []
+    def add_row(cols, vals, row_sense, row_rhs, row_kind):
+        indices.extend(cols)
+        data.extend(vals)
+        lengths.append(len(cols))
+        sense.append(row_sense)
+        rhs.append(row_rhs)
+        kind.append(row_kind)
+
+    for v_num, node in enumerate(graph.node_list):
+        add_row(list(node_cpu[v_num]) + [0], [cpu / node.cap_cpu for cpu in node_cpu[v_num].values()] + [-1], 'L',
+                -node.cons_cpu if loaded else 0, 0)
+    add_row([0], [1], 'L', 1, 1)
+    for v_num, node in enumerate(graph.node_list):
+        if node_mem[v_num]:
+            add_row(list(node_mem[v_num]), [mem / node.cap_mem for mem in node_mem[v_num].values()], 'L',
+                    1 - node.cons_mem if loaded else 1, 2)
+    for l, link in enumerate(graph.link_list):
+        add_row(list(link_tra[l]) + [1], [tra / link.ban for tra in link_tra[l].values()] + [-1], 'L',
+                -link.cons if loaded else 0, 3)
+    add_row([1], [1], 'L', 1, 4)
+    for c, s, d, chain in variable_requests:
+        paths = preprocessed.paths[(c, s, d)]
+        add_row([b_cols[(p, c, s, d)] for p in paths], [1] * len(paths), 'E', 1, 5)
+    # Interchangeable requests choose their paths in order
+    for group in preprocessed.symmetric:
+        for (c_1, s, d), (c_2, _, _) in zip(group, group[1:]):
+            paths_1 = preprocessed.paths[(c_1, s, d)]
+            paths_2 = preprocessed.paths[(c_2, s, d)]
+            add_row([b_cols[(p, c_1, s, d)] for p in paths_1] + [b_cols[(p, c_2, s, d)] for p in paths_2],
+                    list(paths_1) + [-p for p in paths_2], 'L', 0, 8)
+    parts = [(np.array(lengths, dtype=np.int64), np.array(indices, dtype=np.int64), np.array(data, dtype=float),
+              np.array(sense), np.array(rhs, dtype=float), np.array(kind, dtype=np.int8))]
+    for (path_len, funs_num), b in shapes.items():
+        block_lengths, offsets, block_data, block_sense, block_rhs, block_kind = _path_block(path_len, funs_num, M)
+        b = np.array(b, dtype=np.int64)
+        parts.append((np.tile(block_lengths, len(b)), (b[:, None] + offsets[None, :]).ravel(),
+                      np.tile(block_data, len(b)), np.tile(block_sense, len(b)), np.tile(block_rhs, len(b)),
+                      np.tile(block_kind, len(b))))
+    lengths, indices, data, sense, rhs, kind = (np.concatenate(arrays) for arrays in zip(*parts))
+    indptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+
+    objective = np.zeros(len(columns))
+    objective[0] = alpha
+    objective[1] = 1 - alpha
+    return MatrixModel(columns, objective, indptr, indices.astype(np.int32), data, sense, rhs, kind,
+                       b_cols, a_cols, k, preprocessed)
+
+###############################################################
+# MILP_matrix_model class: MILP_model on a MatrixModel, solved by
+#                          scipy (HiGHS) and written to milp_mps_path
+#                          when it is set
+###############################################################
+class MILP_matrix_model(Approach):
+    def __init__(self):
+        self.input_cons = InputConstants.inputs()
+
+    def run(self, graph, chains, functions, k, alpha):
+        start_time = time.time()
+        profiler = self.profiler
+        with profiler.timer('build'):
+            model = build(graph, chains, functions, k, alpha, False, self.input_cons.milp_preprocess,
+                          self.input_cons.milp_aggregate)
+        if profiler.enabled:
+            profiler.count('variables', model.nvariables())
+            profiler.count('constraints', model.nconstraints())
+        if self.input_cons.milp_mps_path is not None:
+            model.write_mps(self.input_cons.milp_mps_path)
+        with profiler.timer('solve'):
+            x = model.solve(self.input_cons.milp_time_limit)
+        extract_time = time.time()
+        self.placement = model.assignment(graph, chains, x) if x is not None else PlacementResult.empty(chains)
+        cpu, mem, link = Metrics.utilisation(graph, chains, functions, k, self.placement)
+        node_cpu_cap = list(cpu * 100)
+        link_cap = list(link * 100)
+        links_num = int(Metrics.hops(graph, chains, k, self.placement).sum())
+        end_time = time.time()
+        profiler.add_time('extract', end_time - extract_time)
+        print('MILP matrix: {}'.format(sum(node_cpu_cap)))
+        return max(node_cpu_cap), sum(node_cpu_cap)/len(node_cpu_cap), max(link_cap),\
+        sum(link_cap)/len(link_cap), end_time - start_time, links_num
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Metrics of placements, computed on arrays.
+
+The load a placement puts on every node and link is gathered with a
+few numpy scatter-adds over the flat arrays of a PlacementResult
+instead of loops over nodes, chains, paths and functions. The
+statistics of a load vector (max, mean, percentiles, Jain fairness)
+are computed on the same arrays.
+"""
+###############################################################
+# Import packages
+###############################################################
+import numpy as np
+
+# Percentiles of the boxes of the box plots: max, quartiles and min
+box_percentiles = (100, 75, 50, 25, 0)
+
+###############################################################
+# "request_mask": boolean mask of the requests to count, all of
+#                                     them when requests is None
+###############################################################
+def request_mask(placement, requests=None):
+    mask = np.ones(len(placement.path), dtype=bool)
+    if requests is not None:
+        mask[:] = False
+        mask[np.asarray(requests, dtype=np.int64)] = True
+    return mask
+
+###############################################################
+# "request_paths": (path, traffic) of every path a request uses,
+#                  its share of the traffic on each path of a split
+###############################################################
+def request_paths(graph, c, u, k, placement, r):
+    k_path = graph.k_path(u[0], u[1], k)
+    shares = placement.split(r)
+    if shares is None:
+        return [(k_path[placement.path[r]], c.tra)]
+    return [(k_path[p], c.tra * share) for p, share in enumerate(shares.tolist()) if share > 0]
+
+###############################################################
+# "path_links": link numbers of the paths of every placed request
+#               --->input:  requests >>> request numbers to count,
+#                                        None for all of them
+#               --->output: (link numbers, traffic of each one)
+###############################################################
+def path_links(graph, chains, k, placement, requests=None):
+    mask = request_mask(placement, requests) & (placement.path >= 0)
+    links = []
+    tra = []
+    r = 0
+    for c in chains.chains_list:
+        for u in c.users:
+            if mask[r]:
+                for path, path_tra in request_paths(graph, c, u, k, placement, r):
+                    links.extend(graph.name_to_num_link((path[n], path[n + 1])) for n in range(len(path) - 1))
+                    tra.extend([path_tra] * (len(path) - 1))
+            r += 1
+    return np.array(links, dtype=np.int64), np.array(tra, dtype=float)
+
+###############################################################
+# "utilisation": used fraction of the cpu and mem of every node and
+#                of the bandwidth of every link by the placement
+#               --->input:  requests >>> request numbers to count,
+#                                        None for all of them
+#               --->output: (cpu, mem, link) arrays
+###############################################################
+def utilisation(graph, chains, functions, k, placement, requests=None):
+    funs_num = np.diff(placement.fun_ptr)
+    placed = np.repeat(request_mask(placement, requests), funs_num) & (placement.fun_node >= 0)
+    tra = np.repeat([c.tra for c in chains.chains_list for _ in c.users], funs_num)
+    cpu_usage = np.array([functions.cpu_usage(f) for c in chains.chains_list for _ in c.users for f in c.fun],
+                         dtype=float)
+    mem_usage = np.array([functions.mem_usage(f) for c in chains.chains_list for _ in c.users for f in c.fun],
+                         dtype=float)
+    nodes = placement.fun_node[placed]
+    # A function in a shared VNF instance consumes its fun_share
+    tra = tra[placed] * placement.fun_share[placed]
+    cpu = np.zeros(graph.nodes_num())
+    mem = np.zeros(graph.nodes_num())
+    np.add.at(cpu, nodes, cpu_usage[placed] * tra / graph.cap_cpu[nodes])
+    np.add.at(mem, nodes, mem_usage[placed] * tra / graph.cap_mem[nodes])
+    links, link_tra = path_links(graph, chains, k, placement, requests)
+    link = np.zeros(graph.links_num())
+    np.add.at(link, links, link_tra / graph.link_ban[links])
+    return cpu, mem, link
+
+###############################################################
+# "hops": number of links of the paths of every request, 0 for the
+#                                          ones that aren't placed
+###############################################################
+def hops(graph, chains, k, placement):
+    lengths = np.zeros(len(placement.path), dtype=np.int64)
+    r = 0
+    for c in chains.chains_list:
+        for u in c.users:
+            if placement.path[r] >= 0:
+                lengths[r] = sum(len(path) - 1 for path, _ in request_paths(graph, c, u, k, placement, r))
+            r += 1
+    return lengths
+
+###############################################################
+# "jain": Jain fairness index of values, 1 when they are all equal
+#                                and 1/n when one takes everything
+###############################################################
+def jain(values):
+    values = np.asarray(values, dtype=float)
+    square_sum = np.sum(values ** 2)
+    if square_sum == 0:
+        return 1.0
+    return float(np.sum(values) ** 2 / (len(values) * square_sum))
+
+###############################################################
+# "box": max, 3rd quartile, median, 1st quartile and min of values
+###############################################################
+def box(values):
+    return tuple(float(p) for p in np.percentile(values, box_percentiles))
+
+###############################################################
+# "summary": statistics of a load vector
+#               --->output: dictionary max, avg, p75, p50, p25, min,
+#                                                           jain
+###############################################################
+def summary(values):
+    values = np.asarray(values, dtype=float)
+    stats = dict(zip(('max', 'p75', 'p50', 'p25', 'min'), box(values)))
+    stats['avg'] = float(np.mean(values))
+    stats['jain'] = jain(values)
+    return stats
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Orders in which the approaches place the requests.
+
+An ordering is a function (requests, graph, k_paths, rnd) -> requests
+sorted in placement order, where every request is the list
+[chain, (source, destination), cpu_usage * tra, tra, request number]
+built by the approaches and k_paths maps a user to its k paths. More
+orderings are added with register(). best_of runs an approach with
+several seeds of a randomised ordering, in parallel, and keeps the
+best placement.
+"""
+###############################################################
+# Import packages
+###############################################################
+import copy
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# ordering name -> function
+_orderings = {}
+
+def register(name, ordering):
+    _orderings[name] = ordering
+
+def names():
+    return list(_orderings)
+
+###############################################################
+# "order": requests sorted by the ordering called name
+#               --->input:  rnd >>> random.Random of the randomised
+#                                                       orderings
+###############################################################
+def order(name, requests, graph, k_paths, rnd):
+    if name not in _orderings:
+        raise KeyError('unknown ordering: {}'.format(name))
+    return _orderings[name](requests, graph, k_paths, rnd)
+
+###############################################################
+# "traffic": by traffic, ties by cpu usage times traffic, both
+#            decreasing (the two stable sorts the approaches used)
+###############################################################
+def traffic(requests, graph, k_paths, rnd):
+    return sorted(requests, key=lambda x: (-x[3], -x[2]))
+
+###############################################################
+# "demand": by cpu usage times traffic, ties by traffic
+###############################################################
+def demand(requests, graph, k_paths, rnd):
+    return sorted(requests, key=lambda x: (-x[2], -x[3]))
+
+###############################################################
+# "bottleneck": by the largest share of a resource the request
+#               takes on its shortest path: the traffic over the
+#               narrowest link, which every flow crosses, or the
+#               cpu over the largest node, the best case as the
+#               functions can go to any node of the path. Requests
+#               without a path come last.
+###############################################################
+def bottleneck(requests, graph, k_paths, rnd):
+    def share(x):
+        if not k_paths[x[1]]:
+            return 0
+        path = k_paths[x[1]][0]
+        links = [graph.name_to_num_link((path[n], path[n + 1])) for n in range(len(path) - 1)]
+        nodes = [graph.name_to_num_node(v) for v in path]
+        link_share = x[3] / graph.link_ban[links].min() if links else 0
+        return max(link_share, x[2] / graph.cap_cpu[nodes].max())
+    return sorted(requests, key=lambda x: -share(x))
+
+def fifo(requests, graph, k_paths, rnd):
+    return list(requests)
+
+def shuffled(requests, graph, k_paths, rnd):
+    requests = list(requests)
+    rnd.shuffle(requests)
+    return requests
+
+register('traffic', traffic)
+register('demand', demand)
+register('bottleneck', bottleneck)
+register('fifo', fifo)
+register('random', shuffled)
+
+###############################################################
+# "objective": what best_of minimises, the objective of the MILP
+###############################################################
+def objective(result, alpha):
+    return alpha * result.cpu_max + (1 - alpha) * result.link_max
+
+def _restart(model, instance, state, ordering, seed):
+    return model.place(instance, state, ordering, seed)
+
+# Worker processes of best_of by number of workers, started on first
+# use and kept for the process, every instance reuses them
+_pools = {}
+def _pool(workers):
+    if workers not in _pools:
+        _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _pools[workers]
+
+###############################################################
+# "best_of": places instance on state with the best of restarts
+#            runs of model: the first with its own ordering, the
+#            others with the random one and seeds seed + 1, ...
+#            The runs go to workers processes, each on its own copy
+#            of state, and the best one is run again on state.
+#               --->input:  model >>> approach whose place takes
+#                                     (instance, state, ordering, seed)
+#               --->output: PlacementResult of the best run, its time
+#                           is the time of all the runs
+###############################################################
+def best_of(model, instance, state, ordering, seed, restarts, workers=1):
+    start_time = time.time()
+    runs = [(ordering, seed)] + [('random', seed + n) for n in range(1, restarts)]
+    if workers <= 1:
+        results = [_restart(model, instance, copy.deepcopy(state), ordering_n, seed_n) for ordering_n, seed_n in runs]
+    else:
+        results = list(_pool(workers).map(_restart, [model] * len(runs), [instance] * len(runs),
+                                          [state] * len(runs), *zip(*runs)))
+    best = min(range(len(runs)), key=lambda n: objective(results[n], instance.alpha))
+    result = model.place(instance, state, *runs[best])
+    result.time = time.time() - start_time
+    return result
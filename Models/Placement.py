@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Types shared by every approach of the registry.
+
+An approach is an object with a tune_param attribute and a method
+place(instance, state) -> PlacementResult. instance holds what is
+placed and the parameters of the run, state is the Graph whose consumed
+resources the placement adds to.
+"""
+###############################################################
+# Import packages
+###############################################################
+import numpy as np
+import Metrics
+from Profiler import Profiler
+
+###############################################################
+# Approach class: base of the approaches. Registry.create sets 
+#                 tune_param and a profiled run replaces profiler
+#                 with an enabled Profiler.
+###############################################################
+class Approach:
+    profiler = Profiler(enabled=False)
+    tune_param = None
+
+    ###############################################################
+    # "place": registry entry point, places the requests of instance
+    #          on the network state. This default is for models that
+    #          only read the network: run(graph, chains, functions, k,
+    #          alpha) returns the results tuple and sets placement,
+    #          which is then added to state.
+    ###############################################################
+    def place(self, instance, state):
+        results = self.run(state, instance.chains, instance.functions, instance.k, instance.alpha)
+        self.placement.replay(instance, state)
+        return self.placement.finish(state, results[4], results[5])
+
+###############################################################
+# Instance class: requests of one run and its parameters
+###############################################################
+class Instance:
+    def __init__(self, graph, chains, functions, k, alpha, batch_size, user_num):
+        self.graph = graph
+        self.chains = chains
+        self.functions = functions
+        self.k = k
+        self.alpha = alpha
+        self.batch_size = batch_size
+        self.user_num = user_num
+
+###############################################################
+# "requests": (chain, (source, destination)) of every request of
+#             chains, in the order placements index them
+###############################################################
+def requests(chains):
+    return [(c, u) for c in chains.chains_list for u in c.users]
+
+def _padded(share, columns):
+    return np.hstack((share, np.zeros((len(share), columns - share.shape[1]))))
+
+###############################################################
+# PlacementResult class: placement of every request and the load
+#                        of the network after it.
+#   path[r] >>> index in graph.k_path(s, d, k) of the path of 
+#               request r, -1 if it wasn't placed
+#   fun_node[fun_ptr[r] + i] >>> node number of function i of 
+#               request r, -1 if it wasn't placed
+#   fun_share[fun_ptr[r] + i] >>> share of the cpu and mem of 
+#               function i of request r it consumes, less than 1
+#               in a shared VNF instance (Graph.function_instance)
+#   share[r, p] >>> share of the traffic of request r on its path
+#               p, for requests split over several paths. A row of
+#               zeros (or no columns) means all of it on path[r]
+#   cpu, mem, link >>> used fraction of every node and link
+# The load metrics (%) unpack like the results tuple of run.
+###############################################################
+class PlacementResult:
+    fields = ('cpu_max', 'cpu_avg', 'link_max', 'link_avg', 'time', 'links_num')
+
+    def __init__(self, path, fun_ptr, fun_node, cpu=(), mem=(), link=(), time=0, links_num=0, share=(), fun_share=()):
+        self.path = np.asarray(path, dtype=np.int32)
+        self.fun_ptr = np.asarray(fun_ptr, dtype=np.int32)
+        self.fun_node = np.asarray(fun_node, dtype=np.int32)
+        self.fun_share = np.asarray(fun_share, dtype=float) if len(fun_share) else np.ones(len(self.fun_node))
+        self.share = np.asarray(share, dtype=float).reshape(len(self.path), -1) if len(share) \
+            else np.zeros((len(self.path), 0))
+        self.cpu = np.asarray(cpu, dtype=float)
+        self.mem = np.asarray(mem, dtype=float)
+        self.link = np.asarray(link, dtype=float)
+        self.time = time
+        self.links_num = links_num
+
+    ###############################################################
+    # "empty": placement of the requests of chains with nothing 
+    #                                                 placed yet
+    ###############################################################
+    @classmethod
+    def empty(cls, chains):
+        fun_ptr = np.zeros(len(requests(chains)) + 1, dtype=np.int32)
+        fun_ptr[1:] = np.cumsum([len(c.fun) for c, _ in requests(chains)])
+        return cls(np.full(len(fun_ptr) - 1, -1), fun_ptr, np.full(fun_ptr[-1], -1))
+
+    def assign_path(self, r, p):
+        self.path[r] = p
+
+    def assign_fun(self, r, i, node, share=1):
+        self.fun_node[self.fun_ptr[r] + i] = node
+        self.fun_share[self.fun_ptr[r] + i] = share
+
+    # shares of request r on every one of its k paths
+    def assign_share(self, r, shares):
+        if self.share.shape[1] < len(shares):
+            self.share = np.hstack((self.share, np.zeros((len(self.path), len(shares) - self.share.shape[1]))))
+        self.share[r] = 0
+        self.share[r, :len(shares)] = shares
+
+    ###############################################################
+    # "split": share of every path of request r, None when all its
+    #                                         traffic is on path[r]
+    ###############################################################
+    def split(self, r):
+        if self.share.shape[1] == 0 or not self.share[r].any():
+            return None
+        return self.share[r]
+
+    ###############################################################
+    # "finish": takes the load of the network from state once the 
+    #                                         placement is done
+    ###############################################################
+    def finish(self, state, time, links_num):
+        network = state.network_state()
+        self.cpu = np.array(network['cpu'], dtype=float)
+        self.mem = np.array(network['mem'], dtype=float)
+        self.link = np.array(network['link'], dtype=float)
+        self.time = time
+        self.links_num = links_num
+        return self
+
+    @property
+    def cpu_max(self):
+        return float(np.max(self.cpu * 100))
+
+    @property
+    def cpu_avg(self):
+        return float(np.mean(self.cpu * 100))
+
+    @property
+    def link_max(self):
+        return float(np.max(self.link * 100))
+
+    @property
+    def link_avg(self):
+        return float(np.mean(self.link * 100))
+
+    def as_tuple(self):
+        return tuple(getattr(self, f) for f in self.fields)
+
+    def __iter__(self):
+        return iter(self.as_tuple())
+
+    def __repr__(self):
+        return 'PlacementResult({})'.format(', '.join('{}={}'.format(f, getattr(self, f)) for f in self.fields))
+
+    ###############################################################
+    # "to_dict", "from_dict": json-serialisable form, for the 
+    #                                              results store
+    ###############################################################
+    def to_dict(self):
+        return {'path': self.path.tolist(), 'fun_ptr': self.fun_ptr.tolist(), 'fun_node': self.fun_node.tolist(),
+                'cpu': self.cpu.tolist(), 'mem': self.mem.tolist(), 'link': self.link.tolist(),
+                'time': self.time, 'links_num': self.links_num, 'share': self.share.tolist(),
+                'fun_share': self.fun_share.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    ###############################################################
+    # "loads": cpu, mem and link load the placement adds to the 
+    #          network of instance
+    #               --->input:  requests >>> request numbers to count,
+    #                                        None for all of them
+    ###############################################################
+    def loads(self, instance, requests=None):
+        return Metrics.utilisation(instance.graph, instance.chains, instance.functions, instance.k, self, requests)
+
+    ###############################################################
+    # "replay": adds the load of the placement to the network state
+    ###############################################################
+    def replay(self, instance, state, requests=None):
+        cpu, mem, link = self.loads(instance, requests)
+        for v, node in enumerate(state.node_list):
+            node.cons_cpu += float(cpu[v])
+            node.cons_mem += float(mem[v])
+        for l, network_link in enumerate(state.link_list):
+            network_link.cons += float(link[l])
+
+    ###############################################################
+    # "summary": statistics (%) of the cpu, mem and link loads
+    ###############################################################
+    def summary(self):
+        return {'cpu': Metrics.summary(self.cpu * 100), 'mem': Metrics.summary(self.mem * 100),
+                'link': Metrics.summary(self.link * 100)}
+
+    ###############################################################
+    # "diff": numbers of the requests whose path, function nodes or
+    #         function shares differ in the other placement
+    ###############################################################
+    def diff(self, other):
+        request_of_fun = np.repeat(np.arange(len(self.path)), np.diff(self.fun_ptr))
+        changed = self.path != other.path
+        changed[request_of_fun[(self.fun_node != other.fun_node) | (self.fun_share != other.fun_share)]] = True
+        columns = max(self.share.shape[1], other.share.shape[1])
+        if columns:
+            changed |= (_padded(self.share, columns) != _padded(other.share, columns)).any(axis=1)
+        return np.flatnonzero(changed)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reductions of the requests of a sparse MILP before it is built.
+
+Requests with the same source, destination, functions, traffic and
+number of repeats are interchangeable: swapping their placements gives
+the same loads, so the solver meets every solution once per ordering
+of them. preprocess() finds them and either adds symmetry-breaking
+rows that order their path numbers, which keeps the optimum, or, with
+aggregate, gives them one set of variables and counts their load once
+per request, as the model already does for a request repeated in a
+chain. The second is smaller but forces them onto the same placement.
+It also drops the k paths of a request that no feasible solution can
+choose, a link of which can't carry its traffic or none of the nodes
+of which can host one of its functions, which keeps the optimum too.
+"""
+###############################################################
+# Preprocessed class: the reductions of the requests of one model
+#   representative[(c, s, d)] >>> request whose variables (c, s, d)
+#                                 uses, itself unless aggregated
+#   paths[(c, s, d)] >>> numbers of its k paths that get variables,
+#                        keys are representatives
+#   symmetric >>> lists of interchangeable representatives, their
+#                 path numbers are made non-decreasing in list order
+#               |__>functions:--> variables
+###############################################################
+class Preprocessed:
+    def __init__(self, representative, paths, symmetric):
+        self.representative = representative
+        self.paths = paths
+        self.symmetric = symmetric
+
+    ###############################################################
+    # "variables": chain and path numbers of the variables of request
+    #                                                   (c, s, d)
+    ###############################################################
+    def variables(self, c, s, d):
+        c = self.representative[(c, s, d)][0]
+        return c, self.paths[(c, s, d)]
+
+    ###############################################################
+    # "stats": number of requests, of requests that use the variables
+    #          of another, of symmetry-breaking rows and of paths
+    #                                                     removed
+    ###############################################################
+    def stats(self, graph, k):
+        aggregated = sum(key != rep for key, rep in self.representative.items())
+        removed = sum(len(graph.k_path(s, d, k)) - len(paths) for (_, s, d), paths in self.paths.items())
+        return len(self.representative), aggregated, sum(len(group) - 1 for group in self.symmetric), removed
+
+###############################################################
+# "_feasible": False if no solution can choose path for a request of
+#              chain repeated times: a link can't carry its traffic,
+#              or no node of the path can host one of its functions
+###############################################################
+def _feasible(graph, functions, chain, repeated, path, loaded):
+    tra = chain.tra * repeated
+    for n in range(len(path) - 1):
+        link = graph.link_list[graph.name_to_num_link((path[n], path[n + 1]))]
+        if tra / link.ban + (link.cons if loaded else 0) > 1:
+            return False
+    nodes = [graph.node_list[graph.name_to_num_node(v)] for v in path]
+    for f in chain.fun:
+        cpu = functions.cpu_usage(f) * tra
+        mem = functions.mem_usage(f) * tra
+        if not any(cpu / node.cap_cpu + (node.cons_cpu if loaded else 0) <= 1
+                   and mem / node.cap_mem + (node.cons_mem if loaded else 0) <= 1 for node in nodes):
+            return False
+    return True
+
+###############################################################
+# "preprocess": reductions of the requests of a model
+#               --->input:  chain_requests >>> (c, s, d, chain) of
+#                                   every request, repeats included
+#                           reduce >>> False keeps every request and
+#                                   path as it is
+#                           aggregate >>> interchangeable requests
+#                                   share their variables
+#                           loaded >>> the load already on graph
+#                                   counts in the feasibility of paths
+#               --->output: Preprocessed
+###############################################################
+def preprocess(graph, functions, k, chain_requests, reduce=True, aggregate=False, loaded=False):
+    repeats = {}
+    chain_of = {}
+    for c, s, d, chain in chain_requests:
+        repeats[(c, s, d)] = repeats.get((c, s, d), 0) + 1
+        chain_of[(c, s, d)] = chain
+    representative = {key: key for key in repeats}
+    paths = {}
+    symmetric = []
+    if not reduce:
+        for c, s, d in repeats:
+            paths[(c, s, d)] = range(len(graph.k_path(s, d, k)))
+        return Preprocessed(representative, paths, symmetric)
+    groups = {}
+    for (c, s, d), repeated in repeats.items():
+        chain = chain_of[(c, s, d)]
+        groups.setdefault((s, d, tuple(chain.fun), chain.tra, repeated), []).append((c, s, d))
+    for (s, d, _, _, repeated), group in groups.items():
+        load = repeated
+        if aggregate:
+            # The aggregated requests all load the chosen path
+            load *= len(group)
+            for key in group:
+                representative[key] = group[0]
+            group = group[:1]
+        elif len(group) > 1:
+            symmetric.append(group)
+        P = graph.k_path(s, d, k)
+        feasible = [p for p in range(len(P)) if _feasible(graph, functions, chain_of[group[0]], load, P[p], loaded)]
+        # A request with no feasible path leaves the model infeasible
+        # whatever is removed, it keeps them all for the solver to say
+        for key in group:
+            paths[key] = feasible if feasible else range(len(P))
+    return Preprocessed(representative, paths, symmetric)
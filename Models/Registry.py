@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Approaches by name.
+
+Every approach is registered with its name, the module and class that
+implement it, the label of its plots and the grid of its tuning
+parameter. The module of an approach is imported the first time the
+approach is created, so the heuristics never pull in Pyomo and a
+process only pays for the approaches it runs. Modules listed in the
+approach_plugins input register more approaches with register().
+"""
+###############################################################
+# Import packages
+###############################################################
+import importlib
+import InputConstants
+
+# approach name -> (module, class, label, grid)
+_approaches = {}
+_plugins_loaded = False
+
+###############################################################
+# "register": adds an approach to the registry
+#               --->input:  name >>> approach name used in the sweep
+#                           module, cls >>> where the approach class is
+#                           label >>> name in the plots
+#                           grid >>> function of the inputs returning
+#                                    the tune_param values to run,
+#                                    None for a single untuned run
+#               --->output: none
+###############################################################
+def register(name, module, cls, label=None, grid=None):
+    _approaches[name] = (module, cls, label or name, grid)
+
+def _load_plugins():
+    global _plugins_loaded
+    if not _plugins_loaded:
+        _plugins_loaded = True
+        for plugin in InputConstants.inputs().approach_plugins:
+            importlib.import_module(plugin)
+
+def _entry(name):
+    _load_plugins()
+    if name not in _approaches:
+        raise KeyError('unknown approach: {}'.format(name))
+    return _approaches[name]
+
+###############################################################
+# "names": names of all registered approaches
+###############################################################
+def names():
+    _load_plugins()
+    return list(_approaches)
+
+def label(name):
+    return _entry(name)[2]
+
+###############################################################
+# "jobs": (approach, tune_param) of every run of the approaches
+#                                   in approach_list, in its order
+###############################################################
+def jobs(approach_list):
+    jobs = []
+    for name in approach_list:
+        grid = _entry(name)[3]
+        for tune_param in grid(InputConstants.inputs()) if grid is not None else [None]:
+            jobs.append((name, tune_param))
+    return jobs
+
+###############################################################
+# "model_class": class of an approach, its module is imported on
+#                                                     first use
+###############################################################
+def model_class(name):
+    module, cls, _, _ = _entry(name)
+    return getattr(importlib.import_module(module), cls)
+
+###############################################################
+# "create": new model object of an approach for one tune_param
+###############################################################
+def create(name, tune_param=None):
+    model = model_class(name)()
+    model.tune_param = tune_param
+    return model
+
+register('HF', 'heu_full', 'heu_full_model', label='LB-FH',
+         grid=lambda inputs: inputs.heu_full_tune_param)
+register('HFV', 'heu_full', 'heu_vector_model', label='LB-FH-V',
+         grid=lambda inputs: inputs.heu_full_tune_param)
+register('MILPB', 'MILP_batch', 'MILP_batch_model', label='B-MILP',
+         grid=lambda inputs: inputs.milp_batch_window)
+register('MILP', 'MILP', 'MILP_model', label='MILP')
+register('MILPM', 'MatrixBuilder', 'MILP_matrix_model', label='MILP-M')
+# The benchmarks don't use tune_param, their cells are keyed by the last one
+register('benchmark_first_routing_last_placement', 'firstRoutingLastPlacementBenchmark', 'benchmark_first',
+         label='FRLP', grid=lambda inputs: inputs.heu_full_tune_param[-1:])
+register('benchmark_first_placement_last_routing', 'firstPlacementLastRoutingBenchmark', 'benchmark_second',
+         label='FPLR', grid=lambda inputs: inputs.heu_full_tune_param[-1:])
@@ -1,25 +1,44 @@
-from coopr.pyomo import *
 import  time
+import numpy as np
 import InputConstants
+from Placement import Approach, PlacementResult, requests
 
-class benchmark_second:
+class benchmark_second(Approach):
+    # Fewest k paths simulated on a numpy matrix, the per-step numpy
+    # overhead makes fewer paths faster one at a time
+    vector_min_paths = 32
     def __init__(self):
-        self.input_cons = InputConstants.Inputs()
+        self.input_cons = InputConstants.inputs()
+    ###############################################################
+    # "place": runs the benchmark on the network state, it doesn't
+    #          use tune_param (see Approach.place)
+    ###############################################################
+    def place(self, instance, state):
+        self.run(state, instance.chains, instance.functions, instance.alpha,
+                 instance.user_num, instance.batch_size, instance.k, self.tune_param)
+        return self.placement
+
     def run(self, graph, chains, function, alpha, user_num, batch_size, k, tune_param): 
         start_time = time.time()
+        profiler = self.profiler
         node_cpu_cap = []
         node_mem_cap = []
         batch_chain = []
         links_num = 0
-        for c in chains.chains_list:
-            for u in c.users:
-                batch_chain.append([c, u, c.cpu_usage * c.tra, c.tra])
+        placement = PlacementResult.empty(chains)
+        for r, (c, u) in enumerate(requests(chains)):
+            batch_chain.append([c, u, c.cpu_usage * c.tra, c.tra, r])
         # batch_chain.sort(key=lambda x: x[2], reverse=True)
         # batch_chain.sort(key=lambda x: x[3], reverse=True)
-        for chain, u, _, _ in batch_chain:
-            k_path = graph.k_path(u[0], u[1], k)
-            link_num = self.__node_selection(graph, chain, k_path, function, tune_param)
+        with profiler.timer('k_path'):
+            k_paths = graph.k_paths_batch([u for _, u, _, _, _ in batch_chain], k, profiler=profiler)
+        for chain, u, _, _, r in batch_chain:
+            k_path = k_paths[u]
+            profiler.count('paths_scored', len(k_path))
+            with profiler.timer('node_selection'):
+                link_num = self.__node_selection(graph, chain, k_path, function, tune_param, placement, r)
             links_num += link_num
+        profiler.count('requests', len(batch_chain))
         for v in range(graph.nodes_num()):
             node_cpu_cap.append(graph.node_list[v].cons_cpu * 100)
             node_mem_cap.append(graph.node_list[v].cons_mem * 100)
@@ -28,11 +47,67 @@ class benchmark_second:
             link_cap.append(graph.link_list[l].cons * 100)
         end_time = time.time()
         print('second benchmark:', sum(node_cpu_cap))
+        self.placement = placement.finish(graph, end_time - start_time, links_num)
         return max(node_cpu_cap), sum(node_cpu_cap)/len(node_cpu_cap), max(link_cap),\
-        sum(node_cpu_cap)/len(node_cpu_cap), end_time - start_time, links_num
+        sum(link_cap)/len(link_cap), end_time - start_time, links_num
+
+    ###############################################################
+    # "__simulate": greedy placement of the functions of c on every
+    #               path of k_path at once, on a matrix of the cpu 
+    #               load of the path nodes padded to the longest path.
+    #               Each function goes to the first node holding the
+    #               smallest load from the node of the last function
+    #               on, read off a suffix minimum of the rows; a 
+    #               function that lands on the last node takes the 
+    #               rest of the chain with it. The load of a function
+    #               is added when the next one is placed, so the last
+    #               one placed before the end of a path isn't counted.
+    #               --->output: (position in the path of each function
+    #                            of each path, max load of each path)
+    ###############################################################
+    def __simulate(self, graph, c, k_path, functions):
+        if len(k_path) < self.vector_min_paths:
+            return self.__simulate_paths(graph, c, k_path, functions)
+        lengths = np.array([len(path) for path in k_path])
+        valid = np.arange(lengths.max()) < lengths[:, None]
+        nodes = np.zeros(valid.shape, dtype=np.int64)
+        nodes[valid] = [graph.name_num_node[v] for path in k_path for v in path]
+        cons_cpu = np.array([node.cons_cpu for node in graph.node_list])
+        nodes_cons = np.where(valid, cons_cpu[nodes], np.inf)
+        cap = graph.cap_cpu[nodes]
+        loads = [functions.cpu_usage(f) * c.tra for f in c.fun]
+        # Flat indices of the rows, the loads are updated on raveled views
+        width = valid.shape[1]
+        offsets = np.arange(len(k_path)) * width
+        cons_flat = nodes_cons.ravel()
+        cap_flat = cap.ravel()
+        fun_pos = np.zeros((len(k_path), len(c.fun)), dtype=np.int64)
+        # Position of the last placed function, fixed once a path is done
+        v = np.zeros(len(k_path), dtype=np.int64)
+        live = np.ones(len(k_path), dtype=bool)
+        for i in range(len(c.fun)):
+            if i != 0:
+                at = offsets + v
+                # Adding 0.0 leaves the loads of the done paths as they are
+                cons_flat[at] += live * (loads[i - 1] / cap_flat[at])
+            # Suffix minimum of the rows, reversed
+            suffix_min = np.minimum.accumulate(nodes_cons[:, ::-1], axis=1).ravel()
+            v = np.where(live, np.argmax(nodes_cons == suffix_min[offsets + width - 1 - v][:, None], axis=1), v)
+            fun_pos[:, i] = v
+            done = np.flatnonzero(live & (v == lengths - 1))
+            if len(done):
+                at = offsets[done] + v[done]
+                for j in range(i, len(c.fun)):
+                    cons_flat[at] += loads[j] / cap_flat[at]
+                live[done] = False
+        return fun_pos, np.where(valid, nodes_cons, -np.inf).max(axis=1)
 
-    def __node_selection(self, graph, c, k_path, functions, tune_param):
-        placements_list = []
+    ###############################################################
+    # "__simulate_paths": __simulate one path at a time, on lists
+    ###############################################################
+    def __simulate_paths(self, graph, c, k_path, functions):
+        fun_pos = []
+        max_in_each_path = []
         for path in k_path:
             placements = []
             v = 0
@@ -40,21 +115,23 @@ class benchmark_second:
             nodes_cons = [graph.node_list[graph.name_to_num_node(v)].cons_cpu for v in path]
             while( i < len(c.fun)):
                 if i != 0:
-                    p = placements[-1]
-                    nodes_cons[p[0]] += (functions.cpu_usage(c.fun[p[1]]) * c.tra / graph.node_list[graph.name_to_num_node(path[p[0]])].cap_cpu)
+                    nodes_cons[placements[-1]] += (functions.cpu_usage(c.fun[i - 1]) * c.tra / graph.node_list[graph.name_to_num_node(path[placements[-1]])].cap_cpu)
                 v = nodes_cons.index(min(nodes_cons[v:])) 
                 if len(path)==v+1:
                     for j in range(i, len(c.fun)):
-                        placements.append([v, j])
+                        placements.append(v)
                         nodes_cons[v] += (functions.cpu_usage(c.fun[j]) * c.tra / graph.node_list[graph.name_to_num_node(path[v])].cap_cpu)
                     i = len(c.fun)
                 else:
-                    placements.append([v, i])
+                    placements.append(v)
                     i += 1
-            placements_list.append((placements, nodes_cons))
-        max_in_each_path = []
-        for p in placements_list:
-            max_in_each_path.append(max(p[1]))
+            fun_pos.append(placements)
+            max_in_each_path.append(max(nodes_cons))
+        return fun_pos, max_in_each_path
+
+    def __node_selection(self, graph, c, k_path, functions, tune_param, placement, r):
+        fun_pos, max_in_each_path = self.__simulate(graph, c, k_path, functions)
+        max_in_each_path = list(max_in_each_path)
         min_path = min(max_in_each_path)
         link_cons_max = []
         link_cons_list = []
@@ -67,12 +144,11 @@ class benchmark_second:
                     link_cons_list.append(graph.link_list[l].cons)
                 link_cons_max.append([m, max(link_cons_list)])
         idx = min(link_cons_max, key=lambda x: x[1])[0]
-        placements = placements_list[idx]
-        for p in placements[0]:
-            v = p[0]
-            i = p[1]
+        placement.assign_path(r, idx)
+        for i, v in enumerate(list(fun_pos[idx])):
             graph.node_list[graph.name_to_num_node(k_path[idx][v])].cons_cpu += functions.cpu_usage(c.fun[i]) * c.tra / graph.node_list[graph.name_to_num_node(k_path[idx][v])].cap_cpu
             graph.node_list[graph.name_to_num_node(k_path[idx][v])].cons_mem += functions.mem_usage(c.fun[i]) * c.tra / graph.node_list[graph.name_to_num_node(k_path[idx][v])].cap_mem
+            placement.assign_fun(r, i, graph.name_to_num_node(k_path[idx][v]))
         for n in range(len(k_path[idx])-1):
             l = graph.name_to_num_link((k_path[idx][n], k_path[idx][n+1]))
             graph.link_list[l].cons += c.tra / graph.link_list[l].ban
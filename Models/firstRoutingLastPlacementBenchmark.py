@@ -1,26 +1,102 @@
-from coopr.pyomo import *
 import  time
 import InputConstants
+from Placement import Approach, PlacementResult, requests
+from bisect import insort
 
-class benchmark_first:
+###############################################################
+# PathLoads class: cpu load of the nodes of a path by position, in
+#                  a min segment tree and a map of every load to 
+#                  the sorted positions holding it
+#                  |__>functions:--> update, suffix_min, least_loaded
+###############################################################
+class PathLoads:
+    def __init__(self, loads):
+        self.loads = list(loads)
+        self.size = 1
+        while self.size < len(self.loads):
+            self.size *= 2
+        self.tree = [float('inf')] * (2 * self.size)
+        self.tree[self.size:self.size + len(self.loads)] = self.loads
+        for n in range(self.size - 1, 0, -1):
+            self.tree[n] = min(self.tree[2 * n], self.tree[2 * n + 1])
+        self.positions = {}
+        for pos, load in enumerate(self.loads):
+            self.positions.setdefault(load, []).append(pos)
+
+    def update(self, pos, load):
+        positions = self.positions[self.loads[pos]]
+        positions.remove(pos)
+        if not positions:
+            del self.positions[self.loads[pos]]
+        insort(self.positions.setdefault(load, []), pos)
+        self.loads[pos] = load
+        n = pos + self.size
+        self.tree[n] = load
+        n //= 2
+        while n:
+            self.tree[n] = min(self.tree[2 * n], self.tree[2 * n + 1])
+            n //= 2
+
+    # min of the loads of positions v and after
+    def suffix_min(self, v):
+        low = v + self.size
+        high = 2 * self.size
+        least = float('inf')
+        while low < high:
+            if low & 1:
+                least = min(least, self.tree[low])
+                low += 1
+            if high & 1:
+                high -= 1
+                least = min(least, self.tree[high])
+            low //= 2
+            high //= 2
+        return least
+
+    ###############################################################
+    # "least_loaded": first position of the whole path holding the
+    #                 least load of positions v and after, as 
+    #                 loads.index(min(loads[v:])) 
+    ###############################################################
+    def least_loaded(self, v):
+        return self.positions[self.suffix_min(v)][0]
+
+class benchmark_first(Approach):
     def __init__(self):
-        self.input_cons = InputConstants.Inputs()
+        self.input_cons = InputConstants.inputs()
+    ###############################################################
+    # "place": runs the benchmark on the network state, it doesn't
+    #          use tune_param (see Approach.place)
+    ###############################################################
+    def place(self, instance, state):
+        self.run(state, instance.chains, instance.functions, instance.alpha,
+                 instance.user_num, instance.batch_size, instance.k, self.tune_param)
+        return self.placement
+
     def run(self, graph, chains, function, alpha, user_num, batch_size, k, tune_param): 
         start_time = time.time()
+        profiler = self.profiler
         node_cpu_cap = []
         node_mem_cap = []
         batch_chain = []
         links_num = 0
-        for c in chains.chains_list:
-            for u in c.users:
-                batch_chain.append([c, u, c.cpu_usage * c.tra, c.tra])
+        placement = PlacementResult.empty(chains)
+        for r, (c, u) in enumerate(requests(chains)):
+            batch_chain.append([c, u, c.cpu_usage * c.tra, c.tra, r])
         # batch_chain.sort(key=lambda x: x[2], reverse=True)
         # batch_chain.sort(key=lambda x: x[3], reverse=True)
-        for chain, u, _, _ in batch_chain:
-            k_path = graph.k_path(u[0], u[1], k)
-            path_num, link_num= self.__path_selection(graph, k_path, function, chain, alpha)
+        with profiler.timer('k_path'):
+            k_paths = graph.k_paths_batch([u for _, u, _, _, _ in batch_chain], k, profiler=profiler)
+        for chain, u, _, _, r in batch_chain:
+            k_path = k_paths[u]
+            profiler.count('paths_scored', len(k_path))
+            with profiler.timer('path_selection'):
+                path_num, link_num= self.__path_selection(graph, k_path, function, chain, alpha)
             links_num += link_num
-            self.__node_selection(graph, chain, k_path[path_num], function, tune_param)
+            placement.assign_path(r, path_num)
+            with profiler.timer('node_selection'):
+                self.__node_selection(graph, chain, k_path[path_num], function, tune_param, placement, r)
+        profiler.count('requests', len(batch_chain))
         for v in range(graph.nodes_num()):
             node_cpu_cap.append(graph.node_list[v].cons_cpu * 100)
             node_mem_cap.append(graph.node_list[v].cons_mem * 100)
@@ -29,8 +105,9 @@ class benchmark_first:
             link_cap.append(graph.link_list[l].cons * 100)
         end_time = time.time()
         print('first benchmark:', sum(node_cpu_cap))
+        self.placement = placement.finish(graph, end_time - start_time, links_num)
         return max(node_cpu_cap), sum(node_cpu_cap)/len(node_cpu_cap), max(link_cap),\
-        sum(node_cpu_cap)/len(node_cpu_cap), end_time - start_time, links_num
+        sum(link_cap)/len(link_cap), end_time - start_time, links_num
         
     def __path_selection(self, graph, k_path, function, c, alpha):
         path_cost =[]
@@ -48,19 +125,22 @@ class benchmark_first:
             graph.link_list[l].cons += c.tra / graph.link_list[l].ban
         return idx, len(k_path[idx])-1
 
-    def __node_selection(self, graph, c, path, functions, tune_param):
+    def __node_selection(self, graph, c, path, functions, tune_param, placement, r):
+        nodes_cons = PathLoads(graph.node_list[graph.name_to_num_node(v)].cons_cpu for v in path)
         v = 0
         i = 0
         while( i < len(c.fun)):    
-            nodes_cons = [graph.node_list[graph.name_to_num_node(v)].cons_cpu for v in path]
-            v = nodes_cons.index(min(nodes_cons[v:])) 
+            v = nodes_cons.least_loaded(v)
             if len(path)==v+1:
                 for j in range(i, len(c.fun)):
                     graph.node_list[graph.name_to_num_node(path[v])].cons_cpu += functions.cpu_usage(c.fun[j]) * c.tra / graph.node_list[graph.name_to_num_node(path[v])].cap_cpu
                     graph.node_list[graph.name_to_num_node(path[v])].cons_mem += functions.mem_usage(c.fun[j]) * c.tra / graph.node_list[graph.name_to_num_node(path[v])].cap_mem    
+                    placement.assign_fun(r, j, graph.name_to_num_node(path[v]))
                 i = len(c.fun)
             else:
                 graph.node_list[graph.name_to_num_node(path[v])].cons_cpu += functions.cpu_usage(c.fun[i]) * c.tra / graph.node_list[graph.name_to_num_node(path[v])].cap_cpu
                 graph.node_list[graph.name_to_num_node(path[v])].cons_mem += functions.mem_usage(c.fun[i]) * c.tra / graph.node_list[graph.name_to_num_node(path[v])].cap_mem
+                placement.assign_fun(r, i, graph.name_to_num_node(path[v]))
+                nodes_cons.update(v, graph.node_list[graph.name_to_num_node(path[v])].cons_cpu)
                 i += 1
                 
\ No newline at end of file
@@ -1,28 +1,194 @@
-from coopr.pyomo import *
 import  time
+import math
+import random
+import numpy as np
+import Ordering
 import InputConstants
+from Placement import Approach, PlacementResult, requests
 
+# max plus mean of every segment of values, the segments starting at
+# starts with lengths lens. An empty segment, the links of a one-node
+# path, is 0: reduceat would give it the next value or run past the end
+def _max_plus_avg(values, starts, lens):
+    if lens.all():
+        return np.maximum.reduceat(values, starts) + np.add.reduceat(values, starts) / lens
+    full = lens > 0
+    result = np.zeros(len(lens))
+    if full.any():
+        result[full] = np.maximum.reduceat(values, starts[full]) + np.add.reduceat(values, starts[full]) / lens[full]
+    return result
 
+###############################################################
+# "split_flow": shares of a traffic over paths by water-filling:
+#               every quantum goes to the path whose most loaded link
+#               is the least loaded after taking it
+#               --->input:  load, ban >>> consumed share and bandwidth
+#                                         of the links of the paths
+#                           incidence >>> boolean (paths, links) matrix
+#                           tra >>> traffic to split
+#               --->output: share of tra of every path
+###############################################################
+def split_flow(load, ban, incidence, tra, quanta):
+    load = np.array(load, dtype=float)
+    step = np.where(incidence, tra / quanta / ban, 0)
+    parts = np.zeros(len(incidence), dtype=np.int64)
+    for _ in range(quanta):
+        p = int(np.argmin(np.where(incidence, load + step, -np.inf).max(axis=1)))
+        parts[p] += 1
+        load += step[p]
+    return parts / quanta
 
-class heu_full_model:
+###############################################################
+# VectorLoads class: cpu, mem and bandwidth utilisation of the 
+#                    network in arrays, for the vector load mode
+#                    of HF. Paths and nodes are scored on a weighted
+#                    norm of the utilisations instead of the cpu 
+#                    alone. Every change is written to the graph too
+#                    |__>functions:--> path_selection, node_selection
+###############################################################
+class VectorLoads:
+    def __init__(self, graph, weights):
+        self.graph = graph
+        # Weights of the cpu, mem and bandwidth utilisations in the norm
+        self.w_cpu, self.w_mem, self.w_ban = weights
+        self.cpu = np.array([n.cons_cpu for n in graph.node_list], dtype=float)
+        self.mem = np.array([n.cons_mem for n in graph.node_list], dtype=float)
+        self.link = np.array([l.cons for l in graph.link_list], dtype=float)
+        # user -> node and link numbers of its k paths, concatenated
+        self.paths = {}
+
+    def __path_arrays(self, u, k_path):
+        if u not in self.paths:
+            graph = self.graph
+            nodes = [graph.name_to_num_node(v) for p in k_path for v in p]
+            links = [graph.name_to_num_link((p[n], p[n + 1])) for p in k_path for n in range(len(p) - 1)]
+            nodes_len = np.array([len(p) for p in k_path])
+            self.paths[u] = (np.array(nodes, dtype=np.int64), np.concatenate(([0], np.cumsum(nodes_len)[:-1])),
+                             nodes_len, np.array(links, dtype=np.int64),
+                             np.concatenate(([0], np.cumsum(nodes_len - 1)[:-1])))
+        return self.paths[u]
+
+    ###############################################################
+    # "path_selection": path of k_path with the least weighted norm
+    #                   of the max plus the mean of its cpu, mem and
+    #                   bandwidth utilisations, alpha weighting the
+    #                   nodes against the links as in the cpu mode
+    #               --->output: (path number, links of the path)
+    ###############################################################
+    def path_selection(self, u, k_path, c, alpha):
+        graph = self.graph
+        nodes, node_starts, nodes_len, links, link_starts = self.__path_arrays(u, k_path)
+        cpu = self.cpu[nodes]
+        mem = self.mem[nodes]
+        link = self.link[links]
+        cost = (alpha * self.w_cpu * _max_plus_avg(cpu, node_starts, nodes_len)) ** 2 \
+            + (alpha * self.w_mem * _max_plus_avg(mem, node_starts, nodes_len)) ** 2 \
+            + ((1 - alpha) * self.w_ban * _max_plus_avg(link, link_starts, nodes_len - 1)) ** 2
+        idx = int(np.argmin(cost))
+        path_links = links[link_starts[idx]:link_starts[idx] + nodes_len[idx] - 1]
+        self.link[path_links] += c.tra / graph.link_ban[path_links]
+        for l, cons in zip(path_links.tolist(), self.link[path_links].tolist()):
+            graph.link_list[l].cons = cons
+        return idx, len(k_path[idx]) - 1
+
+    ###############################################################
+    # "node_selection": places the functions of c in order along the
+    #                   path. A function stays on the current node
+    #                   while the weighted norm of its cpu and mem 
+    #                   utilisation stays under the target, the norm
+    #                   of the levels the request fills the path to 
+    #                   (at least the path's max), plus tune_param.
+    #                   The functions left go to the last node. A 
+    #                   function in a shared instance takes less
+    ###############################################################
+    def node_selection(self, c, path, functions, tune_param, placement, r):
+        graph = self.graph
+        nodes = [graph.name_to_num_node(v) for v in path]
+        cpu = self.cpu[nodes].tolist()
+        mem = self.mem[nodes].tolist()
+        cap_cpu = graph.cap_cpu[nodes].tolist()
+        cap_mem = graph.cap_mem[nodes].tolist()
+        cpu_usage = [functions.cpu_usage(f) * c.tra for f in c.fun]
+        mem_usage = [functions.mem_usage(f) * c.tra for f in c.fun]
+        theta_cpu = max(max(cpu), (sum(map(float.__mul__, cpu, cap_cpu)) + sum(cpu_usage)) / sum(cap_cpu))
+        theta_mem = max(max(mem), (sum(map(float.__mul__, mem, cap_mem)) + sum(mem_usage)) / sum(cap_mem))
+        target = math.hypot(self.w_cpu * theta_cpu, self.w_mem * theta_mem) + tune_param
+        v = 0
+        for i in range(len(c.fun)):
+            while v < len(path) - 1:
+                share = graph.function_share(nodes[v], c.fun[i], c.tra)
+                if math.hypot(self.w_cpu * (cpu[v] + cpu_usage[i] * share / cap_cpu[v]),
+                              self.w_mem * (mem[v] + mem_usage[i] * share / cap_mem[v])) <= target:
+                    break
+                v += 1
+            share = graph.function_instance(nodes[v], c.name, c.fun[i], c.tra)
+            cpu[v] += cpu_usage[i] * share / cap_cpu[v]
+            mem[v] += mem_usage[i] * share / cap_mem[v]
+            placement.assign_fun(r, i, nodes[v], share)
+        self.cpu[nodes] = cpu
+        self.mem[nodes] = mem
+        for n, v in enumerate(nodes):
+            graph.node_list[v].cons_cpu = cpu[n]
+            graph.node_list[v].cons_mem = mem[n]
+
+class heu_full_model(Approach):
     def __init__(self):
-        self.input_cons = InputConstants.Inputs()
-    def run(self, graph, chains, function, alpha, user_num, batch_size, k, tune_param): 
+        self.input_cons = InputConstants.inputs()
+        # (cpu, mem, bandwidth) weights of the vector load mode, None 
+        # balances the cpu alone
+        self.load_weights = None
+    ###############################################################
+    # "place": places the requests of instance on the network
+    #          state in the given ordering (see Approach.place).
+    #          Without one, request_ordering is used, and with
+    #          ordering_restarts over 1 the best of that many orderings
+    #          is kept                            (Ordering.best_of)
+    ###############################################################
+    def place(self, instance, state, ordering=None, seed=None):
+        if ordering is None:
+            ordering, seed = self.input_cons.request_ordering, self.input_cons.ordering_seed
+            if self.input_cons.ordering_restarts > 1:
+                return Ordering.best_of(self, instance, state, ordering, seed, self.input_cons.ordering_restarts,
+                                        self.input_cons.ordering_workers)
+        self.run(state, instance.chains, instance.functions, instance.alpha,
+                 instance.user_num, instance.batch_size, instance.k, self.tune_param, ordering, seed)
+        return self.placement
+
+    def run(self, graph, chains, function, alpha, user_num, batch_size, k, tune_param, ordering='traffic', seed=None): 
         start_time = time.time()
+        profiler = self.profiler
         node_cpu_cap = []
         node_mem_cap = []
         batch_chain = []
         links_num = 0
-        for c in chains.chains_list:
-            for u in c.users:
-                batch_chain.append([c, u, c.cpu_usage * c.tra, c.tra])
-        batch_chain.sort(key=lambda x: x[2], reverse=True)
-        batch_chain.sort(key=lambda x: x[3], reverse=True)
-        for chain, u, _, _ in batch_chain:
-            k_path = graph.k_path(u[0], u[1], k)
-            path_num, link_num= self.__path_selection(graph, k_path, function, chain, alpha)
+        placement = PlacementResult.empty(chains)
+        loads = VectorLoads(graph, self.load_weights) if self.load_weights is not None else None
+        split_paths = self.input_cons.heu_full_split_paths
+        split_traffic = self.input_cons.heu_full_split_traffic
+        for r, (c, u) in enumerate(requests(chains)):
+            batch_chain.append([c, u, c.cpu_usage * c.tra, c.tra, r])
+        with profiler.timer('k_path'):
+            k_paths = graph.k_paths_batch([u for _, u, _, _, _ in batch_chain], k, profiler=profiler)
+        with profiler.timer('sort'):
+            batch_chain = Ordering.order(ordering, batch_chain, graph, k_paths, random.Random(seed))
+        for chain, u, _, _, r in batch_chain:
+            k_path = k_paths[u]
+            profiler.count('paths_scored', len(k_path))
+            with profiler.timer('path_selection'):
+                if split_paths > 1 and chain.tra >= split_traffic:
+                    path_num, link_num = self.__split_selection(graph, loads, k_path, chain, split_paths, placement, r)
+                elif loads is None:
+                    path_num, link_num= self.__path_selection(graph, k_path, function, chain, alpha)
+                else:
+                    path_num, link_num = loads.path_selection(u, k_path, chain, alpha)
             links_num += link_num
-            self.__node_selection(graph, chain, k_path[path_num], function, tune_param)
+            placement.assign_path(r, path_num)
+            with profiler.timer('node_selection'):
+                if loads is None:
+                    self.__node_selection(graph, chain, k_path[path_num], function, tune_param, placement, r)
+                else:
+                    loads.node_selection(chain, k_path[path_num], function, tune_param, placement, r)
+        profiler.count('requests', len(batch_chain))
         for v in range(graph.nodes_num()):
             node_cpu_cap.append(graph.node_list[v].cons_cpu * 100)
             node_mem_cap.append(graph.node_list[v].cons_mem * 100)
@@ -31,8 +197,9 @@ class heu_full_model:
             link_cap.append(graph.link_list[l].cons * 100)
         end_time = time.time()
         print('heuristic full:', sum(node_cpu_cap))
+        self.placement = placement.finish(graph, end_time - start_time, links_num)
         return max(node_cpu_cap), sum(node_cpu_cap)/len(node_cpu_cap), max(link_cap),\
-        sum(node_cpu_cap)/len(node_cpu_cap), end_time - start_time, links_num
+        sum(link_cap)/len(link_cap), end_time - start_time, links_num
     def __path_selection(self, graph, k_path, function, c, alpha):
         path_cost =[]
         link_cap_list = []
@@ -75,7 +242,34 @@ class heu_full_model:
             graph.link_list[l].cons += c.tra / graph.link_list[l].ban
         return idx, len(k_path[idx])-1
 
-    def __node_selection(self, graph, c, path, functions, tune_param):
+    ###############################################################
+    # "__split_selection": splits the bandwidth of c over the first m
+    #                      paths of k_path (split_flow), its functions
+    #                      go on the path with the largest share
+    #               --->output: (path number, links of the used paths)
+    ###############################################################
+    def __split_selection(self, graph, loads, k_path, c, m, placement, r):
+        paths = k_path[:m]
+        path_links = [[graph.name_to_num_link((p[n], p[n + 1])) for n in range(len(p) - 1)] for p in paths]
+        links = sorted(set(l for p_links in path_links for l in p_links))
+        column = {l: n for n, l in enumerate(links)}
+        incidence = np.zeros((len(paths), len(links)), dtype=bool)
+        for p, p_links in enumerate(path_links):
+            incidence[p, [column[l] for l in p_links]] = True
+        shares = split_flow([graph.link_list[l].cons for l in links], graph.link_ban[links], incidence, c.tra,
+                            self.input_cons.heu_full_split_quanta)
+        links_num = 0
+        for p, share in enumerate(shares.tolist()):
+            if share > 0:
+                for l in path_links[p]:
+                    graph.link_list[l].cons += c.tra * share / graph.link_list[l].ban
+                    if loads is not None:
+                        loads.link[l] = graph.link_list[l].cons
+                links_num += len(path_links[p])
+        placement.assign_share(r, np.concatenate((shares, np.zeros(len(k_path) - len(paths)))))
+        return int(np.argmax(shares)), links_num
+
+    def __node_selection(self, graph, c, path, functions, tune_param, placement, r):
         # print('*'*40)
         delta = c.cpu_usage * c.tra 
         # / sum([graph.node_list[graph.name_to_num_node(v)].cap_cpu for v in path])
@@ -85,14 +279,25 @@ class heu_full_model:
         # print('f', len(c.fun))
         theta_star = max(path_cons)
         res_cap = 0
+        # cpu share of node v that function i takes, less in a shared
+        # instance (Graph.function_share)
+        def cpu(i, v):
+            node = graph.name_to_num_node(v)
+            return functions.cpu_usage(c.fun[i]) * c.tra * graph.function_share(node, c.fun[i], c.tra) \
+                / graph.node_list[node].cap_cpu
+        def place(i, v):
+            node = graph.name_to_num_node(v)
+            share = graph.function_instance(node, c.name, c.fun[i], c.tra)
+            graph.node_list[node].cons_cpu += functions.cpu_usage(c.fun[i]) * c.tra * share / graph.node_list[node].cap_cpu
+            graph.node_list[node].cons_mem += functions.mem_usage(c.fun[i]) * c.tra * share / graph.node_list[node].cap_mem
+            placement.assign_fun(r, i, node, share)
         if theta_star == 0:
             req_cap /= len(path)
             i = 0
             v = 0
             if len(path) >= len(c.fun):
                 for i in range(len(c.fun)):
-                    graph.node_list[graph.name_to_num_node(path[v])].cons_cpu += functions.cpu_usage(c.fun[i]) * c.tra / graph.node_list[graph.name_to_num_node(path[v])].cap_cpu
-                    graph.node_list[graph.name_to_num_node(path[v])].cons_mem += functions.mem_usage(c.fun[i]) * c.tra / graph.node_list[graph.name_to_num_node(path[v])].cap_mem
+                    place(i, path[v])
                     # print('i and v', i, v)
                     v += 1
             else:
@@ -100,16 +305,14 @@ class heu_full_model:
                 for v in path:
                     if i==len(c.fun):
                         break
-                    while graph.node_list[graph.name_to_num_node(v)].cons_cpu+((functions.cpu_usage(c.fun[i]) * c.tra)/graph.node_list[graph.name_to_num_node(v)].cap_cpu)<=req_cap+tune_param:
-                        graph.node_list[graph.name_to_num_node(v)].cons_cpu += functions.cpu_usage(c.fun[i]) * c.tra / graph.node_list[graph.name_to_num_node(v)].cap_cpu
-                        graph.node_list[graph.name_to_num_node(v)].cons_mem += functions.mem_usage(c.fun[i]) * c.tra / graph.node_list[graph.name_to_num_node(v)].cap_mem
+                    while graph.node_list[graph.name_to_num_node(v)].cons_cpu+cpu(i, v)<=req_cap+tune_param:
+                        place(i, v)
                         i += 1
                         if i==len(c.fun):
                             break
                 if i < len(c.fun):
                     for j in range(i, len(c.fun)):
-                        graph.node_list[graph.name_to_num_node(v)].cons_cpu += functions.cpu_usage(c.fun[j]) * c.tra / graph.node_list[graph.name_to_num_node(v)].cap_cpu
-                        graph.node_list[graph.name_to_num_node(v)].cons_mem += functions.mem_usage(c.fun[i]) * c.tra / graph.node_list[graph.name_to_num_node(v)].cap_mem
+                        place(j, v)
                     i = len(c.fun)  
 
         else:
@@ -130,19 +333,24 @@ class heu_full_model:
             for v in path:
                 if i==len(c.fun):
                     break
-                while graph.node_list[graph.name_to_num_node(v)].cons_cpu+((functions.cpu_usage(c.fun[i]) * c.tra)/graph.node_list[graph.name_to_num_node(v)].cap_cpu)<=theta_star_mines+tune_param:
-                    graph.node_list[graph.name_to_num_node(v)].cons_cpu += functions.cpu_usage(c.fun[i]) * c.tra / graph.node_list[graph.name_to_num_node(v)].cap_cpu
-                    graph.node_list[graph.name_to_num_node(v)].cons_mem += functions.mem_usage(c.fun[i]) * c.tra / graph.node_list[graph.name_to_num_node(v)].cap_mem
+                while graph.node_list[graph.name_to_num_node(v)].cons_cpu+cpu(i, v)<=theta_star_mines+tune_param:
+                    place(i, v)
                     i += 1
                     if i==len(c.fun):
                         break
             if i < len(c.fun):
                 for j in range(i, len(c.fun)):
-                    graph.node_list[graph.name_to_num_node(v)].cons_cpu += functions.cpu_usage(c.fun[j]) * c.tra / graph.node_list[graph.name_to_num_node(v)].cap_cpu
-                    graph.node_list[graph.name_to_num_node(v)].cons_mem += functions.mem_usage(c.fun[i]) * c.tra / graph.node_list[graph.name_to_num_node(v)].cap_mem
+                    place(j, v)
                 i = len(c.fun)  
-            
-        
+
+###############################################################
+# heu_vector_model class: HF in the vector load mode, weighted by
+#                         heu_vector_weights
+###############################################################
+class heu_vector_model(heu_full_model):
+    def __init__(self):
+        super().__init__()
+        self.load_weights = self.input_cons.heu_vector_weights
 
 
 
@@ -15,8 +15,9 @@ from typing import List
 import numpy as np
 import InputConstants
 import json
+import hashlib
 import random as rd
-import networkx as nx
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 ###############################################################
 # Node features class
 ###############################################################
@@ -56,65 +57,78 @@ class _Chain:
 ###############################################################
 class Graph:
 
-    def __init__(self, path, funs):
+    def __init__(self, path, funs, topology_capacities=None):
         self.k_paths = {}
+        self._G = None
         self.funs = funs
         self.rev_to_cost_val = 0
-        self.input_cons = InputConstants.Inputs()
-        link_list = []
-        node_ban = []
-        links = []
-        with open(path, "r") as data_file:
-            data = json.load(data_file)
-            self.node_name_list = [data['networkTopology']['nodes']
-                [node_num][self.input_cons.network_topology_node_name] 
-                    for node_num in range(len(data['networkTopology']['nodes']))]
+        self.input_cons = InputConstants.inputs()
+        with open(path, "rb") as data_file:
+            raw = data_file.read()
+        if topology_capacities is None:
+            topology_capacities = self.input_cons.topology_capacities
+        self._load(json.loads(raw)['networkTopology'], topology_capacities)
+        self.vnf_sharing = self.input_cons.vnf_sharing
+        # (node number, function) -> traffic the open instance of the
+        # function on the node can still take, when VNFs are shared
+        self.vnf_headroom = {}
+        # Content hash of topology and capacities, used as cache key
+        sharing = [self.input_cons.vnf_instance_capacity, self.input_cons.vnf_instance_overhead] \
+            if self.vnf_sharing else []
+        self.digest = _digest([hashlib.sha1(raw).hexdigest(), self.cap_cpu.tolist(), self.cap_mem.tolist(),
+                               self.link_ban.tolist()] + sharing)
+
+    ###############################################################
+    # "_load": builds nodes, links and their name indexes in one pass 
+    #                                           over the topology
+    #               --->input:  topology >>> "networkTopology" of the 
+    #                                               json file
+    #                           topology_capacities >>> capacities from
+    #                                  the file, else the uniform inputs
+    #               --->output: none
+    ###############################################################
+    def _load(self, topology, topology_capacities):
+        node_name = self.input_cons.network_topology_node_name
+        link_name = self.input_cons.network_topology_link_name
+        link_dis = self.input_cons.network_topology_link_dis
+        node_cpu = self.input_cons.network_topology_node_cpu_cap
+        node_mem = self.input_cons.network_topology_node_memory_cap
+        link_cap = self.input_cons.network_topology_link_cap
+        self.link_full_list = topology['links']
+        self.node_name_list = []
+        self.node_list = []
+        self.link_list = []
+        self.name_num_node = {}
+        self.name_num_link = {}
+        link_ends = []
+        for node in topology['nodes']:
+            name = node[node_name]
+            self.name_num_node[name] = len(self.node_list)
+            self.node_name_list.append(name)
+            if topology_capacities:
+                self.node_list.append(_Node(name, node[node_cpu], node[node_mem]))
+            else:
+                self.node_list.append(_Node(name, self.input_cons.node_cpu, self.input_cons.node_mem))
+        for name in self.node_name_list:
+            for _list in self.link_full_list[name]:
+                self.name_num_link[(name, _list[link_name])] = len(self.link_list)
+                self.link_list.append(_Link((name, _list[link_name]), 0,
+                                            _list[link_cap] if topology_capacities else self.input_cons.link_cap,
+                                            _list[link_dis]))
+                link_ends.append((self.name_num_node[name], self.name_num_node[_list[link_name]]))
+        self.nodes_name = list(self.node_name_list)
+        # Compact arrays of capacities and link end nodes (by number)
+        self.cap_cpu = np.array([n.cap_cpu for n in self.node_list], dtype=float)
+        self.cap_mem = np.array([n.cap_mem for n in self.node_list], dtype=float)
+        self.link_ban = np.array([l.ban for l in self.link_list], dtype=float)
+        self.link_ends = np.array(link_ends, dtype=np.int32).reshape(-1, 2)
+
+    # The networkx graph is rebuilt on demand instead of being pickled
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_G'] = None
+        return state
 
-            # print(self.node_name_list)
-            self.link_full_list = data['networkTopology']['links']
-            # print(self.link_full_list)
-            link_list = [data['networkTopology']['links'][node_name]
-                        for node_name in self.node_name_list 
-                        if data['networkTopology']['links'][node_name] != []
-                                                                        ]
-            # print(link_list)
-            for node in self.node_name_list:
-                if self.link_full_list[node] != []:
-                    for _list in self.link_full_list[node]:
-                        links.append((node, _list[self.input_cons.network_topology_link_name]))
-            # print(links)
-            # for cnt_node in range(len(self.node_name_list)):
-            #     ban_sum = 0
-            #     for cnt_link in range(len(link_list[cnt_node])):
-            #         ban_sum += link_list[cnt_node][cnt_link][self.input_cons.network_topology_link_cap]
-            #     node_ban.append(ban_sum)
-            self.link_list = [_Link((node,  _list[self.input_cons.network_topology_link_name]),
-                              0,
-                              self.input_cons.link_cap,
-                            #   _list[self.input_cons.network_topology_link_cap],
-                              _list[self.input_cons.network_topology_link_dis]
-                                    )
-                              for node in self.node_name_list
-                              for _list in self.link_full_list[node]
-                             ]
-            self.node_list = [_Node(self.node_name_list[cnt],
-                                self.input_cons.node_cpu, 
-                                self.input_cons.node_mem
-                                
-                            #   data['networkTopology']['nodes'][cnt][self.input_cons.network_topology_node_cpu_cap],
-                            #   data['networkTopology']['nodes'][cnt][self.input_cons.network_topology_node_memory_cap],
-                              )
-                              for cnt in range(len(self.node_name_list))]
-            self.nodes_name = []
-            for n in range(len(self.node_list)):
-                self.nodes_name.append(self.node_list[n].name)
-            # self.dist, self.hop =  self.__floydWarshall()
-            self.name_num_node = {}
-            for v in range(len(self.node_list)):
-                self.name_num_node[self.node_list[v].name] = v
-            self.name_num_link = {}
-            for l in range(len(self.link_list)):
-                self.name_num_link[self.link_list[l].name] = l
     ###############################################################
     # "__function_cpu_usage": returns cpu usage of each nodes
     #               --->input: fun >>> functions name
@@ -144,8 +158,7 @@ class Graph:
     #               --->output: none
     ###############################################################        
     def function_placement(self, node, ser, fun):
-        self.node_list[node].fun[ser].append(fun)
-        pass
+        self.node_list[node].fun.setdefault(ser, []).append(fun)
 
     ###############################################################
     # "batch_function_placement": placement batch of function "fun" 
@@ -158,7 +171,48 @@ class Graph:
     def batch_function_placement(self, ser_list, node_fun_list):
         for node_fun, ser in zip(node_fun_list, ser_list): 
             for node, fun in node_fun:
-                self.__function_placement(node, ser, fun)
+                self.function_placement(node, ser, fun)
+
+    ###############################################################
+    # "function_share": share of the cpu and mem of function "fun" 
+    #                   with traffic "tra" that placing it on "node"
+    #                   costs: 1 - vnf_instance_overhead when the open
+    #                   instance of fun there has headroom for tra, 1
+    #                   otherwise or without VNF sharing
+    ###############################################################
+    def function_share(self, node, fun, tra):
+        if self.vnf_sharing and self.vnf_headroom.get((node, fun), 0) >= tra:
+            return 1 - self.input_cons.vnf_instance_overhead
+        return 1
+
+    ###############################################################
+    # "function_instance": places traffic "tra" of function "fun" of
+    #                      chain "ser" on "node": in the open instance
+    #                      when it has headroom, else in a new instance
+    #                      that becomes the open one
+    #               --->output: share of the cpu and mem of the
+    #                           function consumed, as function_share
+    ###############################################################
+    def function_instance(self, node, ser, fun, tra):
+        if not self.vnf_sharing:
+            return 1
+        share = self.function_share(node, fun, tra)
+        headroom = self.vnf_headroom.get((node, fun), 0)
+        if headroom >= tra:
+            self.vnf_headroom[(node, fun)] = headroom - tra
+        else:
+            self.vnf_headroom[(node, fun)] = max(self.input_cons.vnf_instance_capacity - tra, 0)
+        self.function_placement(node, ser, fun)
+        return share
+
+    ###############################################################
+    # "network_state": consumed cpu and memory of the nodes and 
+    #                                  consumed bandwidth of the links
+    ###############################################################
+    def network_state(self):
+        return {'cpu': [n.cons_cpu for n in self.node_list],
+                'mem': [n.cons_mem for n in self.node_list],
+                'link': [l.cons for l in self.link_list]}
 
     ###############################################################
     # "make_empty_nodes": this functins remove all functions that were
@@ -173,6 +227,7 @@ class Graph:
             self.node_list[v].cons_cpu = 0
         for l in range(len(self.link_list)):
             self.link_list[l].cons = 0
+        self.vnf_headroom = {}
 
                 # for j in range(len(self.data['chains'])):
                 #     self.node_list[i].fun[self.data['chains'][j]['name']] = []
@@ -223,40 +278,97 @@ class Graph:
         else:
             return False
     
+    ###############################################################
+    # "_digraph": networkx view of the topology, built once and 
+    #                       shared by every k_path call
+    ###############################################################
+    def _digraph(self):
+        if self._G is None:
+            # networkx is only loaded once paths have to be computed
+            import networkx as nx
+            self._G = nx.DiGraph()
+            self._G.add_nodes_from(self.node_name_list)
+            self._G.add_weighted_edges_from((l.name[0], l.name[1], l.length) for l in self.link_list)
+        return self._G
+
     def k_path(self, source, destination, k):
-        links = []
-        G = nx.DiGraph()
-        # Generating all links with length
-        for node in self.node_name_list:
-            for _list in self.link_full_list[node]:
-                links.append((node, _list[self.input_cons.network_topology_link_name],
-                _list[self.input_cons.network_topology_link_dis]))
-        G.add_nodes_from(self.node_name_list)
-        G.add_weighted_edges_from(links)
-        # k_path = nx.floyd_warshall_predecessor_and_distance(G)
-        # paths = list(nx.shortest_simple_paths(G, '1', '3'))
-        # for node_1 in self.node_name_list:
-        #     for node_2 in self.node_name_list:
-        #if (source, destination) in self.k_paths:
-        #    return self.k_paths[(source, destination)]
-        #else:
-        #   self.k_paths[(source, destination)] = []
-        #    for path in list(nx.shortest_simple_paths(G, source, destination))[0: k]:
-        #        if self._path_cap_checker(path):
-        #            self.k_paths[(source, destination)].append(path)
-        k_paths = []
-        for path in list(nx.shortest_simple_paths(G, source, destination)):
-            if (len(path)-1)<=k:
-                if 1==1:
-                # if self._path_cap_checker(path):
-                    k_paths.append(path)
+        if (source, destination, k) not in self.k_paths:
+            self.k_paths[(source, destination, k)] = _k_path(self._digraph(), source, destination, k)
+        return self.k_paths[(source, destination, k)]
+
+    ###############################################################
+    # "k_paths_batch": k paths of all requests of an instance in 
+    #                                                   one call
+    #               --->input:  pairs >>> list of (source, destination)
+    #                           k >>> maximum hop number of paths
+    #                           workers >>> number of pool workers
+    #                           executor >>> 'thread' or 'process'
+    #                           profiler >>> counts calls and cache hits
+    #               --->output: dictionary (source, destination) -> paths
+    ###############################################################
+    def k_paths_batch(self, pairs, k, workers=None, executor=None, profiler=None):
+        if workers is None:
+            workers = self.input_cons.k_path_workers
+        if executor is None:
+            executor = self.input_cons.k_path_executor
+        # Distinct destinations of each source that are not cached yet
+        sources = {}
+        hits = 0
+        for s, d in dict.fromkeys(pairs):
+            if (s, d, k) not in self.k_paths:
+                sources.setdefault(s, []).append(d)
             else:
-                break
-            # self.k_paths[(source, destination)] = list(nx.shortest_simple_paths(G, source, destination))[0: num]
-        #return self.k_paths[(source, destination)]
-       # print(k_paths)
-        return k_paths
-        
+                hits += 1
+        if profiler is not None:
+            profiler.count('k_path_calls', len(pairs))
+            profiler.count('k_path_cache_hits', hits)
+            profiler.count('k_path_computed', sum(len(dests) for dests in sources.values()))
+        G = self._digraph() if sources else None
+        if workers > 1 and len(sources) > 1:
+            pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+            with pool_class(max_workers=workers) as pool:
+                results = list(pool.map(_source_k_paths, 
+                                        [G] * len(sources), sources.keys(), sources.values(), [k] * len(sources)))
+        else:
+            results = [_source_k_paths(G, s, dests, k) for s, dests in sources.items()]
+        for s, paths in zip(sources.keys(), results):
+            for d, k_paths in paths:
+                self.k_paths[(s, d, k)] = k_paths
+        return {(s, d): self.k_paths[(s, d, k)] for s, d in pairs}
+
+###############################################################
+# "_digest": content hash of json-serialisable data
+###############################################################
+def _digest(data):
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+###############################################################
+# "_k_path": all paths between source and destination with at
+#                     most k hops, in shortest_simple_paths order
+###############################################################
+def _k_path(G, source, destination, k):
+    import networkx as nx
+    k_paths = []
+    for path in nx.shortest_simple_paths(G, source, destination):
+        if (len(path)-1)<=k:
+            k_paths.append(path)
+        else:
+            break
+    return k_paths
+
+###############################################################
+# "_source_k_paths": k paths from one source to many destinations,
+#                     the unit of work of the k_paths_batch pool.
+#                     Every destination still runs its own _k_path,
+#                     whose shortest_simple_paths order the models
+#                     rely on; one hop search from the source only
+#                     skips the destinations it can't reach in k hops.
+###############################################################
+def _source_k_paths(G, source, destinations, k):
+    import networkx as nx
+    hops = nx.single_source_shortest_path_length(G, source, cutoff=k)
+    return [(d, _k_path(G, source, d, k) if d in hops else []) for d in destinations]
+
 ###############################################################
 # Ghains class:|
 #             |__>functions:-->
@@ -264,7 +376,7 @@ class Graph:
 ###############################################################        
 class Chains:
     def __init__(self, graph, functions):
-        self.input_cons = InputConstants.Inputs()
+        self.input_cons = InputConstants.inputs()
         self. graph = graph
         self.functions = functions
     def read(self, path):
@@ -272,6 +384,7 @@ class Chains:
         users = []
         with open(path, "r") as data_file:
             data = json.load(data_file)
+            self.digest = _digest(data)
             for i in range(len(self.graph.node_list)):
                 for j in range(len(data["chains"])):
                     self.graph.node_list[i].fun[data["chains"][j]['name']] = []
@@ -399,10 +512,11 @@ class Chains:
     ###############################################################  
 class Functions:
     def __init__(self):
-        self.input_cons = InputConstants.Inputs()
+        self.input_cons = InputConstants.inputs()
     def read(self, path):
         with open(path, "r") as data_file:
             data = json.load(data_file) 
+        self.digest = _digest(data)
         self.functions_list = data["functions"]
         self.functions_name = []
         for f in self.functions_list.keys():
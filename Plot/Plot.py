@@ -1,775 +1,312 @@
 import sys
-import numpy as np
 
 sys.path.insert(0, './PaperFunctions')
 sys.path.insert(1, './Given')
 sys.path.insert(1, './Models')
 sys.path.insert(1, './Plot')
-from MILP import MILP_model
-from firstRoutingLastPlacementBenchmark import benchmark_first
-from firstPlacementLastRoutingBenchmark import benchmark_second
+sys.path.insert(1, './Utils')
 # from MILP_online import MILP_online_model
 # from heuristic_offline import heuristic_offline_model
 # from heuristic_online import heuristic_online_model
-from MILP_batch import MILP_batch_model
 # from heuristic_online_batch import heuristic_online_batch_model
-from heu_full import heu_full_model
-import matplotlib.pyplot as plt
-from decimal import Decimal, ROUND_DOWN
+import Registry
+import Metrics
+import LowerBound
+from Placement import Instance, PlacementResult
+from concurrent.futures import ProcessPoolExecutor
 import InputConstants
+from Profiler import Profiler
+from ResultCache import ResultCache
+
+
 
 
 class Plot:
-    def __init__(self):
-        self.input_cons = InputConstants.Inputs()
-        # self.heu_online = heuristic_online_model()
-        # self.heu_online_batch = heuristic_online_batch_model()
-        # self.heu_offline = heuristic_offline_model()
-        self.heu_full = heu_full_model()
-        # self.MILP_online = MILP_online_model()
-        self.MILP_batch = MILP_batch_model()
-        self.MILP = MILP_model()
-        self.benchmark_first = benchmark_first()
-        self.benchmark_second = benchmark_second()
+    # Metrics of a results tuple: name, axis label, file name prefix
+    metrics = (('cpu_max', 'Maximum CPU usage(%)', 'maxCPU'),
+               ('cpu_avg', 'Average CPU usage(%)', 'avgCPU'),
+               ('link_max', 'Maximum bandwidth usage(%)', 'maxlink'),
+               ('link_avg', 'Average bandwidth usage(%)', 'avglink'),
+               ('time', 'Time (s)', 'time'),
+               ('links_num', 'Number of used links', 'linksnum'))
+    markers = ('s', '*', 'o', '^', 'p', '+', 'x', 'D')
+
+    def __init__(self, checkpoint=None, cache=None):
+        self.input_cons = InputConstants.inputs()
+        self.checkpoint = checkpoint
+        self.cache = cache
+        self.placements = {}
+        self.profiles = {}
+        # job -> optimality gap (%) of the last instance, with lower_bound on
+        self.gaps = {}
+        # Model objects by (approach, tune_param) job, created on first use
+        self.models = {}
+        # Worker processes of __portfolio, started on first use and 
+        # kept for every instance until close
+        self.pool = None
 
         self.tune_param = self.input_cons.heu_full_tune_param
         self.run_num = self.input_cons.run_num
 
-        self.cpu_heu_full_max = [[] for _ in range(len(self.tune_param))]
-        self.cpu_heu_full_avg = [[] for _ in range(len(self.tune_param))]
-        self.link_heu_full_max = [[] for _ in range(len(self.tune_param))]
-        self.link_heu_full_avg = [[] for _ in range(len(self.tune_param))] 
-        self.time_heu_full = [[] for _ in range(len(self.tune_param))]
-            
-        self.cpu_MILP_batch_max = []
-        self.cpu_MILP_batch_avg = []
-        self.link_MILP_batch_max = []
-        self.link_MILP_batch_avg = []
-        self.time_MILP_batch = []
-            
-        self.cpu_MILP_max = []
-        self.cpu_MILP_avg = []
-        self.link_MILP_max = []
-        self.link_MILP_avg = []
-        self.time_MILP = []
-
-        self.cpu_benchmark_first_max = []
-        self.cpu_benchmark_first_avg = []
-        self.link_benchmark_first_max = []
-        self.link_benchmark_first_avg = []
-        self.time_benchmark_first = []
-
-        self.cpu_benchmark_second_max = []
-        self.cpu_benchmark_second_avg = []
-        self.link_benchmark_second_max = []
-        self.link_benchmark_second_avg = []
-        self.time_benchmark_second = []
-
-        self.cpu_heu_full_max_list = [[] for _ in range(len(self.tune_param))]
-        self.cpu_heu_full_avg_list = [[] for _ in range(len(self.tune_param))]
-        self.link_heu_full_max_list = [[] for _ in range(len(self.tune_param))]
-        self.link_heu_full_avg_list = [[] for _ in range(len(self.tune_param))]
-        self.time_heu_full_list = [[] for _ in range(len(self.tune_param))]
-
-        self.cpu_MILP_batch_max_list = []
-        self.cpu_MILP_batch_avg_list = []
-        self.link_MILP_batch_max_list = []
-        self.link_MILP_batch_avg_list = []
-        self.time_MILP_batch_list = []
-
-        self.cpu_MILP_max_list = []
-        self.cpu_MILP_avg_list = []
-        self.link_MILP_max_list = []
-        self.link_MILP_avg_list = []
-        self.time_MILP_list = []
-
-        self.cpu_benchmark_first_max_list = []
-        self.cpu_benchmark_first_avg_list = []
-        self.link_benchmark_first_max_list = []
-        self.link_benchmark_first_avg_list = []
-        self.time_benchmark_first_list = []
-
-        self.cpu_benchmark_second_max_list = []
-        self.cpu_benchmark_second_avg_list = []
-        self.link_benchmark_second_max_list = []
-        self.link_benchmark_second_avg_list = []
-        self.time_benchmark_second_list = []
-
-        self.hop_num_MILP = []
-        self.hop_num_heu_full = [[] for _ in range(len(self.tune_param))]
-        self.hop_num_MILP_batch = []
-        self.hop_num_benchmark_first = []
-        self.hop_num_benchmark_second = []
-
-        self.hop_num_MILP_list = []
-        self.hop_num_heu_full_list = [[] for _ in range(len(self.tune_param))]
-        self.hop_num_MILP_batch_list = []
-        self.hop_num_benchmark_first_list = []
-        self.hop_num_benchmark_second_list = []
-
-    def run(self, approach_list, graph, chain, funs, k, alpha, batch_size, user_num):
+        # job -> metric -> values of the epochs of the current chains number
+        self.records = {}
+        # job -> metric -> mean over the epochs of every chains number
+        self.curves = {}
+
+    ###############################################################
+    # "run": runs the approaches on one instance and records them.
+    #        With a checkpoint and the (chain_num, epoch) of the 
+    #        instance, finished cells of the same instance, inputs
+    #        and code are read back instead of rerun and new cells 
+    #        are saved as soon as they finish. With a result cache,
+    #        cells already computed for the same instance, inputs
+    #        and code are taken from the cache.
+    #        The placements of the instance are kept in placements
+    #        and, with profile on, the timers and counters of the
+    #        computed jobs in profiles and in path_text_profile.
+    #        With lower_bound on, the optimality gaps of all jobs are
+    #        kept in gaps and written to path_text_gap.
+    ###############################################################
+    def run(self, approach_list, graph, chain, funs, k, alpha, batch_size, user_num, chain_num=None, epoch=None):
         graph.make_empty_network()
-        if 'HF' in approach_list:
-            for i, tune_param in enumerate(self.tune_param):
-                cpu_max, cpu_avg, link_max, link_avg, time, links_num =\
-                    self.heu_full.run(graph, chain, funs, alpha, user_num, batch_size, k, tune_param)
-                self.cpu_heu_full_max[i].append(round(cpu_max, 2))
-                self.cpu_heu_full_avg[i].append(round(cpu_avg, 2))
-                self.link_heu_full_max[i].append(round(link_max, 2))
-                self.link_heu_full_avg[i].append(round(link_avg, 2)) 
-                self.time_heu_full[i].append(round(time, 2))
-                self.hop_num_heu_full[i].append(links_num)
+        jobs = Registry.jobs(approach_list)
+        results = {}
+        self.placements = {}
+        self.profiles = {}
+        keys = {}
+        if self.checkpoint is not None or self.cache is not None:
+            keys = {job: self.__key(job, graph, chain, funs, k, alpha, batch_size) for job in jobs}
+        if self.checkpoint is not None and chain_num is not None:
+            for job in jobs:
+                done = self.checkpoint.get(job[0], chain_num, epoch, k, alpha, batch_size, job[1], keys[job])
+                if done is not None:
+                    results[job] = self.placements[job] = PlacementResult.from_dict(done[1])
+        if self.cache is not None:
+            for job in jobs:
+                if job not in results:
+                    cached = self.cache.get(keys[job])
+                    if cached is not None:
+                        results[job] = self.placements[job] = PlacementResult.from_dict(cached[1])
+                        self.__checkpoint(job, chain_num, epoch, k, alpha, batch_size, keys, results[job])
+        missing = [job for job in jobs if job not in results]
+        for job, (result, profile) in self.__portfolio(missing, graph, chain, funs, k, alpha, batch_size, user_num).items():
+            self.__checkpoint(job, chain_num, epoch, k, alpha, batch_size, keys, result)
+            if self.cache is not None:
+                self.cache.put(keys[job], result, result.to_dict())
+            results[job] = self.placements[job] = result
+            if self.input_cons.profile:
+                self.profiles[job] = profile
+                with open(self.input_cons.path_text_profile, 'a') as f:
+                    print('chains:'+str(chain.num())+'/KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+
+                          '/'+job[0]+'/tune:'+str(job[1])+'-->', tuple(result), profile, file=f)
+        self.__record(jobs, results, k, alpha, batch_size)
+        if self.input_cons.lower_bound is not None:
+            self.__gap(jobs, results, graph, chain, funs, k, alpha, batch_size)
+        return results
+
+    def __model(self, job):
+        if job not in self.models:
+            self.models[job] = Registry.create(*job)
+        return self.models[job]
+
+    ###############################################################
+    # "__key": ResultCache key of a job on one instance, also the 
+    #          fingerprint of its checkpoint cell
+    ###############################################################
+    def __key(self, job, graph, chain, funs, k, alpha, batch_size):
+        return ResultCache.key(graph, chain, funs, job[0], self.__model(job), k, alpha, batch_size, job[1])
+
+    def __checkpoint(self, job, chain_num, epoch, k, alpha, batch_size, keys, result):
+        if self.checkpoint is not None and chain_num is not None:
+            self.checkpoint.save(job[0], chain_num, epoch, k, alpha, batch_size, job[1], keys[job],
+                                 result, result.to_dict())
+
+    ###############################################################
+    # "load": records every finished epoch of one chain_num from the
+    #         checkpoint, so box_plot_save and curve can be called
+    #         without rerunning anything. The chains of every epoch 
+    #         are read into chain, as the sweep of Main/main.py does,
+    #         to check the fingerprints of its cells; an epoch with a
+    #         cell of another sweep isn't loaded.
+    #               --->output: number of loaded epochs
+    ###############################################################
+    def load(self, approach_list, graph, chain, funs, chain_num, k, alpha, batch_size):
+        jobs = Registry.jobs(approach_list)
+        loaded = 0
+        for epoch in self.checkpoint.epochs(jobs, chain_num, k, alpha, batch_size):
+            chain.read(self.input_cons.chains_random_path + self.input_cons.chains_random_name + 
+                       str(chain_num) + '_' + str(epoch) + '.json')
+            results = {job: self.checkpoint.get(job[0], chain_num, epoch, k, alpha, batch_size, job[1],
+                                                self.__key(job, graph, chain, funs, k, alpha, batch_size))
+                       for job in jobs}
+            if all(done is not None for done in results.values()):
+                self.__record(jobs, {job: done[0] for job, done in results.items()}, k, alpha, batch_size, log=False)
+                loaded += 1
+        return loaded
+
+    @staticmethod
+    def __job_name(job):
+        return job[0] if job[1] is None else job[0] + '/tune:' + str(job[1])
+
+    # Plot label of a job, with its tune_param when the approach runs several
+    @staticmethod
+    def __label(job, jobs):
+        if sum(1 for approach, _ in jobs if approach == job[0]) > 1:
+            return Registry.label(job[0]) + '(' + str(job[1]) + ')'
+        return Registry.label(job[0])
+
+    ###############################################################
+    # "__record": appends the results of one epoch to records, the
+    #             load metrics rounded to 2 decimals
+    ###############################################################
+    def __record(self, jobs, results, k, alpha, batch_size, log=True):
+        for job in jobs:
+            record = self.records.setdefault(job, {metric: [] for metric, _, _ in self.metrics})
+            for n, ((metric, _, _), value) in enumerate(zip(self.metrics, results[job])):
+                record[metric].append(round(value, 2) if n < 4 else value)
+            if log:
                 with open(self.input_cons.path_curve_MILP, 'a') as f:
-                    print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'heu_cpu_max'+'-->', self.cpu_heu_full_max, file=f)
-                    print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'heu_cpu_avg'+'-->', self.cpu_heu_full_avg, file=f)
-                    print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'heu_link_max'+'-->', self.link_heu_full_max, file=f)
-                    print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'heu_link_avg'+'-->', self.link_heu_full_avg, file=f)
-                    print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'heu_time'+'-->', self.time_heu_full, file=f)
-                    print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'heu_link_num'+'-->', self.hop_num_heu_full, file=f)
+                    for metric, _, _ in self.metrics:
+                        print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'/'+self.__job_name(job)+
+                              '_'+metric+'-->', record[metric], file=f)
+
+    ###############################################################
+    # "__gap": optimality gaps of the results of one instance to its
+    #          lower bound
+    ###############################################################
+    def __gap(self, jobs, results, graph, chain, funs, k, alpha, batch_size):
+        bound = LowerBound.lower_bound(graph, chain, funs, k, alpha, self.input_cons.lower_bound,
+                                       self.input_cons.lower_bound_time_limit)
+        self.gaps = {job: LowerBound.gap(results[job], bound, alpha) for job in jobs}
+        with open(self.input_cons.path_text_gap, 'a') as f:
+            for job in jobs:
+                print('chains:'+str(chain.num())+'/KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+
+                      '/'+self.__job_name(job)+'/bound:'+str(round(100 * bound, 2))+'-->', round(self.gaps[job], 2), file=f)
+
+    ###############################################################
+    # "__portfolio": runs every (approach, tune_param) job of one 
+    #                  instance, each job on an empty network state
+    #                  on the workers of pool
+    #               --->input:  jobs >>> list of (approach, tune_param)
+    #               --->output: dictionary job -> (PlacementResult, 
+    #                                                profile report)
+    ###############################################################
+    def __portfolio(self, jobs, graph, chain, funs, k, alpha, batch_size, user_num):
+        results = {}
+        instance = Instance(graph, chain, funs, k, alpha, batch_size, user_num)
+        workers = min(self.input_cons.portfolio_workers, len(jobs))
+        if workers <= 1:
+            for job in jobs:
+                results[job] = _run_approach(self.__model(job), instance, graph, self.input_cons.profile)
                 graph.make_empty_network()
-        if 'MILPB' in approach_list:
-            cpu_max, cpu_avg, link_max, link_avg, time, links_num =\
-                 self.MILP_batch.run(graph, chain, funs, k, alpha, user_num, batch_size)
-            self.cpu_MILP_batch_max.append(round(cpu_max, 2))
-            self.cpu_MILP_batch_avg.append(round(cpu_avg, 2))
-            self.link_MILP_batch_max.append(round(link_max, 2))
-            self.link_MILP_batch_avg.append(round(link_avg, 2))
-            self.time_MILP_batch.append(round(time, 2))
-            self.hop_num_MILP_batch.append(links_num)
-            with open(self.input_cons.path_curve_MILP, 'a') as f:
-                print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILPB_cpu_max'+'-->', self.cpu_MILP_batch_max, file=f)
-                print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILPB_cpu_avg'+'-->', self.cpu_MILP_batch_avg, file=f)
-                print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILPB_link_max'+'-->', self.link_MILP_batch_max, file=f)
-                print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILPB_link_avg'+'-->', self.link_MILP_batch_avg, file=f)
-                print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILPB_time'+'-->', self.time_MILP_batch, file=f)
-                print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILPB_link_num'+'-->', self.hop_num_MILP_batch, file=f)
-
-            graph.make_empty_network()
-        if 'MILP' in approach_list:
-            cpu_max, cpu_avg, link_max, link_avg, time, links_num = self.MILP.run(graph, chain, funs, k, alpha)
-            self.cpu_MILP_max.append(cpu_max)
-            self.cpu_MILP_avg.append(cpu_avg)
-            self.link_MILP_max.append(link_max)
-            self.link_MILP_avg.append(link_avg)
-            self.time_MILP.append(time)
-            self.hop_num_MILP.append(links_num)
-            with open(self.input_cons.path_curve_MILP, 'a') as f:
-                 print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILP_cpu_max'+'-->', round(self.cpu_MILP_max, 2) , file=f)
-                 print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILP_cpu_avg'+'-->', round(self.cpu_MILP_avg, 2), file=f)
-                 print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILP_link_max'+'-->', round(self.link_MILP_max, 2), file=f)
-                 print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILP_link_avg'+'-->', round(self.link_MILP_avg, 2), file=f)
-                 print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILP_time'+'-->', round(self.time_MILP, 2), file=f)
-                 print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILP_link_num'+'-->', self.hop_num_MILP, file=f)
-
-            graph.make_empty_network()
-            
-        if 'benchmark_first_routing_last_placement' in approach_list:
-            cpu_max, cpu_avg, link_max, link_avg, time, links_num = self.benchmark_first.run(graph, chain, funs, alpha, user_num, batch_size, k, tune_param)
-            self.cpu_benchmark_first_max.append(round(cpu_max, 2))
-            self.cpu_benchmark_first_avg.append(round(cpu_avg, 2))
-            self.link_benchmark_first_max.append(round(link_max, 2))
-            self.link_benchmark_first_avg.append(round(link_avg, 2))
-            self.time_benchmark_first.append(round(time, 2))
-            self.hop_num_benchmark_first.append(links_num)
-            with open(self.input_cons.path_curve_MILP, 'a') as f:
-                 print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'first_benchmark_cpu_max'+'-->', self.cpu_benchmark_first_max, file=f)
-                 print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'first_benchmark_cpu_avg'+'-->', self.cpu_benchmark_first_avg, file=f)
-                 print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'first_benchmark_link_max'+'-->', self.link_benchmark_first_max, file=f)
-                 print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'first_benchmark_link_avg'+'-->', self.link_benchmark_first_avg, file=f)
-                 print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'first_benchmark_time'+'-->', self.time_benchmark_first, file=f)
-                 print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'first_benchmark_link_num'+'-->', self.hop_num_benchmark_first, file=f)
-
-            graph.make_empty_network()
-
-        if 'benchmark_first_placement_last_routing' in approach_list:
-            cpu_max, cpu_avg, link_max, link_avg, time, links_num = self.benchmark_second.run(graph, chain, funs, alpha, user_num, batch_size, k, tune_param)
-            self.cpu_benchmark_second_max.append(round(cpu_max, 2))
-            self.cpu_benchmark_second_avg.append(round(cpu_avg, 2))
-            self.link_benchmark_second_max.append(round(link_max, 2))
-            self.link_benchmark_second_avg.append(round(link_avg, 2))
-            self.time_benchmark_second.append(round(time, 2))
-            self.hop_num_benchmark_second.append(links_num)
-            with open(self.input_cons.path_curve_MILP, 'a') as f:
-                 print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'second_benchmark_cpu_max'+'-->', self.cpu_benchmark_second_max, file=f)
-                 print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'second_benchmark_cpu_avg'+'-->', self.cpu_benchmark_second_avg, file=f)
-                 print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'second_benchmark_link_max'+'-->', self.link_benchmark_second_max, file=f)
-                 print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'second_benchmark_link_avg'+'-->', self.link_benchmark_second_avg, file=f)
-                 print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'second_benchmark_time'+'-->', self.time_benchmark_second, file=f)
-                 print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'second_benchmark_link_num'+'-->', self.hop_num_benchmark_second, file=f)
-
-            graph.make_empty_network()
+            return results
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.input_cons.portfolio_workers)
+        # Each worker process unpickles its own copy of the network state
+        futures = {job: self.pool.submit(_run_approach, self.__model(job), instance, graph, self.input_cons.profile)
+                   for job in jobs}
+        for job, future in futures.items():
+            results[job] = future.result()
+        return results
+
+    ###############################################################
+    # "close": stops the worker processes of the portfolio
+    ###############################################################
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    ###############################################################
+    # "box_plot_save": box plots of the load metrics of the recorded
+    #                  epochs, one box per job. Their epoch means are
+    #                  added to the curves and the records are reset.
+    ###############################################################
     def box_plot_save(self, approach, user_num, k, alpha, batch_size, versus_chain, versus_user, show, fomat_list):
-        max_load_links = [[]]
-        max_load_CPU_nodes = [[]]
-        avg_load_links = [[]]
-        avg_load_CPU_nodes = [[]]
-        links_num = [[]]
-        labels = []
-        if 'HF' in approach:
-            for i in range(len(self.tune_param)):
-                self.cpu_heu_full_max_list[i].append(sum(self.cpu_heu_full_max[i]) / len(self.cpu_heu_full_max[i]))
-                self.cpu_heu_full_avg_list[i].append(sum(self.cpu_heu_full_avg[i]) / len(self.cpu_heu_full_avg[i]))
-                self.link_heu_full_max_list[i].append(sum(self.link_heu_full_max[i]) / len(self.link_heu_full_max[i]))
-                self.link_heu_full_avg_list[i].append(sum(self.link_heu_full_avg[i]) / len(self.link_heu_full_avg[i]))
-                self.time_heu_full_list[i].append(sum(self.time_heu_full[i]) / len(self.time_heu_full[i]))
-                self.hop_num_heu_full_list[i].append(sum(self.hop_num_heu_full[i]) / len(self.hop_num_heu_full[i]))
-                max_load_CPU_nodes[0].append((
-                        max(self.cpu_heu_full_max[i]),
-                        np.percentile(self.cpu_heu_full_max[i], 75),
-                        np.percentile(self.cpu_heu_full_max[i], 50), 
-                        np.percentile(self.cpu_heu_full_max[i], 25), 
-                        min(self.cpu_heu_full_max[i]))
-                        )
-                avg_load_CPU_nodes[0].append((
-                        max(self.cpu_heu_full_avg[i]),
-                        np.percentile(self.cpu_heu_full_avg[i], 75),
-                        np.percentile(self.cpu_heu_full_avg[i], 50), 
-                        np.percentile(self.cpu_heu_full_avg[i], 25), 
-                        min(self.cpu_heu_full_avg[i]))
-                        )
-                            
-                max_load_links[0].append((
-                        max(self.link_heu_full_max[i]),
-                        np.percentile(self.link_heu_full_max[i], 75),
-                        np.percentile(self.link_heu_full_max[i], 50), 
-                        np.percentile(self.link_heu_full_max[i], 25), 
-                        min(self.link_heu_full_max[i]))
-                        )
-
-                avg_load_links[0].append((
-                        max(self.link_heu_full_avg[i]),
-                        np.percentile(self.link_heu_full_avg[i], 75),
-                        np.percentile(self.link_heu_full_avg[i], 50), 
-                        np.percentile(self.link_heu_full_avg[i], 25), 
-                        min(self.link_heu_full_avg[i]))
-                        )
-        labels.append('LB-FH')
-        
-        if 'MILPB' in approach:
-            self.cpu_MILP_batch_max_list.append(sum(self.cpu_MILP_batch_max) / len(self.cpu_MILP_batch_max))
-            self.cpu_MILP_batch_avg_list.append(sum(self.cpu_MILP_batch_avg) / len(self.cpu_MILP_batch_avg))
-            self.link_MILP_batch_max_list.append(sum(self.link_MILP_batch_max) / len(self.link_MILP_batch_max))
-            self.link_MILP_batch_avg_list.append(sum(self.link_MILP_batch_avg) / len(self.link_MILP_batch_avg))
-            self.time_MILP_batch_list.append(sum(self.time_MILP_batch) / len(self.time_MILP_batch))
-            self.hop_num_MILP_batch_list.append(sum(self.hop_num_MILP_batch) / len(self.hop_num_MILP_batch))
-            
-            max_load_CPU_nodes.append((
-                    max(self.cpu_MILP_batch_max),
-                    np.percentile(self.cpu_MILP_batch_max, 75),
-                    np.percentile(self.cpu_MILP_batch_max, 50), 
-                    np.percentile(self.cpu_MILP_batch_max, 25), 
-                    min(self.cpu_MILP_batch_max)
-                    )
-            )
-            avg_load_CPU_nodes.append((
-                    max(self.cpu_MILP_batch_max),
-                    np.percentile(self.cpu_MILP_batch_max, 75),
-                    np.percentile(self.cpu_MILP_batch_max, 50), 
-                    np.percentile(self.cpu_MILP_batch_max, 25), 
-                    min(self.cpu_MILP_batch_max)
-                    )
-            )
-            
-            max_load_links.append((
-                    max(self.link_MILP_batch_max),
-                    np.percentile(self.link_MILP_batch_max, 75),
-                    np.percentile(self.link_MILP_batch_max, 50), 
-                    np.percentile(self.link_MILP_batch_max, 25), 
-                    min(self.link_MILP_batch_max)
-                    )
-            )
-            avg_load_links.append((
-                    max(self.link_MILP_batch_avg),
-                    np.percentile(self.link_MILP_batch_avg, 75),
-                    np.percentile(self.link_MILP_batch_avg, 50), 
-                    np.percentile(self.link_MILP_batch_avg, 25), 
-                    min(self.link_MILP_batch_avg)
-                    )
-            )
-
-            labels.append('MILPB/')
-            
-        if 'MILP' in approach:    
-            self.cpu_MILP_max_list.append(sum(self.cpu_MILP_max) / len(self.cpu_MILP_max))
-            self.cpu_MILP_avg_list.append(sum(self.cpu_MILP_avg) / len(self.cpu_MILP_avg))
-            self.link_MILP_max_list.append(sum(self.link_MILP_max) / len(self.link_MILP_max))
-            self.link_MILP_avg_list.append(sum(self.link_MILP_avg) / len(self.link_MILP_avg))
-            self.time_MILP_list.append(sum(self.time_MILP) / len(self.time_MILP))
-
-            self.hop_num_MILP_list.append(sum(self.hop_num_MILP) / len(self.hop_num_MILP))
-            max_load_CPU_nodes.append((
-                    max(self.cpu_MILP_max),
-                    np.percentile(self.cpu_MILP_max, 75),
-                    np.percentile(self.cpu_MILP_max, 50), 
-                    np.percentile(self.cpu_MILP_max, 25), 
-                    min(self.cpu_MILP_max)
-                    )
-            )
-
-            avg_load_CPU_nodes.append((
-                    max(self.cpu_MILP_avg),
-                    np.percentile(self.cpu_MILP_avg, 75),
-                    np.percentile(self.cpu_MILP_avg, 50), 
-                    np.percentile(self.cpu_MILP_avg, 25), 
-                    min(self.cpu_MILP_avg)
-                    )
-            )
-                    
-            max_load_links.append((
-                    max(self.link_MILP_max),
-                    np.percentile(self.link_MILP_max, 75),
-                    np.percentile(self.link_MILP_max, 50), 
-                    np.percentile(self.link_MILP_max, 25), 
-                    min(self.link_MILP_max)
-                    )
-            )
-
-            avg_load_links.append((
-                    max(self.link_MILP_avg),
-                    np.percentile(self.link_MILP_avg, 75),
-                    np.percentile(self.link_MILP_avg, 50), 
-                    np.percentile(self.link_MILP_avg, 25), 
-                    min(self.link_MILP_avg)
-                    )
-            )
-
-            labels.append('MILP')
-        # print(max_load_links[0][0])
-        for i, tune in enumerate(self.tune_param):
+        # matplotlib is only loaded by the processes that plot
+        import matplotlib.pyplot as plt
+        jobs = [job for job in Registry.jobs(approach) if job in self.records]
+        for job in jobs:
+            curve = self.curves.setdefault(job, {metric: [] for metric, _, _ in self.metrics})
+            for metric, _, _ in self.metrics:
+                curve[metric].append(sum(self.records[job][metric]) / len(self.records[job][metric]))
+        labels = [self.__label(job, jobs) for job in jobs]
+        for metric, ylabel, name in self.metrics[:4]:
+            boxes = [Metrics.box(self.records[job][metric]) for job in jobs]
             _, ax = plt.subplots()
-            # ax.set_title('maximum CPU load'+'/'+'user num:'+str(user_num)+'/'+'K shortest path:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size))
             if versus_chain:
                 plt.xlabel('chains number')
             elif versus_user:
                 plt.xlabel('users number')
-            plt.ylabel('Maximum CPU usage(%)')
-            tmp = []
-            tmp.append(max_load_CPU_nodes[0][i])
-            tmp.extend(max_load_CPU_nodes[1:])
+            plt.ylabel(ylabel)
             with open(self.input_cons.path_text_box_plot, 'a') as f:
-                print('maximum CPU load'+'/'+'user num:'+str(user_num)+'/'+'K shortest path:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'_tune:'+str(tune)+'-->', tmp, file=f)
-            ax.boxplot(tmp, labels=labels)
+                print(ylabel+'/'+'user num:'+str(user_num)+'/'+'K shortest path:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+
+                      '/'+str([self.__job_name(job) for job in jobs])+'-->', boxes, file=f)
+            ax.boxplot(boxes)
+            ax.set_xticklabels(labels)
             for f in fomat_list:
-                plt.savefig(self.input_cons.path_box_plot+'maxCPUcap_'+'usernum:'+str(user_num)+'_KSP:'+str(k)+'_alpah:'+str(alpha)+'_batchSize:'+str(batch_size)+'_tune:'+str(tune)+f)
+                plt.savefig(self.input_cons.path_box_plot+name+'cap_'+'usernum:'+str(user_num)+'_KSP:'+str(k)+'_alpah:'+str(alpha)+'_batchSize:'+str(batch_size)+f)
             if show:
                 plt.show()
             plt.close()
-            
+        self.records = {}
+
+    ###############################################################
+    # "curve": curves of the epoch means of every job versus the 
+    #          chains number or the users number, the curves are 
+    #          reset afterwards
+    ###############################################################
+    def curve(self, approach, alpha, batch_size, k, user_list, chain_list, user_num, chain_num, format_list, show, versus_chain, versus_user):
+        import matplotlib.pyplot as plt
+        jobs = [job for job in Registry.jobs(approach) if job in self.curves]
+        if versus_chain:
+            x, xlabel, path, suffix = chain_list, 'chains number', self.input_cons.path_curve_versus_chain, 'vCHAIN'
+        elif versus_user:
+            x, xlabel, path, suffix = user_list, 'users number', self.input_cons.path_curve_versus_user, 'vUSER'
+        else:
+            return
+        for metric, ylabel, name in self.metrics[:5]:
             _, ax = plt.subplots()
-            # ax.set_title('average CPU load'+'/'+'user num:'+str(user_num)+'/'+'K shortest path:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size))
+            for n, job in enumerate(jobs):
+                plt.plot(x, self.curves[job][metric], self.markers[n % len(self.markers)] + '-', label=self.__label(job, jobs))
             if versus_chain:
-                plt.xlabel('chains number')
-            elif versus_user:
-                plt.xlabel('users number')
-            plt.ylabel('Average CPU usage(%)')
-            tmp = []
-            tmp.append(avg_load_CPU_nodes[0][i])
-            tmp.extend(avg_load_CPU_nodes[1:])
-            with open(self.input_cons.path_text_box_plot, 'a') as f:
-                print('Average CPU usage'+'/'+'user num:'+str(user_num)+'/'+'K shortest path:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'_tune:'+str(tune)+'-->', tmp, file=f)
-            ax.boxplot(tmp, labels=labels)
-            for f in fomat_list:
-                plt.savefig(self.input_cons.path_box_plot+'avgCPUcap_'+'usernum:'+str(user_num)+'_KSP:'+str(k)+'_alpah:'+str(alpha)+'_batchSize:'+str(batch_size)+'_tune:'+str(tune)+f)
+                with open(self.input_cons.path_text_curve_versus_chain, 'a') as f:
+                    for job in jobs:
+                        print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'/'+self.__job_name(job)+
+                              '_'+metric+'-->', self.curves[job][metric], file=f)
+            plt.xlabel(xlabel)
+            plt.ylabel(ylabel)
+            plt.legend()
+            plt.grid(True)
             if show:
                 plt.show()
+            for f in format_list:
+                plt.savefig(path+name+suffix+'_KSP:'+str(k)+'_alpah:'+str(alpha)+'_batchSize:'+str(batch_size)+
+                            ('_chains:'+str(chain_num) if versus_user else '')+f)
             plt.close()
-            
-            _, ax = plt.subplots()
-            # ax.set_title('maximum links load'+'/'+'user num:'+str(user_num)+'/'+'K shortest path:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size))
-            if versus_chain:
-                plt.xlabel('chains number')
-            elif versus_user:
-                plt.xlabel('users number')
-            plt.ylabel('Maximum bandwidth usage(%)')
-            tmp = []
-            tmp.append(max_load_links[0][i])
-            tmp.extend(max_load_links[1:])
-            with open(self.input_cons.path_text_box_plot, 'a') as f:
-                print('Maximum bandwidth usage'+'/'+'user num:'+str(user_num)+'/'+'K shortest path:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'_tune:'+str(tune)+'-->', tmp, file=f)
-            ax.boxplot(tmp, labels=labels)
-            for f in fomat_list:
-                plt.savefig(self.input_cons.path_box_plot+'maxlinkcap_'+'usernum:'+str(user_num)+'_KSP:'+str(k)+'_alpah:'+str(alpha)+'_batchSize:'+str(batch_size)+'_tune:'+str(tune)+f)
+        if versus_chain:
+            # Maximum bandwidth and average CPU usage of every job together
+            for n, job in enumerate(jobs):
+                marker = self.markers[n % len(self.markers)]
+                plt.plot(chain_list, self.curves[job]['link_max'], marker + '-', label=self.__label(job, jobs)+'-BW')
+                plt.plot(chain_list, self.curves[job]['cpu_avg'], marker + '--', label=self.__label(job, jobs)+'-CR')
+            plt.xlabel('chains number')
+            plt.ylabel('Maximum utilization (%)')
+            plt.legend()
+            plt.grid(True)
             if show:
                 plt.show()
+            for f in format_list:        
+                plt.savefig(self.input_cons.path_curve_versus_chain+'CPU&BW_'+'_KSP:'+str(k)+'_alpah:'+str(alpha)+'_batchSize:'+str(batch_size)+f)
             plt.close()
-            
-            _, ax = plt.subplots()
-            # ax.set_title('average links load'+'/'+'user num:'+str(user_num)+'/'+'K shortest path:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size))
-            if versus_chain:
-                plt.xlabel('chains number')
-            elif versus_user:
-                plt.xlabel('users number')
-            plt.ylabel('Average bandwidth usage(%)')
-            tmp = []
-            tmp.append(avg_load_links[0][i])
-            tmp.extend(avg_load_links[1:])
-         #   with open(self.input_cons.path_text_box_plot, 'a') as f:
-        #        print('Average bandwidth usage'+'/'+'user num:'+str(user_num)+'/'+'K shortest path:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'_tune:'+str(tune)+'-->', tmp, file=f)
-       #     ax.boxplot(avg_load_links, labels=labels)
-            for f in fomat_list:
-                plt.savefig(self.input_cons.path_box_plot+'avglinkcap_'+'usernum:'+str(user_num)+'_KSP:'+str(k)+'_alpah:'+str(alpha)+'_batchSize:'+str(batch_size)+'_tune:'+str(tune)+f)
-            if show:
-                plt.show()
-            plt.close()
-    
-        self.cpu_heu_full_max = [[] for _ in range(len(self.tune_param))]
-        self.cpu_heu_full_avg = [[] for _ in range(len(self.tune_param))]
-        self.link_heu_full_max = [[] for _ in range(len(self.tune_param))]
-        self.link_heu_full_avg = [[] for _ in range(len(self.tune_param))] 
-        self.time_heu_full = [[] for _ in range(len(self.tune_param))]
-        self.hop_num_heu_full = [[] for _ in range(len(self.tune_param))]
-
-        self.cpu_MILP_batch_max = []
-        self.link_MILP_batch_max = []
-        self.time_MILP_batch = []
-        self.hop_num_MILP_batch = []
-
-        self.cpu_MILP_batch_avg = []
-        self.link_MILP_batch_avg = []
-        self.time_MILP_batch = []
-        
-        self.cpu_MILP_max = []
-        self.link_MILP_max = []
-        self.time_MILP = [] 
-        self.hop_num_MILP = []
-        
-        self.cpu_MILP_avg = []
-        self.link_MILP_avg = []
-        self.time_MILP = []    
-        
-    def curve(self, approach, alpha, batch_size, k, user_list, chain_list, user_num, chain_num, format_list, show, versus_chain, versus_user):
-        # print(self.cpu_heu_full_max_list)
-        with open(self.input_cons.path_text_box_plot, 'a') as f:
-            if 'MILPB' in approach:
-                print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILPB_cpu_max'+'-->', self.cpu_MILP_batch_max_list, file=f)
-                #print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILPB_cpu_avg'+'-->', self.cpu_MILP_batch_avg_list, file=f)
-                print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILPB_link_max'+'-->', self.link_MILP_batch_max_list, file=f)
-               # print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILPB_link_avg'+'-->', self.link_MILP_batch_avg_list, file=f)
-                print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILPB_time'+'-->', self.time_MILP_batch_list, file=f)
-                print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILpb_hop_num'+'-->', self.hop_num_MILP_batch_list, file=f)
-            if 'MILP' in approach:
-                print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILP_cpu_max'+'-->', self.cpu_MILP_max_list, file=f)
-#                print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILP_cpu_avg'+'-->', self.cpu_MILP_avg_list, file=f)
-                print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILP_link_max'+'-->', self.link_MILP_max_list, file=f)
- #               print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILP_link_avg'+'-->', self.link_MILP_avg_list, file=f)
-                print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILP_time'+'-->', self.time_MILP_list, file=f)
-                print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILP_hop_num'+'-->', self.hop_num_MILP_list, file=f)
-                
-        for i, tune in enumerate(self.tune_param):
-            _, ax = plt.subplots()
-            
-            if versus_chain:
-#                plt.xlabel('chains number')
-                # ax.set_title('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size))
-                if 'HF' in approach:
- #                   plt.plot(chain_list, self.cpu_heu_full_max_list[i], 's', color='red')
-  #                  plt.plot(chain_list, self.cpu_heu_full_max_list[i], color='red', label='LB-HF')
-                    with open(self.input_cons.path_text_curve_versus_chain, 'a') as f:
-                        print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'heu_cpu_max'+'/tune:'+str(tune)+'-->', self.cpu_heu_full_max_list, file=f)
-                        print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'heu_hop_num'+'/tune:'+str(tune)+'-->', self.hop_num_heu_full_list,file=f)
-                    
-                if 'MILPB' in approach:
-                    plt.plot(chain_list, self.cpu_MILP_batch_max_list, '*', color='black')
-                    plt.plot(chain_list, self.cpu_MILP_batch_max_list, color='black', label='B-MILP')
-                    with open(self.input_cons.path_text_curve_versus_chain, 'a') as f:
-                        print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'BMILP_cpu_max'+'/tune:'+str(tune)+'-->', self.cpu_MILP_batch_max_list, file=f)
-                
-                if 'MILP' in approach:
-                    plt.plot(chain_list, self.cpu_MILP_max_list, 'o', color='blue')
-                    plt.plot(chain_list, self.cpu_MILP_max_list, color='blue', label='MILP')
-                    with open(self.input_cons.path_text_curve_versus_chain, 'a') as f:
-                        print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILP_cpu_max'+'/tune:'+str(tune)+'-->', self.cpu_MILP_batch_max_list, file=f)
-
-                plt.ylabel('Maximum CPU usage(%)')
-                plt.legend()
-                plt.grid(True)
-                if show:
-                    plt.show()
-                for f in format_list:
-                    plt.savefig(self.input_cons.path_curve_versus_chain+'maxCPUvCHAIN'+'_KSP:'+str(k)+'_alpah:'+str(alpha)+'_batchSize:'+str(batch_size)+'_tune:'+str(tune)+f)
-                plt.close()
-
-            elif versus_user:
-                plt.xlabel('users number')
-                # ax.set_title('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'/chains number:'+str(chain_num))
-                
-                if 'HF' in approach:
-                    plt.plot(user_list, self.cpu_heu_full_max_list[i], 's', color='red')
-                    plt.plot(user_list, self.cpu_heu_full_max_list[i], color='red', label='HF')
-                if 'MILPB' in approach:
-                    plt.plot(user_list, self.cpu_MILP_batch_max_list, '*', color='black')
-                    plt.plot(user_list, self.cpu_MILP_batch_max_list, color='black', label='MILPB')
-                if 'MILP' in approach:
-                    plt.plot(user_list, self.cpu_MILP_max_list, 'o', color='blue')
-                    plt.plot(user_list, self.cpu_MILP_max_list, color='blue', label='MILP')
-                
-                plt.ylabel('Maximum CPU usage(%)')
-                plt.legend()
-                plt.grid(True)
-                if show:
-                    plt.show()
-                for f in format_list:
-                    plt.savefig(self.input_cons.path_curve_versus_user+'maxCPUvUSER_'+'_KSP:'+str(k)+'_alpah:'+str(alpha)+'_batchSize:'+str(batch_size)+'_chains:'+str(chain_num)+'_tune:'+str(tune)+f)
-                plt.close()
-
-            _, ax = plt.subplots()
-            if versus_chain:
-                plt.xlabel('chains number')
-                # ax.set_title('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size))
-            #    if 'HF' in approach:
-   #                 plt.plot(chain_list, self.cpu_heu_full_avg_list[i], 's', color='red')
-    #                plt.plot(chain_list, self.cpu_heu_full_avg_list[i], color='red', label='HF')
-                with open(self.input_cons.path_text_curve_versus_chain, 'a') as f:
-                    print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'heu_cpu_avg'+'/tune:'+str(tune)+'-->', self.cpu_heu_full_avg_list, file=f)
-                    print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'heu_hop_num'+'/tune:'+str(tune)+'-->', self.hop_num_heu_full_list, file=f)           
-                if 'MILPB' in approach:
-                    plt.plot(chain_list, self.cpu_MILP_batch_avg_list, '*', color='black')
-                    plt.plot(chain_list, self.cpu_MILP_batch_avg_list, color='black', label='MILPB')
-                if 'MILP' in approach:
-                    plt.plot(chain_list, self.cpu_MILP_avg_list, 'o', color='blue')
-                    plt.plot(chain_list, self.cpu_MILP_avg_list, color='blue', label='MILP')
-                    
-                plt.ylabel('Average CPU usage(%)')
-                plt.legend()
-                plt.grid(True)
-                if show:
-                    plt.show()
-                for f in format_list:
-                    plt.savefig(self.input_cons.path_curve_versus_chain+'avgCPUvCHAIN'+'_KSP:'+str(k)+'_alpah:'+str(alpha)+'_batchSize:'+str(batch_size)+'_tune:'+str(tune)+f)
-                plt.close()
-
-            elif versus_user:
-                plt.xlabel('users number')
-                # ax.set_title('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'/chains number:'+str(chain_num))
-                
-                if 'HF' in approach:
-                    plt.plot(user_list, self.cpu_heu_full_avg_list[i], 's', color='red')
-                    plt.plot(user_list, self.cpu_heu_full_avg_list[i], color='red', label='HF')
-                if 'MILPB' in approach:
-                    plt.plot(user_list, self.cpu_MILP_batch_avg_list, '*', color='black')
-                    plt.plot(user_list, self.cpu_MILP_batch_avg_list, color='black', label='MILPB')
-                if 'MILP' in approach:
-                    plt.plot(user_list, self.cpu_MILP_avg_list, 'o', color='blue')
-                    plt.plot(user_list, self.cpu_MILP_avg_list, color='blue', label='MILP')
-                
-                plt.ylabel('Average CPU usage(%)')
-                plt.legend()
-                plt.grid(True)
-                if show:
-                    plt.show()
-                for f in format_list:
-                    plt.savefig(self.input_cons.path_curve_versus_user+'avgCPUvUSER_'+'_KSP:'+str(k)+'/alpah:'+str(alpha)+'_batchSize:'+str(batch_size)+'_chains:'+str(chain_num)+'_tune:'+str(tune)+f)
-                plt.close()
-        
-            _, ax = plt.subplots()
-            if versus_chain:
-                # ax.set_title('KSP:'+str(k)+'/alpha:'+str(alpha)+'/batchSize:'+str(batch_size))
-                
-                if 'HF' in approach:
-                    plt.plot(chain_list, self.time_heu_full_list[i], 's', color='red')
-                    plt.plot(chain_list, self.time_heu_full_list[i], color='red', label='HF')
-                    with open(self.input_cons.path_text_curve_versus_chain, 'a') as f:
-                        print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'heu_time'+'/tune:'+str(tune)+'-->', self.time_heu_full_list, file=f)
-                
-                if 'MILPB' in approach:
-                    plt.plot(chain_list, self.time_MILP_batch_list, '*', color='black')
-                    plt.plot(chain_list, self.time_MILP_batch_list, color='black', label='MILPB')
-                    with open(self.input_cons.path_text_curve_versus_chain, 'a') as f:
-                        print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'BMILP_time'+'/tune:'+str(tune)+'-->', self.time_MILP_batch_list, file=f)
-                
-                if 'MILP' in approach:
-                    plt.plot(chain_list, self.time_MILP_list, 'o', color='blue')
-                    plt.plot(chain_list, self.time_MILP_list, color='blue', label='MILP')
-                    with open(self.input_cons.path_text_curve_versus_chain, 'a') as f:
-                        print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILP_time'+'/tune:'+str(tune)+'-->', self.time_MILP_list, file=f)
-                
-                plt.xlabel('chains number')
-                plt.ylabel('Time (s)')
-                plt.legend()
-                plt.grid(True)
-                if show:
-                    plt.show()
-                for f in format_list:
-                    plt.savefig(self.input_cons.path_curve_versus_chain+'timevUSER_'+'_KSP:'+str(k)+'_alpah:'+str(alpha)+'_batchSize:'+str(batch_size)+'_tune:'+str(tune)+f)
-                
-                plt.close()
-            elif versus_user:
-                # ax.set_title('KSP:'+str(k)+'/alpha:'+str(alpha)+'/batchSize:'+str(batch_size))
-                
-                if 'HF' in approach:
-                    plt.plot(user_list, self.time_heu_full_list[i], 's', color='red')
-                    plt.plot(user_list, self.time_heu_full_list[i], color='red', label='HF')
-                if 'MILPB' in approach:
-                    plt.plot(user_list, self.time_MILP_batch_list, '*', color='black')
-                    plt.plot(user_list, self.time_MILP_batch_list, color='black', label='MILPB')
-                if 'MILP' in approach:
-                    plt.plot(user_list, self.time_MILP_list, 'o', color='blue')
-                    plt.plot(user_list, self.time_MILP_list, color='blue', label='MILP')
-                
-                if versus_chain:
-                    plt.xlabel('users number')
-                plt.ylabel('Time (s)')
-                plt.legend()
-                plt.grid(True)
-                if show:
-                    plt.show()
-                for f in format_list:
-                    plt.savefig(self.input_cons.versus_chain+'timevUSER_'+'_KSP:'+str(k)+'_alpah:'+str(alpha)+'_batchSize:'+str(batch_size)+'_chains:'+str(chains_num)+'_tune:'+str(tune)+f)  
-                plt.close()
-                
-            _, ax = plt.subplots()
-            if versus_chain:
-                # ax.set_title('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size))
-                
-                if 'HF' in approach:
-                    plt.plot(chain_list, self.link_heu_full_max_list[i], 's', color='red')
-                    plt.plot(chain_list, self.link_heu_full_max_list[i], color='red', label='HF')
-                    with open(self.input_cons.path_text_curve_versus_chain, 'a') as f:
-                        print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'heu_link_max'+'/tune:'+str(tune)+'-->', self.link_heu_full_max_list, file=f)
-                
-                if 'MILPB' in approach:
-                    plt.plot(chain_list, self.link_MILP_batch_max_list, '*', color='black')
-                    plt.plot(chain_list, self.link_MILP_batch_max_list, color='black', label='MILPB')
-                    with open(self.input_cons.path_text_curve_versus_chain, 'a') as f:
-                        print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'BMILP_link_max'+'/tune:'+str(tune)+'-->', self.link_MILP_batch_max_list, file=f)
-                
-                if 'MILP' in approach:
-                    plt.plot(chain_list, self.link_MILP_max_list, 'o', color='blue')
-                    plt.plot(chain_list, self.link_MILP_max_list, color='blue', label='MILP')
-                    with open(self.input_cons.path_text_curve_versus_chain, 'a') as f:
-                        print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'MILP_link_max'+'/tune:'+str(tune)+'-->', self.link_MILP_max_list, file=f)
-                    
-                plt.xlabel('chains number')
-                plt.ylabel('Maximum bandwidth usage (%)')
-                plt.legend()
-                plt.grid(True)
-                if show:
-                    plt.show()
-                for f in format_list:        
-                    plt.savefig(self.input_cons.path_curve_versus_chain+'maxbandwidthvUSER_'+'_KSP:'+str(k)+'_alpah:'+str(alpha)+'_batchSize:'+str(batch_size)+'_tune:'+str(tune)+f)
-                
-                plt.close()
-            elif versus_user:
-                # ax.set_title('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size))
-                
-                if 'HF' in approach:
-                    plt.plot(user_list, self.link_heu_full_max_list[i], 's', color='red')
-                    plt.plot(user_list, self.link_heu_full_max_list[i], color='red', label='HF')
-                if 'MILPB' in approach:
-                    plt.plot(user_list, self.link_MILP_batch_max_list, '*', color='black')
-                    plt.plot(user_list, self.link_MILP_batch_max_list, color='black', label='MILPB')
-                if 'MILP' in approach:
-                    plt.plot(user_list, self.link_MILP_max_list, 'o', color='blue')
-                    plt.plot(user_list, self.link_MILP_max_list, color='blue', label='MILP')
-                
-                plt.xlabel('users number')
-                plt.ylabel('Maximum bandwidth usage (%)')
-                plt.legend()
-                plt.grid(True)
-                if show:
-                    plt.show()
-                for f in format_list:        
-                    plt.savefig(self.input_cons.path_curve_versus_user+'maxbandwidthvUSER_'+'_KSP:'+str(k)+'_alpah:'+str(alpha)+'_batchSize:'+str(batch_size)+'_users:'+str(user_num)+'_chains:'+str(chain_num)+'_tune:'+str(tune)+f)
-                
-                plt.close()
-
-            _, ax = plt.subplots()
-            if versus_chain:
-                # ax.set_title('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size))
-                
-                if 'HF' in approach:
-                    plt.plot(chain_list, self.link_heu_full_avg_list[i], 's', color='red')
-                    plt.plot(chain_list, self.link_heu_full_avg_list[i], color='red', label='HF')
-                with open(self.input_cons.path_text_curve_versus_chain, 'a') as f:
-                    print('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size)+'heu_link_avg'+'/tune:'+str(tune)+'-->', self.link_heu_full_avg_list, file=f)
-                
-                if 'MILPB' in approach:
-                    plt.plot(chain_list, self.link_MILP_batch_avg_list, '*', color='black')
-                    plt.plot(chain_list, self.link_MILP_batch_avg_list, color='black', label='MILPB')
-                if 'MILP' in approach:
-                    plt.plot(chain_list, self.link_MILP_avg_list, 'o', color='blue')
-                    plt.plot(chain_list, self.link_MILP_avg_list, color='blue', label='MILP')
-                
-                plt.xlabel('chains number')
-                plt.ylabel('Average bandwidth usage (%)')
-                plt.legend()
-                plt.grid(True)
-                if show:
-                    plt.show()
-                for f in format_list:        
-                    plt.savefig(self.input_cons.path_curve_versus_chain+'avgbandwidthvUSER_'+'_KSP:'+str(k)+'_alpah:'+str(alpha)+'_batchSize:'+str(batch_size)+'_tune:'+str(tune)+f)
-                
-                plt.close()
-            elif versus_user:
-                # ax.set_title('KSP:'+str(k)+'/'+'alpha:'+str(alpha)+'/batchSize:'+str(batch_size))
-                
-                if 'HF' in approach:
-                    plt.plot(user_list, self.link_heu_full_avg_list[i], 's', color='red')
-                    plt.plot(user_list, self.link_heu_full_avg_list[i], color='red', label='HF')
-                if 'MILPB' in approach:
-                    plt.plot(user_list, self.link_MILP_batch_avg_list, '*', color='black')
-                    plt.plot(user_list, self.link_MILP_batch_avg_list, color='black', label='MILPB')
-                if 'MILP' in approach:
-                    plt.plot(user_list, self.link_MILP_avg_list, 'o', color='blue')
-                    plt.plot(user_list, self.link_MILP_avg_list, color='blue', label='MILP')
-                
-                plt.xlabel('users number')
-                plt.ylabel('Average bandwidth usage (%)')
-                plt.legend()
-                plt.grid(True)
-                if show:
-                    plt.show()
-                for f in format_list:        
-                    plt.savefig(self.input_cons.path_curve_versus_user+'avgbandwidthvUSER_'+'_KSP:'+str(k)+'_alpah:'+str(alpha)+'_batchSize:'+str(batch_size)+'_users:'+str(user_num)+'_chains:'+str(chain_num)+'_tune:'+str(tune)+f)
-                
-                plt.close()
-            if versus_chain:
-                if 'HF' in approach:
-                    plt.plot(chain_list, self.link_heu_full_max_list[i], 's', color='red', label='LB-HF-BW')
-                    plt.plot(chain_list, self.link_heu_full_max_list[i], color='red')
-                    plt.plot(chain_list, self.cpu_heu_full_avg_list[i], '^', color='g', label='LB-HF-CR')
-                    plt.plot(chain_list, self.cpu_heu_full_avg_list[i], color='g')
-
-                if 'MILPB' in approach:
-                    plt.plot(chain_list, self.link_MILP_batch_max_list, '*', color='black', label='B-MILP-BW')
-                    plt.plot(chain_list, self.link_MILP_batch_max_list, color='black')
-                    plt.plot(chain_list, self.cpu_MILP_batch_avg_list, 'p', color='c',label='B-MILPB-CR')
-                    plt.plot(chain_list, self.cpu_MILP_batch_avg_list, color='c')
-    
-                if 'MILP' in approach:
-                    plt.plot(chain_list, self.link_MILP_max_list, 'o', color='blue', label='MILP-BW')
-                    plt.plot(chain_list, self.link_MILP_max_list, color='blue')
-                    plt.plot(chain_list, self.cpu_MILP_avg_list, '+', color='m', label='MILP-CPU')
-                    plt.plot(chain_list, self.cpu_MILP_avg_list, color='m')
-                    
-                plt.xlabel('chains number')
-                plt.ylabel('Maximum utilization (%)')
-                plt.legend()
-                plt.grid(True)
-                if show:
-                    plt.show()
-                for f in format_list:        
-                    plt.savefig(self.input_cons.path_curve_versus_chain+'CPU&BW_'+'_KSP:'+str(k)+'_alpah:'+str(alpha)+'_batchSize:'+str(batch_size)+'_tune:'+str(tune)+f)
-                
-                plt.close()    
-            
-        self.cpu_heu_full_max_list = [[] for _ in range(len(self.tune_param))]
-        self.cpu_heu_full_avg_list = [[] for _ in range(len(self.tune_param))]
-        self.link_heu_full_max_list = [[] for _ in range(len(self.tune_param))]
-        self.link_heu_full_avg_list = [[] for _ in range(len(self.tune_param))]
-        self.time_heu_full_list = [[] for _ in range(len(self.tune_param))]
-                
-        self.cpu_MILP_batch_max_list = []
-        self.link_MILP_batch_max_list = []
-        self.time_MILP_batch_list = []
-        
-        self.cpu_MILP_batch_avg_list = []
-        self.link_MILP_batch_avg_list = []
-        
-        self.cpu_MILP_max_list = []
-        self.link_MILP_max_list = []
-        self.time_MILP_list = []
-        
-        self.cpu_MILP_avg_list = []
-        self.link_MILP_avg_list = []
-        
+        self.curves = {}
+
+###############################################################
+# "_run_approach": places instance on the network state with one
+#                  approach and returns its PlacementResult and the
+#                  profile report (None when profile is off)
+###############################################################
+def _run_approach(model, instance, state, profile=False):
+    model.profiler = Profiler(enabled=profile)
+    result = model.place(instance, state)
+    return result, model.profiler.report() if profile else None
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Durable store of the finished cells of a sweep.
+
+Every (approach, chain_num, epoch, k, alpha, batch_size, tune_param)
+cell that finished is written to a local sqlite file together with its
+results tuple, its placement (PlacementResult.to_dict) and the
+fingerprint of what it was computed from, the ResultCache key of the
+cell. A restarted sweep skips the cells whose fingerprint still 
+matches and the plots can be rebuilt from the file alone. A cell of an
+earlier sweep on other chains, network, functions, inputs or code has
+another fingerprint and counts as not done.
+"""
+###############################################################
+# Import packages
+###############################################################
+import json
+import os
+import sqlite3
+
+###############################################################
+# Checkpoint class:|
+#                  |__>functions:--> done, get, save, epochs
+###############################################################
+class Checkpoint:
+    _fields = ('cpu_max', 'cpu_avg', 'link_max', 'link_avg', 'time', 'links_num')
+    _types = ('REAL', 'REAL', 'REAL', 'REAL', 'REAL', 'INTEGER')
+
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        columns = [row[1] for row in self.db.execute('PRAGMA table_info(results)')]
+        if columns and 'fingerprint' not in columns:
+            # Cells of a file without fingerprints can't be checked
+            self.db.execute('DROP TABLE results')
+        self.db.execute('CREATE TABLE IF NOT EXISTS results ('
+                        'key TEXT PRIMARY KEY, approach TEXT, chain_num INTEGER, epoch INTEGER, '
+                        'k INTEGER, alpha REAL, batch_size INTEGER, tune_param REAL, ' +
+                        ', '.join(f + ' ' + t for f, t in zip(self._fields, self._types)) +
+                        ', fingerprint TEXT, placement TEXT)')
+        self.db.commit()
+
+    ###############################################################
+    # "_key": text key of one cell, tune_param is None for the
+    #                                approaches that don't use it
+    ###############################################################
+    @staticmethod
+    def _key(approach, chain_num, epoch, k, alpha, batch_size, tune_param):
+        return json.dumps([approach, chain_num, epoch, k, alpha, batch_size, tune_param])
+
+    def done(self, approach, chain_num, epoch, k, alpha, batch_size, tune_param, fingerprint):
+        return self.get(approach, chain_num, epoch, k, alpha, batch_size, tune_param, fingerprint) is not None
+
+    ###############################################################
+    # "get": (results tuple, placement) of one cell, or None if it
+    #        isn't done yet or was computed from something else
+    ###############################################################
+    def get(self, approach, chain_num, epoch, k, alpha, batch_size, tune_param, fingerprint):
+        row = self.db.execute('SELECT ' + ', '.join(self._fields) + ', placement FROM results '
+                              'WHERE key = ? AND fingerprint = ?',
+                              (self._key(approach, chain_num, epoch, k, alpha, batch_size, tune_param), fingerprint)
+                              ).fetchone()
+        if row is None:
+            return None
+        return row[:-1], json.loads(row[-1])
+
+    ###############################################################
+    # "save": records one finished cell, committed immediately so
+    #                           a crash never loses a finished cell
+    ###############################################################
+    def save(self, approach, chain_num, epoch, k, alpha, batch_size, tune_param, fingerprint, result, placement):
+        self.db.execute('INSERT OR REPLACE INTO results VALUES (' + ', '.join(['?'] * (10 + len(self._fields))) + ')',
+                        (self._key(approach, chain_num, epoch, k, alpha, batch_size, tune_param),
+                         approach, chain_num, epoch, k, alpha, batch_size, tune_param) + tuple(result) +
+                        (fingerprint, json.dumps(placement)))
+        self.db.commit()
+
+    ###############################################################
+    # "epochs": sorted epochs of one chain_num that have a cell of
+    #           every approach job, whatever their fingerprints
+    ###############################################################
+    def epochs(self, jobs, chain_num, k, alpha, batch_size):
+        epochs = None
+        for approach, tune_param in jobs:
+            rows = self.db.execute('SELECT key, epoch FROM results WHERE approach = ? AND chain_num = ?',
+                                   (approach, chain_num)).fetchall()
+            done = {epoch for key, epoch in rows
+                    if key == self._key(approach, chain_num, epoch, k, alpha, batch_size, tune_param)}
+            epochs = done if epochs is None else epochs & done
+        return sorted(epochs or [])
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Named timers and counters for the hot paths of the models.
+
+A disabled profiler hands out a shared no-op timer, so instrumented
+code costs next to nothing when profiling is off.
+"""
+###############################################################
+# Import packages
+###############################################################
+from time import perf_counter
+
+###############################################################
+# Timer features class
+###############################################################
+class _Timer:
+    __slots__ = ('timers', 'name', 'start')
+
+    def __init__(self, timers, name):
+        self.timers = timers
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timers[self.name] = self.timers.get(self.name, 0) + perf_counter() - self.start
+        return False
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_null_timer = _NullTimer()
+
+###############################################################
+# Profiler class:|
+#                |__>functions:--> timer, add_time, count, report
+###############################################################
+class Profiler:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.timers = {}
+        self.counters = {}
+
+    ###############################################################
+    # "timer": context manager adding its wall time to timer "name"
+    ###############################################################
+    def timer(self, name):
+        if self.enabled:
+            return _Timer(self.timers, name)
+        return _null_timer
+
+    ###############################################################
+    # "add_time": adds seconds measured elsewhere to timer "name"
+    ###############################################################
+    def add_time(self, name, seconds):
+        if self.enabled:
+            self.timers[name] = self.timers.get(name, 0) + seconds
+
+    ###############################################################
+    # "count": adds n to counter "name"
+    ###############################################################
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    ###############################################################
+    # "report": timers (seconds) and counters collected so far
+    ###############################################################
+    def report(self):
+        return {'timers': {name: round(t, 6) for name, t in self.timers.items()},
+                'counters': dict(self.counters)}
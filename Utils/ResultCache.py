@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Content-addressed cache of approach results.
+
+A cell is keyed by the hashes of the instance, network and functions,
+the approach, the hash of its source code and of the repository
+modules it imports, the hash of the InputConstants that can change
+its result, and the (k, alpha, batch_size, tune_param) parameters. It
+stores the results tuple and the placement (PlacementResult.to_dict).
+Least recently used cells are evicted once the cache grows past its
+size bound.
+"""
+###############################################################
+# Import packages
+###############################################################
+import ast
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import sqlite3
+import time
+import InputConstants
+
+# Root of the repository, modules outside of it aren't hashed
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Inputs that don't change what an approach computes: the files the
+# instance is read from (their content is hashed), where results go,
+# what the sweep runs, and how many workers run it
+_sweep_inputs = {'approaches', 'approach_plugins', 'chains_num', 'user_num', 'run_num', 'k_path_num', 'alpha',
+                 'batch_size', 'heu_full_tune_param', 'milp_batch_window', 'format', 'result_cache_size',
+                 'k_path_workers', 'k_path_executor', 'portfolio_workers', 'ordering_workers',
+                 'profile', 'lower_bound', 'lower_bound_time_limit', 'benchmark_tolerance'}
+
+###############################################################
+# "_imports": files of the repository modules the source imports,
+#                              at the top or inside of its functions
+###############################################################
+def _imports(source):
+    names = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names.add(node.module.split('.')[0])
+    files = []
+    for name in sorted(names):
+        spec = importlib.util.find_spec(name)
+        if spec is not None and spec.has_location and os.path.abspath(spec.origin).startswith(_root + os.sep):
+            files.append(os.path.abspath(spec.origin))
+    return files
+
+###############################################################
+# "code_version": hash of the source of the modules that define 
+#                 the class of obj and its bases, and of every
+#                 repository module they import, directly or not
+###############################################################
+_code_versions = {}
+def code_version(obj):
+    if type(obj) not in _code_versions:
+        files = [os.path.abspath(inspect.getsourcefile(cls)) for cls in type(obj).__mro__[:-1]]
+        seen = set()
+        sha = hashlib.sha1()
+        while files:
+            path = files.pop(0)
+            if path not in seen:
+                seen.add(path)
+                with open(path) as f:
+                    source = f.read()
+                sha.update(source.encode())
+                files.extend(_imports(source))
+        _code_versions[type(obj)] = sha.hexdigest()
+    return _code_versions[type(obj)]
+
+###############################################################
+# "inputs_version": hash of the InputConstants of the process but
+#                   the paths and the _sweep_inputs
+###############################################################
+def inputs_version():
+    knobs = {name: value for name, value in vars(InputConstants.inputs()).items()
+             if name not in _sweep_inputs and not name.startswith(('_', 'path')) and not name.endswith(('_path', '_name'))}
+    return hashlib.sha1(json.dumps(knobs, sort_keys=True, default=str).encode()).hexdigest()
+
+###############################################################
+# ResultCache class:|
+#                   |__>functions:--> key, get, put
+###############################################################
+class ResultCache:
+    def __init__(self, path, max_size):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_size = max_size
+        self.db = sqlite3.connect(path)
+        self.db.execute('CREATE TABLE IF NOT EXISTS cache ('
+                        'key TEXT PRIMARY KEY, result TEXT, placement TEXT, size INTEGER, used REAL)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS cache_used ON cache (used)')
+        self.size = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+        self._evict()
+
+    ###############################################################
+    # "key": cache key of one cell
+    #               --->input:  graph, chain, funs >>> the instance
+    #                           model >>> object of the approach
+    #               --->output: hex digest
+    ###############################################################
+    @staticmethod
+    def key(graph, chain, funs, approach, model, k, alpha, batch_size, tune_param):
+        return hashlib.sha1(json.dumps([chain.digest, graph.digest, funs.digest, approach, 
+                                        code_version(model), code_version(graph), inputs_version(),
+                                        k, alpha, batch_size, tune_param]).encode()).hexdigest()
+
+    ###############################################################
+    # "get": (result, placement) of a cell or None, marks it used
+    ###############################################################
+    def get(self, key):
+        row = self.db.execute('SELECT result, placement FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        self.db.execute('UPDATE cache SET used = ? WHERE key = ?', (time.time(), key))
+        self.db.commit()
+        return tuple(json.loads(row[0])), json.loads(row[1])
+
+    ###############################################################
+    # "put": stores a cell and evicts the least recently used ones
+    #                              while the cache is over max_size
+    ###############################################################
+    def put(self, key, result, placement):
+        result = json.dumps(list(result))
+        placement = json.dumps(placement)
+        size = len(result) + len(placement)
+        old = self.db.execute('SELECT size FROM cache WHERE key = ?', (key,)).fetchone()
+        self.size += size - (old[0] if old else 0)
+        self.db.execute('INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)',
+                        (key, result, placement, size, time.time()))
+        self._evict()
+
+    def _evict(self):
+        while self.size > self.max_size:
+            lru_key, lru_size = self.db.execute('SELECT key, size FROM cache ORDER BY used LIMIT 1').fetchone()
+            self.db.execute('DELETE FROM cache WHERE key = ?', (lru_key,))
+            self.size -= lru_size
+        self.db.commit()
+
+    def close(self):
+        self.db.close()